@@ -0,0 +1,66 @@
+"""Mide la memoria por caja de las distintas representaciones de Box.
+
+Uso: python benchmarks/box_memory.py [número de cajas]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from src.core.box import Box  # noqa: E402
+from src.core.box_batch import BOX_DTYPE, BoxBatch  # noqa: E402
+
+@dataclass
+class DataclassBox:
+    """Representación anterior: dataclass con __dict__ por instancia."""
+    id: int
+    width: float
+    length: float
+    height: float
+    weight: float
+    position: Tuple[float, float, float] = (0, 0, 0)
+
+def measure(build) -> int:
+    """Bytes retenidos por el resultado de build()."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def main(count: int) -> None:
+    rng = np.random.default_rng(0)
+    records = np.empty(count, dtype=BOX_DTYPE)
+    records['id'] = np.arange(count)
+    for name in ('width', 'length', 'height', 'weight'):
+        records[name] = rng.uniform(10, 60, count)
+    columns = [records[name].tolist() for name in BOX_DTYPE.names]
+
+    # Las cajas colocadas llevan una posición propia, como tras paletizar
+    def objects(cls):
+        return [cls(i, w, l, h, p, (float(i), 0.0, 0.0)) for i, w, l, h, p in zip(*columns)]
+
+    def batch_with_views():
+        batch = BoxBatch.from_structured(records.copy())
+        batch.positions[:, 0] = np.arange(count)
+        return batch, list(batch)
+
+    results = [
+        ("dataclass (antes)", measure(lambda: objects(DataclassBox))),
+        ("Box con __slots__", measure(lambda: objects(Box))),
+        ("BoxBatch (solo arrays)", measure(lambda: BoxBatch.from_structured(records.copy()))),
+        ("BoxBatch + BoxView", measure(batch_with_views)),
+    ]
+    print(f"Memoria por caja con {count:,} cajas")
+    for name, total in results:
+        print(f"  {name:<24} {total / count:8.1f} bytes/caja")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -1,7 +1,9 @@
+import copy
 import streamlit as st
 import pandas as pd
 import time
 from datetime import datetime
+from io import BytesIO
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -9,118 +11,43 @@ from reportlab.lib.styles import getSampleStyleSheet
 from core.box import Box
 from core.pallet import Pallet
 from core.algorithms import (
-    first_fit_palletization,
     best_fit_decreasing_palletization,
     first_fit_decreasing_palletization,
-    guillotine_palletization,
-    best_fit_lookahead_palletization
+    best_fit_lookahead_palletization,
+    sku_layer_palletization,
+    layer_palletization
 )
+from core.online import OnlinePalletizer
+from core.metrics import calculate_pallet_metrics, calculate_pallet_quality
+from core.plan import write_plan
+from core.portfolio import run_portfolio
+from core.local_search import LocalSearch
+from core.bounds import lower_bounds
+from core.sources import BOX_FILE_EXTENSIONS, count_boxes, iter_boxes
 from visualization.plotter import visualize_pallets, print_palletization_summary
 from config.config import AppConfig, PalletConfig, ConveyorConfig
 import os
 
-def calculate_pallet_metrics(pallet: Pallet) -> dict:
-    """Calcula métricas importantes del pallet."""
-    return {
-        "peso_utilizado": pallet.current_weight,
-        "peso_maximo": pallet.max_weight,
-        "porcentaje_peso": (pallet.current_weight / pallet.max_weight) * 100,
-        "volumen_utilizado": sum(box.volume() for box in pallet.boxes),
-        "volumen_total": pallet.max_width * pallet.max_length * pallet.max_height,
-        "porcentaje_volumen": (sum(box.volume() for box in pallet.boxes) / 
-                             (pallet.max_width * pallet.max_length * pallet.max_height)) * 100,
-        "altura_utilizada": max((box.position[2] + box.height for box in pallet.boxes), default=0),
-        "altura_maxima": pallet.max_height,
-        "porcentaje_altura": (max((box.position[2] + box.height for box in pallet.boxes), default=0) / 
-                            pallet.max_height) * 100
-    }
+# Algoritmos que se ejecutan de forma incremental durante la simulación
+ONLINE_ALGORITHMS = {
+    "First-Fit": "first_fit",
+    "Guillotine": "guillotine",
+    "EMS": "ems",
+}
 
-def calculate_pallet_quality(pallet: Pallet) -> tuple:
-    """Calcula la calidad del pallet basada en varios factores."""
-    # 1. Utilización del Volumen (40%)
-    total_volume = pallet.max_width * pallet.max_length * pallet.max_height
-    used_volume = sum(box.volume() for box in pallet.boxes)
-    volume_utilization = used_volume / total_volume if total_volume > 0 else 0
-    
-    # 2. Distribución del Peso (30%)
-    # Calculamos el centro de masa del pallet
-    total_weight = sum(box.weight for box in pallet.boxes)
-    if total_weight > 0:
-        center_x = sum(box.weight * (box.position[0] + box.width/2) for box in pallet.boxes) / total_weight
-        center_y = sum(box.weight * (box.position[1] + box.length/2) for box in pallet.boxes) / total_weight
-        
-        # La distribución ideal sería en el centro del pallet
-        ideal_center_x = pallet.max_width / 2
-        ideal_center_y = pallet.max_length / 2
-        
-        # Calculamos la desviación del centro de masa respecto al centro ideal
-        deviation_x = abs(center_x - ideal_center_x) / (pallet.max_width / 2)
-        deviation_y = abs(center_y - ideal_center_y) / (pallet.max_length / 2)
-        
-        # La distribución del peso es mejor cuanto más cerca esté del centro
-        weight_distribution = 1 - (deviation_x + deviation_y) / 2
-    else:
-        weight_distribution = 0
-    
-    # 3. Estabilidad de la Carga (20%)
-    stability_score = 1.0
-    for box in pallet.boxes:
-        # Verificamos si la caja tiene soporte debajo
-        has_support = False
-        for other_box in pallet.boxes:
-            if other_box != box:
-                # La caja tiene soporte si hay otra caja debajo que la soporte
-                if (other_box.position[2] + other_box.height == box.position[2] and
-                    other_box.position[0] <= box.position[0] + box.width and
-                    other_box.position[0] + other_box.width >= box.position[0] and
-                    other_box.position[1] <= box.position[1] + box.length and
-                    other_box.position[1] + other_box.length >= box.position[1]):
-                    has_support = True
-                    break
-        
-        # Si la caja está en el suelo, tiene soporte
-        if box.position[2] == 0:
-            has_support = True
-        
-        if not has_support:
-            stability_score -= 0.1  # Penalizamos por cada caja sin soporte
-    
-    # 4. Utilización de la Altura (10%)
-    max_height = max((box.position[2] + box.height for box in pallet.boxes), default=0)
-    height_utilization = max_height / pallet.max_height if pallet.max_height > 0 else 0
-    
-    # Pesos de cada componente
-    weights = {
-        'volume': 0.40,
-        'weight': 0.30,
-        'stability': 0.20,
-        'height': 0.10
-    }
-    
-    # Cálculo de la puntuación total
-    quality_score = (
-        volume_utilization * weights['volume'] +
-        weight_distribution * weights['weight'] +
-        stability_score * weights['stability'] +
-        height_utilization * weights['height']
-    )
-    
-    # Aseguramos que los valores estén entre 0 y 1
-    quality_score = max(0, min(1, quality_score))
-    volume_utilization = max(0, min(1, volume_utilization))
-    weight_distribution = max(0, min(1, weight_distribution))
-    stability_score = max(0, min(1, stability_score))
-    height_utilization = max(0, min(1, height_utilization))
-    
-    quality_components = {
-        'volume_utilization': volume_utilization,
-        'weight_distribution': weight_distribution,
-        'stability_score': stability_score,
-        'height_utilization': height_utilization,
-        'weights': weights
-    }
-    
-    return quality_score, quality_components
+# Giros que se permiten a las cajas (ver core.orientation.ROTATION_MODES)
+ROTATION_LABELS = {
+    "fixed": "Sin rotación",
+    "upright": "Solo sobre el eje vertical",
+    "all": "Las seis orientaciones",
+}
+
+def pallet_options(config: PalletConfig) -> dict:
+    """Restricciones de colocación de cada pallet según la configuración."""
+    return {'max_cog_offset': config.max_cog_offset, 'max_cog_height': config.max_cog_height}
+
+# Modo que ejecuta todos los algoritmos registrados en paralelo y se queda con el mejor
+PORTFOLIO = "Portafolio (todos)"
 
 def generate_pdf_report(history, pallets):
     """Genera un reporte PDF con el historial de la simulación."""
@@ -283,6 +210,25 @@ def main():
                 min_value=1.0,
                 step=5.0
             )
+            box_rotation = st.selectbox(
+                "Rotación de cajas",
+                options=list(ROTATION_LABELS),
+                format_func=lambda mode: ROTATION_LABELS[mode],
+                index=list(ROTATION_LABELS).index(st.session_state["config"].pallet.box_rotation)
+            )
+            # Envolvente del centro de gravedad: 0 significa sin límite
+            max_cog_offset = st.number_input(
+                "Desviación máxima del centro de gravedad (cm, 0 = sin límite)",
+                value=float(st.session_state["config"].pallet.max_cog_offset or 0.0),
+                min_value=0.0,
+                step=1.0
+            )
+            max_cog_height = st.number_input(
+                "Altura máxima del centro de gravedad (cm, 0 = sin límite)",
+                value=float(st.session_state["config"].pallet.max_cog_height or 0.0),
+                min_value=0.0,
+                step=5.0
+            )
             
             # Configuración de la cinta transportadora
             st.subheader("Cinta Transportadora")
@@ -292,6 +238,16 @@ def main():
                 min_value=0.1,
                 step=0.5
             )
+            simulated = st.checkbox(
+                "Reloj simulado (sin esperas reales)",
+                value=st.session_state["config"].conveyor.simulated
+            )
+            service_time_seconds = st.number_input(
+                "Tiempo de servicio por caja (segundos)",
+                value=st.session_state["config"].conveyor.service_time_seconds,
+                min_value=0.0,
+                step=0.5
+            )
             
             # Selección del algoritmo de palletización
             st.subheader("Algoritmo de Palletización")
@@ -302,11 +258,24 @@ def main():
                     "Best-Fit Decreasing",
                     "First-Fit Decreasing",
                     "Guillotine",
-                    "Best-Fit Lookahead"
+                    "EMS",
+                    "Best-Fit Lookahead",
+                    "Capas por SKU",
+                    "Capas (skyline)",
+                    PORTFOLIO
                 ],
                 index=0
             )
             
+            # Plazo total del portafolio: los algoritmos sin terminar se cancelan
+            if algorithm == PORTFOLIO:
+                portfolio_deadline = st.number_input(
+                    "Plazo máximo del portafolio (segundos)",
+                    min_value=1.0,
+                    value=30.0,
+                    step=5.0
+                )
+            
             # Configuración específica para Best-Fit Lookahead
             if algorithm == "Best-Fit Lookahead":
                 lookahead = st.number_input(
@@ -317,8 +286,20 @@ def main():
                     step=1
                 )
             
-            # Obtener lista de archivos CSV en el directorio data
-            data_files = [f for f in os.listdir("data") if f.endswith('.csv')]
+            # Fase de mejora opcional al terminar la simulación
+            improve = st.checkbox(
+                "Mejorar el plan con búsqueda local",
+                value=st.session_state.get("improve", False)
+            )
+            improve_budget_ms = st.number_input(
+                "Presupuesto de mejora (ms)",
+                min_value=100,
+                value=int(st.session_state.get("improve_budget_ms", 2000)),
+                step=500
+            )
+            
+            # Obtener lista de archivos de cajas (CSV, Parquet, Arrow, .npy) en el directorio data
+            data_files = [f for f in os.listdir("data") if f.lower().endswith(BOX_FILE_EXTENSIONS)]
             input_file = st.selectbox(
                 "Archivo de entrada",
                 options=data_files,
@@ -333,11 +314,16 @@ def main():
                     max_width=max_width,
                     max_length=max_length,
                     max_height=max_height,
-                    max_weight=max_weight
+                    max_weight=max_weight,
+                    box_rotation=box_rotation,
+                    max_cog_offset=max_cog_offset or None,
+                    max_cog_height=max_cog_height or None
                 )
                 conveyor_config = ConveyorConfig(
                     interval_seconds=interval_seconds,
-                    input_file=input_file
+                    input_file=input_file,
+                    simulated=simulated,
+                    service_time_seconds=service_time_seconds
                 )
                 st.session_state["config"] = AppConfig(
                     pallet=pallet_config,
@@ -346,6 +332,10 @@ def main():
                 st.session_state["algorithm"] = algorithm
                 if algorithm == "Best-Fit Lookahead":
                     st.session_state["lookahead"] = lookahead
+                if algorithm == PORTFOLIO:
+                    st.session_state["portfolio_deadline"] = portfolio_deadline
+                st.session_state["improve"] = improve
+                st.session_state["improve_budget_ms"] = improve_budget_ms
                 st.success("Configuración actualizada correctamente")
     
     # Crear dos columnas principales
@@ -400,25 +390,36 @@ def main():
                 
                 # Cargar cajas desde el archivo CSV
                 try:
-                    df = pd.read_csv(st.session_state["config"].conveyor.input_file)
+                    input_file = st.session_state["config"].conveyor.input_file
+                    total_boxes = count_boxes(input_file)
                     progress_bar = st.progress(0)
                     status_text = st.empty()
                     current_box_info = st.empty()
                     
-                    for i, (_, row) in enumerate(df.iterrows()):
+                    # Los algoritmos incrementales colocan cada caja una sola vez;
+                    # los que ordenan o miran adelante se replanifican con cada llegada
+                    online_palletizer = None
+                    if st.session_state["algorithm"] in ONLINE_ALGORITHMS:
+                        online_palletizer = OnlinePalletizer(
+                            max_width=st.session_state["config"].pallet.max_width,
+                            max_length=st.session_state["config"].pallet.max_length,
+                            max_height=st.session_state["config"].pallet.max_height,
+                            max_weight=st.session_state["config"].pallet.max_weight,
+                            strategy=ONLINE_ALGORITHMS[st.session_state["algorithm"]],
+                            pallet_options=pallet_options(st.session_state["config"].pallet)
+                        )
+                    
+                    # Reloj de la cinta: virtual en modo simulado, de pared en tiempo real
+                    conveyor = st.session_state["config"].conveyor
+                    arrival_time = 0.0
+                    station_free_at = 0.0
+                    decision_latencies = []
+                    
+                    for i, box in enumerate(iter_boxes(input_file)):
                         # Actualizar barra de progreso
-                        progress = (i + 1) / len(df)
+                        progress = (i + 1) / total_boxes
                         progress_bar.progress(progress)
                         
-                        # Crear y mostrar la caja actual
-                        box = Box(
-                            id=int(row['id']),
-                            width=float(row['width']),
-                            length=float(row['length']),
-                            height=float(row['height']),
-                            weight=float(row['weight'])
-                        )
-                        
                         # Actualizar información de la caja actual
                         current_box_info.markdown(f"""
                         ### 📦 Caja Actual
@@ -428,50 +429,70 @@ def main():
                         - **Volumen:** {box.volume():.1f} cm³
                         """)
                         
+                        if st.session_state["config"].pallet.box_rotation != "fixed":
+                            # Las vistas de un lote no se pueden girar: se copian a cajas independientes
+                            box = copy.copy(box)
+                            box.rotation = st.session_state["config"].pallet.box_rotation
                         st.session_state["boxes"].append(box)
                         
+                        # La caja espera si la estación sigue ocupada con la anterior
+                        arrival_time += conveyor.interval_seconds
+                        decision_time = max(arrival_time, station_free_at)
+                        station_free_at = decision_time + conveyor.service_time_seconds
+                        decision_start = time.perf_counter()
+                        
                         # Realizar paletización según el algoritmo seleccionado
-                        if st.session_state["algorithm"] == "First-Fit":
-                            st.session_state["pallets"] = first_fit_palletization(
+                        if online_palletizer is not None:
+                            online_palletizer.add_box(box)
+                            st.session_state["pallets"] = online_palletizer.pallets
+                        elif st.session_state["algorithm"] == "Best-Fit Decreasing":
+                            st.session_state["pallets"] = best_fit_decreasing_palletization(
                                 st.session_state["boxes"],
                                 max_width=st.session_state["config"].pallet.max_width,
                                 max_length=st.session_state["config"].pallet.max_length,
                                 max_height=st.session_state["config"].pallet.max_height,
-                                max_weight=st.session_state["config"].pallet.max_weight
+                                max_weight=st.session_state["config"].pallet.max_weight,
+                                **pallet_options(st.session_state["config"].pallet)
                             )
-                        elif st.session_state["algorithm"] == "Best-Fit Decreasing":
-                            st.session_state["pallets"] = best_fit_decreasing_palletization(
+                        elif st.session_state["algorithm"] == "First-Fit Decreasing":
+                            st.session_state["pallets"] = first_fit_decreasing_palletization(
                                 st.session_state["boxes"],
                                 max_width=st.session_state["config"].pallet.max_width,
                                 max_length=st.session_state["config"].pallet.max_length,
                                 max_height=st.session_state["config"].pallet.max_height,
-                                max_weight=st.session_state["config"].pallet.max_weight
+                                max_weight=st.session_state["config"].pallet.max_weight,
+                                **pallet_options(st.session_state["config"].pallet)
                             )
-                        elif st.session_state["algorithm"] == "First-Fit Decreasing":
-                            st.session_state["pallets"] = first_fit_decreasing_palletization(
+                        elif st.session_state["algorithm"] == "Best-Fit Lookahead":
+                            st.session_state["pallets"] = best_fit_lookahead_palletization(
                                 st.session_state["boxes"],
                                 max_width=st.session_state["config"].pallet.max_width,
                                 max_length=st.session_state["config"].pallet.max_length,
                                 max_height=st.session_state["config"].pallet.max_height,
-                                max_weight=st.session_state["config"].pallet.max_weight
+                                max_weight=st.session_state["config"].pallet.max_weight,
+                                lookahead=st.session_state.get("lookahead", 3),
+                                **pallet_options(st.session_state["config"].pallet)
                             )
-                        elif st.session_state["algorithm"] == "Guillotine":
-                            st.session_state["pallets"] = guillotine_palletization(
+                        elif st.session_state["algorithm"] == "Capas por SKU":
+                            st.session_state["pallets"] = sku_layer_palletization(
                                 st.session_state["boxes"],
                                 max_width=st.session_state["config"].pallet.max_width,
                                 max_length=st.session_state["config"].pallet.max_length,
                                 max_height=st.session_state["config"].pallet.max_height,
-                                max_weight=st.session_state["config"].pallet.max_weight
+                                max_weight=st.session_state["config"].pallet.max_weight,
+                                **pallet_options(st.session_state["config"].pallet)
                             )
-                        elif st.session_state["algorithm"] == "Best-Fit Lookahead":
-                            st.session_state["pallets"] = best_fit_lookahead_palletization(
+                        elif st.session_state["algorithm"] == "Capas (skyline)":
+                            st.session_state["pallets"] = layer_palletization(
                                 st.session_state["boxes"],
                                 max_width=st.session_state["config"].pallet.max_width,
                                 max_length=st.session_state["config"].pallet.max_length,
                                 max_height=st.session_state["config"].pallet.max_height,
                                 max_weight=st.session_state["config"].pallet.max_weight,
-                                lookahead=st.session_state.get("lookahead", 3)
+                                **pallet_options(st.session_state["config"].pallet)
                             )
+                        # El portafolio no replanifica con cada llegada: se ejecuta al final
+                        decision_latencies.append(time.perf_counter() - decision_start)
                         
                         # Actualizar visualización 3D
                         fig = visualize_pallets(st.session_state["pallets"], 
@@ -510,7 +531,8 @@ def main():
                             
                             # Guardar en el historial
                             st.session_state["history"].append({
-                                "timestamp": datetime.now().strftime("%H:%M:%S"),
+                                "timestamp": (f"{decision_time:.1f} s" if conveyor.simulated
+                                              else datetime.now().strftime("%H:%M:%S")),
                                 "box_id": box.id,
                                 "dimensions": f"{box.width}x{box.length}x{box.height}",
                                 "weight": box.weight,
@@ -524,8 +546,55 @@ def main():
                             st.subheader("Historial de Colocación")
                             st.dataframe(pd.DataFrame(st.session_state["history"]))
                             
-                        # Esperar el intervalo configurado
-                        time.sleep(st.session_state["config"].conveyor.interval_seconds)
+                        # Esperar el intervalo configurado (solo con reloj de pared)
+                        if not conveyor.simulated:
+                            time.sleep(conveyor.interval_seconds)
+                    
+                    if st.session_state["algorithm"] == PORTFOLIO:
+                        with st.spinner("⚙️ Ejecutando el portafolio de algoritmos..."):
+                            portfolio = run_portfolio(
+                                st.session_state["boxes"],
+                                max_width=st.session_state["config"].pallet.max_width,
+                                max_length=st.session_state["config"].pallet.max_length,
+                                max_height=st.session_state["config"].pallet.max_height,
+                                max_weight=st.session_state["config"].pallet.max_weight,
+                                deadline_seconds=st.session_state.get("portfolio_deadline", 30.0),
+                                pallet_options=pallet_options(st.session_state["config"].pallet)
+                            )
+                        st.session_state["pallets"] = portfolio.pallets
+                        fig = visualize_pallets(st.session_state["pallets"], 
+                                              rotation_angle=st.session_state["rotation_angle"])
+                        visualization_container.pyplot(fig)
+                        if portfolio.best is not None:
+                            st.info(
+                                f"Mejor algoritmo: {portfolio.best.name} "
+                                f"(cota inferior {portfolio.bounds.best}, gap {portfolio.gap * 100:.1f}%)"
+                            )
+                        st.dataframe(pd.DataFrame([
+                            {
+                                "Algoritmo": result.name,
+                                "Estado": result.status,
+                                "Tiempo (s)": round(result.seconds, 3),
+                                "Pallets": len(result.pallets) if result.pallets is not None else None,
+                                "Sin colocar": result.unplaced,
+                                "Calidad media": round(result.quality, 3)
+                            }
+                            for result in portfolio.results
+                        ]))
+                    
+                    if st.session_state.get("improve") and st.session_state["pallets"]:
+                        with st.spinner("⚙️ Mejorando el plan con búsqueda local..."):
+                            improvement = LocalSearch(st.session_state["pallets"]).run(
+                                st.session_state.get("improve_budget_ms", 2000)
+                            )
+                        st.session_state["pallets"] = improvement.pallets
+                        fig = visualize_pallets(st.session_state["pallets"], 
+                                              rotation_angle=st.session_state["rotation_angle"])
+                        visualization_container.pyplot(fig)
+                        st.info(
+                            f"Búsqueda local: {improvement.initial_pallet_count} → "
+                            f"{len(improvement.pallets)} pallets en {improvement.iterations} iteraciones"
+                        )
                     
                     st.session_state["simulation_running"] = False
                     st.session_state["simulation_complete"] = True
@@ -568,6 +637,56 @@ def main():
                                 "Promedio"
                             )
                     
+                    # Distancia del plan a la cota inferior de pallets
+                    if st.session_state["pallets"]:
+                        pallet_config = st.session_state["config"].pallet
+                        bounds = lower_bounds(
+                            st.session_state["boxes"],
+                            pallet_config.max_width,
+                            pallet_config.max_length,
+                            pallet_config.max_height,
+                            pallet_config.max_weight
+                        )
+                        col_bound1, col_bound2 = st.columns(2)
+                        with col_bound1:
+                            st.metric(
+                                "Cota Inferior",
+                                bounds.best,
+                                f"Volumen {bounds.volume} · Peso {bounds.weight} · L2 {bounds.l2}"
+                            )
+                        with col_bound2:
+                            st.metric(
+                                "Gap de Optimalidad",
+                                f"{bounds.gap(len(st.session_state['pallets'])) * 100:.1f}%",
+                                "0% = óptimo demostrado"
+                            )
+                    
+                    # Pallets que terminan con el centro de gravedad fuera de la envolvente
+                    off_balance = [i for i, pallet in enumerate(st.session_state["pallets"], 1)
+                                   if not pallet.cog_within_limits()]
+                    if off_balance:
+                        st.warning(
+                            "⚠️ Centro de gravedad fuera de la envolvente en los pallets: "
+                            + ", ".join(str(i) for i in off_balance)
+                        )
+                    
+                    # Capacidad de la línea medida sobre el reloj de la cinta
+                    if conveyor.simulated and decision_latencies:
+                        col_line1, col_line2 = st.columns(2)
+                        with col_line1:
+                            st.metric(
+                                "Throughput",
+                                f"{len(decision_latencies) / station_free_at * 3600:.0f} cajas/h"
+                                if station_free_at > 0 else "—",
+                                f"{station_free_at:.1f} s simulados"
+                            )
+                        with col_line2:
+                            st.metric(
+                                "Latencia de Decisión",
+                                f"{max(decision_latencies) * 1000:.1f} ms",
+                                "Máxima"
+                            )
+                    
                     # Mostrar métricas de calidad al final de la simulación
                     if st.session_state["pallets"]:
                         quality_score, quality_components = calculate_pallet_quality(st.session_state["pallets"][-1])
@@ -622,6 +741,7 @@ def main():
                             2. **Distribución del Peso** (30%):
                                - Calcula el centro de masa del pallet
                                - Compara la posición del centro de masa con el centro ideal del pallet
+                               - Se obtiene como 1 menos la distancia entre ambos centros dividida entre la media diagonal del pallet
                                - La puntuación es mejor cuanto más cerca esté el centro de masa del centro del pallet
                                - Valores altos indican mejor balance del peso
                             
@@ -629,7 +749,8 @@ def main():
                                - Verifica que cada caja tenga soporte adecuado
                                - Una caja tiene soporte si:
                                  - Está en el suelo (posición z = 0)
-                                 - O hay otra caja debajo que la soporte completamente
+                                 - O la cara superior de otra caja está justo a la altura de su base y ambas huellas se solapan
+                                 - Si el pallet exige una fracción mínima de apoyo, el área de contacto con las cajas de debajo debe cubrir esa fracción de su base
                                - Penaliza con -0.1 por cada caja que no tenga soporte adecuado
                                - Valores altos indican mejor estabilidad
                             
@@ -657,6 +778,17 @@ def main():
                         file_name=f"palletization_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
                         mime="application/pdf"
                     )
+            
+            # Plan binario para controladores de robot y para el visualizador
+            if st.session_state["pallets"]:
+                plan_buffer = BytesIO()
+                write_plan(plan_buffer, st.session_state["pallets"])
+                st.download_button(
+                    label="📥 Descargar Plan de Colocación",
+                    data=plan_buffer.getvalue(),
+                    file_name=f"palletization_plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.plan",
+                    mime="application/octet-stream"
+                )
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
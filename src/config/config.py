@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import yaml
 import os
 
@@ -10,12 +10,17 @@ class PalletConfig:
     max_length: float = 100.0  # cm
     max_height: float = 200.0  # cm
     max_weight: float = 1000.0  # kg
+    box_rotation: str = "fixed"  # giros permitidos a las cajas: fixed, upright o all
+    max_cog_offset: Optional[float] = None  # cm; distancia máxima del centro de gravedad al centro del pallet
+    max_cog_height: Optional[float] = None  # cm; altura máxima del centro de gravedad
 
 @dataclass
 class ConveyorConfig:
     """Configuración de la cinta transportadora."""
     interval_seconds: float = 2.0  # segundos entre cajas
     input_file: str = "data/cajas_entrada.csv"
+    simulated: bool = False  # reloj virtual en lugar de esperas reales
+    service_time_seconds: float = 0.0  # segundos de servicio por caja
 
 @dataclass
 class AppConfig:
@@ -64,11 +69,16 @@ def save_config(config: AppConfig, config_path: str = "config/default_config.yam
             'max_width': config.pallet.max_width,
             'max_length': config.pallet.max_length,
             'max_height': config.pallet.max_height,
-            'max_weight': config.pallet.max_weight
+            'max_weight': config.pallet.max_weight,
+            'box_rotation': config.pallet.box_rotation,
+            'max_cog_offset': config.pallet.max_cog_offset,
+            'max_cog_height': config.pallet.max_cog_height
         },
         'conveyor': {
             'interval_seconds': config.conveyor.interval_seconds,
-            'input_file': config.conveyor.input_file
+            'input_file': config.conveyor.input_file,
+            'simulated': config.conveyor.simulated,
+            'service_time_seconds': config.conveyor.service_time_seconds
         }
     }
     
@@ -1,279 +1,329 @@
-from typing import List, Tuple
+from collections import deque
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple, Union
 from .box import Box
+from .box_batch import BoxBatch
+from .metrics import calculate_pallet_quality  # Se mantiene importable desde aquí
 from .pallet import Pallet
+from .pallet_index import PalletIndex
+from .online import OnlinePalletizer
+from .orientation import allowed_orientations, set_orientation
+from .patterns import build_sku_layers
+from .skyline import SkylinePacker
 import numpy as np
 
-def first_fit_palletization(boxes: List[Box], 
+def first_fit_palletization(boxes: Iterable[Box], 
                           max_width: float, 
                           max_length: float, 
                           max_height: float, 
-                          max_weight: float) -> List[Pallet]:
+                          max_weight: float,
+                          **pallet_options) -> List[Pallet]:
     """Algoritmo First-Fit para palletización."""
-    pallets = []
-    current_pallet = Pallet(max_width, max_length, max_height, max_weight)
-    pallets.append(current_pallet)
-    
-    for box in boxes:
-        placed = False
-        for pallet in pallets:
-            if pallet.can_place_box(box):
-                # Intentar colocar la caja en el pallet actual
-                if pallet.place_box(box):
-                    placed = True
-                    break
-        
-        if not placed:
-            # Si no se pudo colocar en ningún pallet existente, crear uno nuevo
-            new_pallet = Pallet(max_width, max_length, max_height, max_weight)
-            if new_pallet.place_box(box):
-                pallets.append(new_pallet)
-            else:
-                print(f"Advertencia: La caja {box.id} no pudo ser colocada en ningún pallet")
-    
-    return pallets
+    return _online_palletization(boxes, max_width, max_length, max_height, max_weight, strategy='first_fit',
+                                 pallet_options=pallet_options)
 
-def best_fit_decreasing_palletization(boxes: List[Box], max_width: float, max_length: float, max_height: float, max_weight: float) -> List[Pallet]:
+def best_fit_decreasing_palletization(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float, max_weight: float,
+                                      **pallet_options) -> List[Pallet]:
     """Algoritmo Best-Fit Decreasing para palletización."""
     # Ordenar cajas por volumen de mayor a menor
-    sorted_boxes = sorted(boxes, key=lambda x: x.volume(), reverse=True)
-    pallets = []
-    current_pallet = Pallet(max_width, max_length, max_height, max_weight)
-    pallets.append(current_pallet)
-    
-    for box in sorted_boxes:
-        best_pallet = None
-        best_remaining_volume = float('inf')
-        
-        for pallet in pallets:
-            if pallet.can_place_box(box):
-                remaining_volume = pallet.remaining_volume()
-                if remaining_volume < best_remaining_volume:
-                    best_remaining_volume = remaining_volume
-                    best_pallet = pallet
-        
-        if best_pallet:
-            best_pallet.place_box(box)
-        else:
-            new_pallet = Pallet(max_width, max_length, max_height, max_weight)
-            new_pallet.place_box(box)
-            pallets.append(new_pallet)
-    
-    return pallets
+    sorted_boxes = _sorted_by_volume(boxes)
+    return _online_palletization(sorted_boxes, max_width, max_length, max_height, max_weight, strategy='best_fit',
+                                 pallet_options=pallet_options)
 
-def first_fit_decreasing_palletization(boxes: List[Box], max_width: float, max_length: float, max_height: float, max_weight: float) -> List[Pallet]:
+def first_fit_decreasing_palletization(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float, max_weight: float,
+                                       **pallet_options) -> List[Pallet]:
     """Algoritmo First-Fit Decreasing para palletización."""
     # Ordenar cajas por volumen de mayor a menor
-    sorted_boxes = sorted(boxes, key=lambda x: x.volume(), reverse=True)
-    pallets = []
-    current_pallet = Pallet(max_width, max_length, max_height, max_weight)
-    pallets.append(current_pallet)
-    
-    for box in sorted_boxes:
-        placed = False
-        for pallet in pallets:
-            if pallet.can_place_box(box):
-                pallet.place_box(box)
-                placed = True
-                break
-        
-        if not placed:
-            new_pallet = Pallet(max_width, max_length, max_height, max_weight)
-            new_pallet.place_box(box)
-            pallets.append(new_pallet)
-    
-    return pallets
+    sorted_boxes = _sorted_by_volume(boxes)
+    return _online_palletization(sorted_boxes, max_width, max_length, max_height, max_weight, strategy='first_fit',
+                                 pallet_options=pallet_options)
+
+def _sorted_by_volume(boxes: Union[Iterable[Box], BoxBatch]) -> Iterable[Box]:
+    """Ordena las cajas por volumen decreciente; un BoxBatch se ordena con argsort sin crear objetos."""
+    if isinstance(boxes, BoxBatch):
+        return boxes.sorted_by_volume()
+    return sorted(boxes, key=lambda x: x.volume(), reverse=True)
 
-def guillotine_palletization(boxes: List[Box], max_width: float, max_length: float, max_height: float, max_weight: float) -> List[Pallet]:
-    """Algoritmo Guillotine para palletización."""
-    pallets = []
-    current_pallet = Pallet(max_width, max_length, max_height, max_weight)
-    pallets.append(current_pallet)
+def _online_palletization(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float, max_weight: float,
+                          strategy: str, pallet_options: Optional[dict] = None, **options) -> List[Pallet]:
+    """
+    Paletiza una lista de cajas pasándolas de una en una por un OnlinePalletizer.
     
+    El paletizador mantiene un índice de pallets que descarta en tiempo
+    logarítmico los pallets sin peso, altura o volumen suficientes; la
+    búsqueda geométrica solo se ejecuta sobre los candidatos que devuelve.
+    pallet_options se pasa a cada Pallet que se abre (restricciones de
+    apoyo o de centro de gravedad).
+    """
+    palletizer = OnlinePalletizer(max_width, max_length, max_height, max_weight, strategy,
+                                  pallet_options=pallet_options, **options)
     for box in boxes:
-        placed = False
-        for pallet in pallets:
-            # Intentar colocar la caja en el pallet actual
-            if pallet.can_place_box(box):
-                # Encontrar el mejor lugar para colocar la caja
-                best_position = None
-                min_waste = float('inf')
-                
-                # Buscar en todas las posiciones posibles
-                for x in range(0, int(pallet.max_width - box.width) + 1):
-                    for y in range(0, int(pallet.max_length - box.length) + 1):
-                        for z in range(0, int(pallet.max_height - box.height) + 1):
-                            # Verificar si la posición es válida
-                            if pallet.is_position_valid(box, (x, y, z)):
-                                # Calcular el desperdicio de espacio
-                                waste = pallet.calculate_waste(box, (x, y, z))
-                                if waste < min_waste:
-                                    min_waste = waste
-                                    best_position = (x, y, z)
-                
-                if best_position:
-                    box.position = best_position
-                    pallet.place_box(box)
-                    placed = True
-                    break
-        
-        if not placed:
-            new_pallet = Pallet(max_width, max_length, max_height, max_weight)
-            new_pallet.place_box(box)
-            pallets.append(new_pallet)
-    
-    return pallets
+        palletizer.add_box(box)
+    return palletizer.pallets
 
-def calculate_pallet_quality(pallet: Pallet) -> Tuple[float, dict]:
+def guillotine_palletization(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float, max_weight: float,
+                             split_rule: str = 'shorter_leftover_axis',
+                             score_rule: str = 'best_volume_fit', **pallet_options) -> List[Pallet]:
     """
-    Calcula una métrica de calidad para el pallet basada en varios factores:
-    1. Utilización del volumen (0-1)
-    2. Distribución del peso (0-1)
-    3. Estabilidad de la carga (0-1)
-    4. Altura utilizada (0-1)
+    Algoritmo Guillotine para palletización.
+    Cada pallet mantiene una lista de cuboides libres que se cortan al colocar
+    cada caja, de modo que solo se evalúan los espacios libres existentes.
+    
+    Args:
+        boxes: Cajas a paletizar (lista, generador o BoxBatch)
+        max_width: Ancho máximo del pallet
+        max_length: Largo máximo del pallet
+        max_height: Alto máximo del pallet
+        max_weight: Peso máximo del pallet
+        split_rule: Regla de corte del espacio sobrante (ver guillotine.SPLIT_RULES)
+        score_rule: Regla de elección del espacio libre (ver guillotine.SCORE_RULES)
+        **pallet_options: Restricciones de colocación de cada Pallet (ver Pallet)
     
     Returns:
-        Tuple[float, dict]: 
-            - Puntuación de calidad entre 0 y 1 (1 es mejor)
-            - Diccionario con los componentes individuales y sus pesos
+        Lista de pallets con las cajas asignadas
     """
-    if not pallet.boxes:
-        return 0.0, {
-            'volume_utilization': 0.0,
-            'weight_distribution': 0.0,
-            'stability_score': 0.0,
-            'height_utilization': 0.0,
-            'weights': {
-                'volume': 0.4,
-                'weight': 0.3,
-                'stability': 0.2,
-                'height': 0.1
-            }
-        }
-    
-    # 1. Utilización del volumen
-    total_volume = pallet.max_width * pallet.max_length * pallet.max_height
-    used_volume = sum(box.volume() for box in pallet.boxes)
-    volume_utilization = used_volume / total_volume
-    
-    # 2. Distribución del peso
-    # Calcular el centro de masa
-    total_weight = sum(box.weight for box in pallet.boxes)
-    if total_weight == 0:
-        weight_distribution = 0
-    else:
-        center_of_mass_x = sum(box.weight * (box.position[0] + box.width/2) for box in pallet.boxes) / total_weight
-        center_of_mass_y = sum(box.weight * (box.position[1] + box.length/2) for box in pallet.boxes) / total_weight
-        
-        # La distribución ideal es en el centro del pallet
-        ideal_center_x = pallet.max_width / 2
-        ideal_center_y = pallet.max_length / 2
-        
-        # Calcular la desviación del centro ideal (normalizada)
-        max_deviation = np.sqrt((pallet.max_width/2)**2 + (pallet.max_length/2)**2)
-        actual_deviation = np.sqrt((center_of_mass_x - ideal_center_x)**2 + (center_of_mass_y - ideal_center_y)**2)
-        weight_distribution = 1 - (actual_deviation / max_deviation)
+    return _online_palletization(boxes, max_width, max_length, max_height, max_weight, 'guillotine',
+                                 pallet_options=pallet_options, split_rule=split_rule, score_rule=score_rule)
+
+def ems_palletization(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float, max_weight: float,
+                      score_rule: str = 'bottom_left', **pallet_options) -> List[Pallet]:
+    """
+    Algoritmo First-Fit sobre espacios máximos vacíos (EMS).
+    Cada caja va al mejor EMS soportado del primer pallet que la admite.
     
-    # 3. Estabilidad de la carga
-    # Verificar si las cajas están bien apoyadas
-    stability_score = 1.0
-    for box in pallet.boxes:
-        if box.position[2] > 0:  # Si no está en el suelo
-            # Verificar si hay cajas debajo que la soporten
-            supported = False
-            for other_box in pallet.boxes:
-                if other_box != box and other_box.position[2] < box.position[2]:
-                    # Verificar si hay superposición en el plano XY
-                    if (other_box.position[0] < box.position[0] + box.width and
-                        other_box.position[0] + other_box.width > box.position[0] and
-                        other_box.position[1] < box.position[1] + box.length and
-                        other_box.position[1] + other_box.length > box.position[1]):
-                        supported = True
-                        break
-            if not supported:
-                stability_score *= 0.5  # Penalizar cajas no soportadas
+    Args:
+        boxes: Cajas a paletizar (lista, generador o BoxBatch)
+        max_width: Ancho máximo del pallet
+        max_length: Largo máximo del pallet
+        max_height: Alto máximo del pallet
+        max_weight: Peso máximo del pallet
+        score_rule: Regla de elección del EMS (ver ems.EMS_SCORE_RULES)
+        **pallet_options: Restricciones de colocación de cada Pallet (ver Pallet)
     
-    # 4. Altura utilizada
-    max_height = max(box.position[2] + box.height for box in pallet.boxes)
-    height_utilization = max_height / pallet.max_height
+    Returns:
+        Lista de pallets con las cajas asignadas
+    """
+    return _online_palletization(boxes, max_width, max_length, max_height, max_weight, 'ems',
+                                 pallet_options=pallet_options, score_rule=score_rule)
+
+def sku_layer_palletization(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float, max_weight: float,
+                            min_layer_count: int = 2, **pallet_options) -> List[Pallet]:
+    """
+    Algoritmo por capas de cajas idénticas.
+    Las cajas con las mismas dimensiones y peso se agrupan y se colocan por
+    capas completas con patrones precalculados (bloque, filas mixtas o
+    molinete); solo las cajas sobrantes pasan por First-Fit Decreasing,
+    empezando por los huecos que dejan las capas.
     
-    # Ponderación de los factores
-    weights = {
-        'volume': 0.4,      # 40% importancia al volumen
-        'weight': 0.3,      # 30% importancia a la distribución del peso
-        'stability': 0.2,   # 20% importancia a la estabilidad
-        'height': 0.1       # 10% importancia a la altura
-    }
+    Args:
+        boxes: Cajas a paletizar (lista, generador o BoxBatch)
+        max_width: Ancho máximo del pallet
+        max_length: Largo máximo del pallet
+        max_height: Alto máximo del pallet
+        max_weight: Peso máximo del pallet
+        min_layer_count: Cajas mínimas por capa para usar un patrón
+        **pallet_options: Restricciones de colocación de cada Pallet (ver Pallet)
     
-    # Calcular puntuación final
-    quality_score = (
-        weights['volume'] * volume_utilization +
-        weights['weight'] * weight_distribution +
-        weights['stability'] * stability_score +
-        weights['height'] * height_utilization
-    )
+    Returns:
+        Lista de pallets con las cajas asignadas
+    """
+    pallets, remaining = build_sku_layers(boxes, max_width, max_length, max_height, max_weight,
+                                          min_layer_count, **pallet_options)
+    palletizer = OnlinePalletizer(max_width, max_length, max_height, max_weight, 'first_fit',
+                                  pallet_options=pallet_options)
+    for pallet in pallets:
+        palletizer.index.add(pallet)
+    for box in _sorted_by_volume(remaining):
+        palletizer.add_box(box)
+    return palletizer.pallets
+
+def layer_palletization(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float, max_weight: float,
+                        height_tolerance: float = 0.1, **pallet_options) -> List[Pallet]:
+    """
+    Algoritmo por capas.
+    Elige la altura de capa de la caja más alta pendiente, rellena la capa en
+    2D con un empaquetador skyline usando las cajas de altura compatible y la
+    apila sobre el pallet con Pallet.place_layer, que la registra en
+    Pallet.layers. Cuando una capa no cabe se abre un pallet nuevo.
     
-    # Devolver la puntuación y los componentes
-    components = {
-        'volume_utilization': volume_utilization,
-        'weight_distribution': weight_distribution,
-        'stability_score': stability_score,
-        'height_utilization': height_utilization,
-        'weights': weights
-    }
+    Args:
+        boxes: Cajas a paletizar (lista, generador o BoxBatch)
+        max_width: Ancho máximo del pallet
+        max_length: Largo máximo del pallet
+        max_height: Alto máximo del pallet
+        max_weight: Peso máximo del pallet
+        height_tolerance: Fracción de la altura de capa que una caja puede quedarse por debajo
+        **pallet_options: Restricciones de colocación de cada Pallet (ver Pallet)
     
-    return quality_score, components 
+    Returns:
+        Lista de pallets con las cajas asignadas
+    """
+    boxes = list(boxes)
+    orientations, dims = _orientation_tables(boxes)
+    weights = np.array([box.weight for box in boxes], dtype=np.float64)
+    rotatable = [box.rotation != 'fixed' for box in boxes]
+    pending = np.ones(len(boxes), dtype=bool)
+    pallets: List[Pallet] = []
+    pallet = None
+    while pending.any():
+        if pallet is None:
+            pallet = Pallet(max_width, max_length, max_height, max_weight, **pallet_options)
+            pallets.append(pallet)
+        chosen, footprints = _fill_layer(pallet, pending, orientations, dims, weights, height_tolerance,
+                                         rotatable)
+        if not chosen:
+            if pallet.boxes:
+                pallet = None  # Pallet lleno: la siguiente capa va a uno nuevo
+            else:
+                first = int(np.argmax(pending))
+                pending[first] = False
+                print(f"Advertencia: La caja {boxes[first].id} no pudo ser colocada en ningún pallet")
+            continue
+        layer_boxes = []
+        for index, orientation in chosen:
+            if orientation != boxes[index].orientation:
+                set_orientation(boxes[index], orientation)
+            layer_boxes.append(boxes[index])
+        # El skyline llena desde una esquina: se refleja la capa si así equilibra mejor el pallet
+        footprints = pallet.balanced_footprints(layer_boxes, footprints)
+        if not pallet.place_layer(layer_boxes, footprints, 'skyline'):
+            # Las restricciones del pallet (centro de gravedad, apoyo, carga) rechazan la capa:
+            # se coloca la parte que admite y el resto sigue pendiente para las capas siguientes
+            keep = pallet.layer_fit(layer_boxes, footprints).tolist()
+            chosen = [pair for pair, kept in zip(chosen, keep) if kept]
+            footprints = [footprint for footprint, kept in zip(footprints, keep) if kept]
+            layer_boxes = [box for box, kept in zip(layer_boxes, keep) if kept]
+            if not chosen or not pallet.place_layer(layer_boxes, footprints, 'skyline'):
+                pallet = None  # Ninguna caja de la capa cabe: la capa va a un pallet nuevo
+                continue
+        for index, _ in chosen:
+            pending[index] = False
+    return [pallet for pallet in pallets if pallet.boxes]
+
+def _orientation_tables(boxes: List[Box]) -> Tuple[np.ndarray, np.ndarray]:
+    """Orientaciones admitidas de cada caja en arrays (n, 6) y (n, 6, 3), rellenos con inf."""
+    orientations = np.full((len(boxes), 6), -1, dtype=int)
+    dims = np.full((len(boxes), 6, 3), np.inf)
+    for row, box in enumerate(boxes):
+        indices, table = allowed_orientations(box)
+        orientations[row, :len(indices)] = indices
+        dims[row, :len(indices)] = table
+    return orientations, dims
+
+def _fill_layer(pallet: Pallet, pending: np.ndarray, orientations: np.ndarray, dims: np.ndarray,
+                weights: np.ndarray, height_tolerance: float, rotatable: List[bool]
+                ) -> Tuple[List[Tuple[int, int]], List[Tuple[float, float, float, float]]]:
+    """
+    Rellena una capa para el pallet con las cajas pendientes de altura compatible.
+
+    Returns:
+        Pares (índice de caja, orientación) y la huella de cada caja en la capa
+    """
+    free_height = pallet.max_height - pallet.top_height
+    free_weight = pallet.max_weight - pallet.current_weight
+    heights = np.where(pending[:, None] & (weights[:, None] <= free_weight), dims[:, :, 2], np.inf)
+    heights[heights > free_height] = -np.inf  # Orientaciones que no caben sobre la carga
+    # Con una fracción mínima de apoyo, el skyline salta las posiciones que la carga no sostiene
+    accept = pallet.supports_footprint if pallet.min_support_ratio > 0 and pallet.top_height > 0 else None
+    while True:
+        tallest = heights.max(axis=1)
+        if not np.isfinite(tallest).any() or tallest.max() <= 0:
+            return [], []
+        layer_height = tallest.max()
+
+        # Para cada caja, la orientación más alta dentro de la tolerancia de la capa
+        in_layer = np.where(heights >= layer_height * (1 - height_tolerance), heights, -np.inf)
+        choice = in_layer.argmax(axis=1)
+        candidates = np.flatnonzero(np.isfinite(in_layer.max(axis=1)))
+        chosen, footprints = _pack_layer(pallet, candidates, choice, orientations, dims, weights,
+                                         free_weight, rotatable, accept)
+        if chosen:
+            return chosen, footprints
+        # Ninguna caja de esta altura se sostiene sobre la carga: se prueba con la siguiente
+        heights[np.isfinite(in_layer)] = -np.inf
+
+def _pack_layer(pallet: Pallet, candidates: np.ndarray, choice: np.ndarray, orientations: np.ndarray,
+                dims: np.ndarray, weights: np.ndarray, free_weight: float, rotatable: List[bool],
+                accept) -> Tuple[List[Tuple[int, int]], List[Tuple[float, float, float, float]]]:
+    """Coloca con el skyline las cajas candidatas de una capa, de mayor a menor huella."""
+    footprint = dims[candidates, choice[candidates], :2]
+    # De mayor a menor huella; a igual huella se respeta el orden de llegada
+    order = np.argsort(-(footprint[:, 0] * footprint[:, 1]), kind='stable')
+
+    packer = SkylinePacker(pallet.max_width, pallet.max_length)
+    free_area = pallet.max_width * pallet.max_length
+    failed = set()  # Huellas que ya no caben en esta capa
+    chosen, footprints = [], []
+    for position in order:
+        index = int(candidates[position])
+        width, length = footprint[position].tolist()
+        key = (width, length, rotatable[index])
+        if weights[index] > free_weight or width * length > free_area - packer.used_area or key in failed:
+            continue
+        placed = packer.insert(width, length, rotate=rotatable[index], accept=accept)
+        if placed is None:
+            failed.add(key)
+            continue
+        chosen.append((index, int(orientations[index, choice[index]])))
+        footprints.append(placed)
+        free_weight -= weights[index]
+    return chosen, footprints
 
-def best_fit_lookahead_palletization(boxes: List[Box], max_width: float, max_length: float, max_height: float, max_weight: float, lookahead: int = 3) -> List[Pallet]:
+def best_fit_lookahead_palletization(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float, max_weight: float, lookahead: int = 3,
+                                     **pallet_options) -> List[Pallet]:
     """
     Algoritmo Best-Fit Lookahead para palletización.
     Considera las próximas N cajas para tomar una mejor decisión sobre dónde colocar la caja actual.
     
     Args:
-        boxes: Lista de cajas a paletizar
+        boxes: Cajas a paletizar (lista, generador o BoxBatch)
         max_width: Ancho máximo del pallet
         max_length: Largo máximo del pallet
         max_height: Alto máximo del pallet
         max_weight: Peso máximo del pallet
         lookahead: Número de cajas futuras a considerar (por defecto 3)
+        **pallet_options: Restricciones de colocación de cada Pallet (ver Pallet)
     
     Returns:
         Lista de pallets con las cajas asignadas
     """
-    pallets = []
-    current_pallet = Pallet(max_width, max_length, max_height, max_weight)
-    pallets.append(current_pallet)
+    index = PalletIndex()
     
-    # Convertir la lista de cajas en una cola para poder mirar adelante
-    boxes_queue = boxes.copy()
+    # Ventana de las próximas cajas: solo se leen de la entrada las que se miran
+    pending = iter(boxes)
+    boxes_queue = deque(islice(pending, lookahead + 1))
     
     while boxes_queue:
-        current_box = boxes_queue.pop(0)
+        current_box = boxes_queue.popleft()
+        boxes_queue.extend(islice(pending, 1))
         best_pallet = None
         best_score = float('-inf')
         
         # Obtener las próximas N cajas para el lookahead
-        next_boxes = boxes_queue[:lookahead]
+        next_boxes = list(islice(boxes_queue, lookahead))
         
-        for pallet in pallets:
-            if pallet.can_place_box(current_box):
-                # Calcular el score para este pallet considerando las cajas futuras
-                score = calculate_pallet_score(pallet, current_box, next_boxes, max_width, max_length, max_height, max_weight)
-                
-                if score > best_score:
-                    best_score = score
-                    best_pallet = pallet
+        # El índice descarta los pallets sin peso, altura o volumen suficientes
+        for position in index.iter_first_fit(current_box):
+            pallet = index.pallets[position]
+            # Calcular el score para este pallet considerando las cajas futuras
+            score = calculate_pallet_score(pallet, current_box, next_boxes, max_width, max_length, max_height, max_weight)
+            
+            if score > best_score:
+                best_score = score
+                best_pallet = position
         
-        if best_pallet:
-            best_pallet.place_box(current_box)
+        if best_pallet is not None:
+            index.pallets[best_pallet].place_box(current_box)
+            index.update(best_pallet)
         else:
             # Si no se encontró un pallet adecuado, crear uno nuevo
-            new_pallet = Pallet(max_width, max_length, max_height, max_weight)
+            new_pallet = Pallet(max_width, max_length, max_height, max_weight, **pallet_options)
             if new_pallet.place_box(current_box):
-                pallets.append(new_pallet)
+                index.add(new_pallet)
             else:
                 print(f"Advertencia: La caja {current_box.id} no pudo ser colocada en ningún pallet")
     
-    return pallets
+    return index.pallets
 
 def calculate_pallet_score(pallet: Pallet, current_box: Box, next_boxes: List[Box], max_width: float, max_length: float, max_height: float, max_weight: float) -> float:
     """
@@ -283,45 +333,55 @@ def calculate_pallet_score(pallet: Pallet, current_box: Box, next_boxes: List[Bo
     2. Potencial para colocar las próximas cajas
     3. Estabilidad del pallet
     """
-    # Crear una copia temporal del pallet para simular la colocación
-    temp_pallet = Pallet(pallet.max_width, pallet.max_length, pallet.max_height, pallet.max_weight)
-    for box in pallet.boxes:
-        temp_pallet.place_box(box)
-    
-    # Intentar colocar la caja actual
-    if not temp_pallet.place_box(current_box):
-        return float('-inf')
-    
-    # 1. Calcular utilización del espacio
-    space_utilization = 1 - (temp_pallet.remaining_volume() / temp_pallet.volume())
+    # Simular la colocación sobre el propio pallet: se deshace al salir del bloque
+    with pallet.trial() as temp_pallet:
+        # Intentar colocar la caja actual
+        if not temp_pallet.place_box(current_box):
+            return float('-inf')
+        
+        # 1. Calcular utilización del espacio
+        space_utilization = 1 - (temp_pallet.remaining_volume() / temp_pallet.volume())
     
-    # 2. Calcular potencial para las próximas cajas
-    next_boxes_score = 0.0
-    if next_boxes:
-        # Intentar colocar las próximas cajas
-        placed_count = 0
-        for next_box in next_boxes:
-            if temp_pallet.can_place_box(next_box):
-                placed_count += 1
-        next_boxes_score = placed_count / len(next_boxes)
+        # 2. Calcular potencial para las próximas cajas
+        next_boxes_score = 0.0
+        if next_boxes:
+            # Intentar colocar las próximas cajas
+            placed_count = 0
+            for next_box in next_boxes:
+                if temp_pallet.can_place_box(next_box):
+                    placed_count += 1
+            next_boxes_score = placed_count / len(next_boxes)
     
-    # 3. Calcular estabilidad
-    stability_score = temp_pallet.get_stability_score()
+        # 3. Calcular estabilidad
+        stability_score = temp_pallet.get_stability_score()
     
-    # 4. Calcular distribución del peso
-    center_of_mass = temp_pallet.get_center_of_mass()
-    ideal_center = (max_width/2, max_length/2, 0)
-    weight_distribution = 1 - (
-        abs(center_of_mass[0] - ideal_center[0]) / (max_width/2) +
-        abs(center_of_mass[1] - ideal_center[1]) / (max_length/2)
-    ) / 2
+        # 4. Calcular distribución del peso
+        center_of_mass = temp_pallet.get_center_of_mass()
+        ideal_center = (max_width/2, max_length/2, 0)
+        weight_distribution = 1 - (
+            abs(center_of_mass[0] - ideal_center[0]) / (max_width/2) +
+            abs(center_of_mass[1] - ideal_center[1]) / (max_length/2)
+        ) / 2
     
-    # Combinar los scores con pesos
-    final_score = (
-        0.4 * space_utilization +      # 40% importancia al uso del espacio
-        0.3 * next_boxes_score +       # 30% importancia al potencial futuro
-        0.2 * stability_score +        # 20% importancia a la estabilidad
-        0.1 * weight_distribution      # 10% importancia a la distribución del peso
-    )
+        # Combinar los scores con pesos
+        final_score = (
+            0.4 * space_utilization +      # 40% importancia al uso del espacio
+            0.3 * next_boxes_score +       # 30% importancia al potencial futuro
+            0.2 * stability_score +        # 20% importancia a la estabilidad
+            0.1 * weight_distribution      # 10% importancia a la distribución del peso
+        )
     
-    return final_score 
\ No newline at end of file
+        return final_score
+
+# Algoritmos registrados: nombre visible -> función con la firma
+# (boxes, max_width, max_length, max_height, max_weight, **pallet_options) -> List[Pallet]
+ALGORITHMS = {
+    "First-Fit": first_fit_palletization,
+    "Best-Fit Decreasing": best_fit_decreasing_palletization,
+    "First-Fit Decreasing": first_fit_decreasing_palletization,
+    "Guillotine": guillotine_palletization,
+    "EMS": ems_palletization,
+    "Best-Fit Lookahead": best_fit_lookahead_palletization,
+    "Capas por SKU": sku_layer_palletization,
+    "Capas (skyline)": layer_palletization,
+}
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+import numpy as np
+from .box import Box
+from .box_batch import BoxBatch
+from .heightmap import EPSILON
+from .orientation import allowed_orientations
+
+# Proyecciones para L1/L2: (ejes del plano, eje de apilado); 0 = ancho, 1 = largo, 2 = alto
+PROJECTIONS = (((0, 2), 1), ((0, 1), 2), ((1, 2), 0))
+
+# Máximo de valores de p (y de q) evaluados por cota. Cualquier p da una cota
+# válida, así que muestrear los puntos de ruptura solo puede aflojarla, y
+# mantiene el coste lineal en el número de cajas con medidas continuas.
+MAX_BREAKPOINTS_L1 = 256
+MAX_BREAKPOINTS_L2 = 64
+
+@dataclass
+class LowerBounds:
+    """Cotas inferiores del número de pallets de una instancia."""
+    volume: int
+    weight: int
+    l1: int
+    l2: int
+
+    @property
+    def best(self) -> int:
+        return max(self.volume, self.weight, self.l1, self.l2)
+
+    def gap(self, pallet_count: int) -> float:
+        """Distancia relativa de un plan a la mejor cota: 0 significa óptimo demostrado."""
+        if self.best == 0:
+            return 0.0
+        return (pallet_count - self.best) / self.best
+
+def _ceil(value: np.ndarray) -> np.ndarray:
+    """Techo tolerante al redondeo: 2.0000000001 cuenta como 2."""
+    return np.ceil(np.asarray(value) - EPSILON)
+
+def _breakpoints(sizes: np.ndarray, capacity: float, limit: int) -> np.ndarray:
+    """Valores de p en (0, capacity/2] donde cambian los conjuntos de las cotas (como mucho limit)."""
+    candidates = np.concatenate([sizes, capacity - sizes, [capacity / 2]])
+    candidates = np.unique(candidates[(candidates > EPSILON) & (candidates <= capacity / 2 + EPSILON)])
+    if len(candidates) > limit:
+        candidates = candidates[np.linspace(0, len(candidates) - 1, limit).round().astype(int)]
+    return candidates
+
+def _l1_projection(dims: np.ndarray, container: np.ndarray, plane: Tuple[int, int], depth_axis: int) -> int:
+    """Cota L1 de Martello, Pisinger y Vigo para una proyección.
+
+    Las cajas que ocupan más de la mitad de ambos lados del plano no pueden
+    ponerse una junto a otra en él, así que se apilan a lo largo del eje
+    restante y el problema se reduce a la cota L2 de Martello y Toth en 1D.
+    """
+    a, b = plane
+    big = (dims[:, a] > container[a] / 2) & (dims[:, b] > container[b] / 2)
+    depths = dims[big, depth_axis]
+    capacity = container[depth_axis]
+    if len(depths) == 0:
+        return 0
+
+    p = _breakpoints(depths, capacity, MAX_BREAKPOINTS_L1)[:, None]  # (P, 1) frente a (1, m)
+    d = depths[None, :]
+    j1 = d > capacity - p
+    j2 = (d <= capacity - p) & (d > capacity / 2)
+    j3 = (d <= capacity / 2) & (d >= p)
+
+    by_size = _ceil((np.sum(d * j3, axis=1) - (np.sum(j2, axis=1) * capacity - np.sum(d * j2, axis=1))) / capacity)
+    slots = np.floor((capacity - d) / p + EPSILON) * j2
+    by_count = _ceil((np.sum(j3, axis=1) - np.sum(slots, axis=1)) / np.floor(capacity / p[:, 0] + EPSILON))
+    bounds = np.sum(j1 | j2, axis=1) + np.maximum(0, np.maximum(by_size, by_count))
+    return int(bounds.max())
+
+def _l2_projection(dims: np.ndarray, volumes: np.ndarray, container: np.ndarray, plane: Tuple[int, int],
+                   depth_axis: int, l1: int) -> int:
+    """Cota L2 de Martello, Pisinger y Vigo para una proyección.
+
+    Una caja con lados > (A - p, B - q) en el plano no deja sitio a su lado
+    para ninguna caja con lados >= (p, q): en su tramo de profundidad el
+    pallet entero queda inutilizado para ellas. Lo que el volumen de esas
+    cajas pequeñas no quepa en el resto de los L1 pallets exige pallets extra.
+    Los lados de dims deciden qué cajas entran en cada grupo; volumes es el
+    volumen real de cada caja, que no cambia al girarla.
+    """
+    a, b = plane
+    side_a, side_b, depth = container[a], container[b], container[depth_axis]
+    # Con las cajas ordenadas por el lado b, cada suma sobre "lado b > umbral"
+    # es una resta de sumas acumuladas: O(n) por valor de p para todos los q
+    order = np.argsort(dims[:, b], kind='stable')
+    sides_a = dims[order, a]
+    sides_b = dims[order, b]
+    volumes = volumes[order]
+    depths = dims[order, depth_axis]
+
+    def sum_above(values: np.ndarray, thresholds: np.ndarray, inclusive: bool) -> np.ndarray:
+        cumulative = np.concatenate([[0.0], np.cumsum(values)])
+        index = np.searchsorted(sides_b, thresholds, side='left' if inclusive else 'right')
+        return cumulative[-1] - cumulative[index]
+
+    best = l1
+    q = _breakpoints(sides_b, side_b, MAX_BREAKPOINTS_L2)
+    for p in _breakpoints(sides_a, side_a, MAX_BREAKPOINTS_L2):
+        # Como p <= A/2 y q <= B/2, las cajas "verticales" son un subconjunto de las de lados >= (p, q)
+        vertical = sides_a > side_a - p
+        large = sides_a >= p
+        vertical_depth = sum_above(depths * vertical, side_b - q, inclusive=False)
+        small_volume = (sum_above(volumes * large, q, inclusive=True) -
+                        sum_above(volumes * vertical, side_b - q, inclusive=False))
+        free = (depth * l1 - vertical_depth) * side_a * side_b
+        extra = _ceil((small_volume - free) / (side_a * side_b * depth))
+        best = max(best, l1 + int(np.maximum(0, extra).max()))
+    return best
+
+def _as_arrays(boxes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Lados para las comprobaciones por eje, volumen y peso de cada caja."""
+    if isinstance(boxes, BoxBatch):
+        dims = np.column_stack([boxes.widths, boxes.lengths, boxes.heights])
+        return dims, np.prod(dims, axis=1), np.asarray(boxes.weights)
+    boxes = list(boxes)
+    # Para los lados, una caja que puede girar se sustituye por el menor lado
+    # que tiene en cada eje en alguna orientación: en cualquier solución con
+    # giros sus lados son al menos esos, así que las pruebas de L1/L2 siguen
+    # siendo válidas. El volumen no cambia al girar y se toma de la caja
+    dims = np.array([(box.width, box.length, box.height) if box.rotation == 'fixed'
+                     else allowed_orientations(box)[1].min(axis=0) for box in boxes],
+                    dtype=np.float64).reshape(-1, 3)
+    volumes = np.array([box.volume() for box in boxes], dtype=np.float64)
+    weights = np.array([box.weight for box in boxes], dtype=np.float64)
+    return dims, volumes, weights
+
+def lower_bounds(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float,
+                 max_weight: float) -> LowerBounds:
+    """
+    Calcula cotas inferiores del número de pallets.
+
+    Args:
+        boxes: Cajas o BoxBatch de la instancia
+        max_width: Ancho máximo del pallet
+        max_length: Largo máximo del pallet
+        max_height: Alto máximo del pallet
+        max_weight: Peso máximo del pallet
+
+    Returns:
+        LowerBounds con las cotas continuas de volumen y peso y las L1/L2
+    """
+    dims, volumes, weights = _as_arrays(boxes)
+    if len(dims) == 0:
+        return LowerBounds(0, 0, 0, 0)
+    container = np.array([max_width, max_length, max_height], dtype=np.float64)
+
+    volume = int(_ceil(volumes.sum() / np.prod(container)))
+    weight = int(_ceil(weights.sum() / max_weight))
+    l1_values = [_l1_projection(dims, container, plane, axis) for plane, axis in PROJECTIONS]
+    l2 = max(_l2_projection(dims, volumes, container, plane, axis, l1)
+             for (plane, axis), l1 in zip(PROJECTIONS, l1_values))
+    return LowerBounds(volume=volume, weight=weight, l1=max(l1_values), l2=l2)
@@ -1,16 +1,48 @@
-from dataclasses import dataclass
 from typing import Tuple
 
-@dataclass
 class Box:
-    """Representa una caja con sus dimensiones y peso."""
-    id: int
-    width: float
-    length: float
-    height: float
-    weight: float
-    position: Tuple[float, float, float] = (0, 0, 0)  # (x, y, z)
+    """Representa una caja con sus dimensiones y peso.
+
+    Se comporta como la antigua dataclass (mismos campos, igualdad y repr),
+    pero usa __slots__: sin __dict__ por instancia, cada caja ocupa una
+    fracción de la memoria en pedidos con millones de cajas.
+
+    rotation indica qué orientaciones admite la caja (ver
+    orientation.ROTATION_MODES) y orientation la que tiene ahora; width,
+    length y height son siempre las dimensiones en esa orientación. Como
+    en un campo de dataclass con repr=False y compare=False, no aparecen en
+    repr ni cuentan para la igualdad. Lo mismo ocurre con max_load, el peso
+    máximo que la caja admite encima (por defecto, sin límite).
+    """
+    __slots__ = ('id', 'width', 'length', 'height', 'weight', 'position', 'rotation', 'orientation',
+                 'max_load')
+    __hash__ = None  # Mutable, como la dataclass original
+
+    def __init__(self, id: int, width: float, length: float, height: float, weight: float,
+                 position: Tuple[float, float, float] = (0, 0, 0),  # (x, y, z)
+                 rotation: str = 'fixed', orientation: int = 0, max_load: float = float('inf')):
+        self.id = id
+        self.width = width
+        self.length = length
+        self.height = height
+        self.weight = weight
+        self.position = position
+        self.rotation = rotation
+        self.orientation = orientation
+        self.max_load = max_load
+
+    def _fields(self) -> tuple:
+        return (self.id, self.width, self.length, self.height, self.weight, self.position)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Box):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (f"Box(id={self.id!r}, width={self.width!r}, length={self.length!r}, "
+                f"height={self.height!r}, weight={self.weight!r}, position={self.position!r})")
 
     def volume(self) -> float:
         """Calcula el volumen de la caja."""
-        return self.width * self.length * self.height 
\ No newline at end of file
+        return self.width * self.length * self.height
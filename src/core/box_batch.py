@@ -0,0 +1,188 @@
+from typing import Iterator, Sequence, Tuple
+import numpy as np
+from .box import Box
+
+# Registro binario de una caja: mismo orden de campos que los CSV de entrada
+BOX_DTYPE = np.dtype([
+    ('id', np.int64),
+    ('width', np.float64),
+    ('length', np.float64),
+    ('height', np.float64),
+    ('weight', np.float64),
+])
+
+# Cajas convertidas a objetos Python de una vez al recorrer un lote
+_ITER_CHUNK = 65_536
+
+class BoxBatch:
+    """Lote de cajas guardado por columnas.
+
+    Cada atributo es un array de NumPy con una entrada por caja, normalmente
+    una vista sobre el fichero de entrada (memmap de .npy o buffer de Arrow),
+    así que cargar el lote no copia datos ni crea un objeto por fila. Las
+    posiciones se guardan en un array (n, 3) propio del lote. Al recorrerlo
+    se obtienen BoxView: vistas con la interfaz de Box que leen y escriben
+    directamente en los arrays.
+    """
+    def __init__(self, ids: np.ndarray, widths: np.ndarray, lengths: np.ndarray,
+                 heights: np.ndarray, weights: np.ndarray):
+        self.ids = np.asarray(ids)
+        self.widths = np.asarray(widths)
+        self.lengths = np.asarray(lengths)
+        self.heights = np.asarray(heights)
+        self.weights = np.asarray(weights)
+        sizes = {len(column) for column in self.columns()}
+        if len(sizes) > 1:
+            raise ValueError("Todas las columnas del lote deben tener la misma longitud")
+        self.positions = np.zeros((len(self.ids), 3), dtype=np.float64)
+
+    @classmethod
+    def from_structured(cls, records: np.ndarray) -> 'BoxBatch':
+        """Crea un lote a partir de un array estructurado sin copiar las columnas."""
+        missing = [name for name in BOX_DTYPE.names if name not in (records.dtype.names or ())]
+        if missing:
+            raise ValueError(f"Faltan columnas en el array de cajas: {missing}")
+        return cls(*(records[name] for name in BOX_DTYPE.names))
+
+    @classmethod
+    def from_boxes(cls, boxes: Sequence[Box]) -> 'BoxBatch':
+        """Crea un lote a partir de objetos Box."""
+        records = np.array([(box.id, box.width, box.length, box.height, box.weight) for box in boxes],
+                           dtype=BOX_DTYPE)
+        return cls.from_structured(records)
+
+    def columns(self) -> tuple:
+        return (self.ids, self.widths, self.lengths, self.heights, self.weights)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def volumes(self) -> np.ndarray:
+        """Volumen de cada caja."""
+        return self.widths * self.lengths * self.heights
+
+    def take(self, indices: np.ndarray) -> 'BoxBatch':
+        """Devuelve un lote con las cajas de los índices dados, en ese orden."""
+        batch = BoxBatch(*(column[indices] for column in self.columns()))
+        batch.positions[:] = self.positions[indices]
+        return batch
+
+    def volume_order(self, descending: bool = True) -> np.ndarray:
+        """Índices de las cajas por volumen, con una ordenación estable (como sorted())."""
+        volumes = self.volumes()
+        return np.argsort(-volumes if descending else volumes, kind='stable')
+
+    def sorted_by_volume(self, descending: bool = True) -> Iterator['BoxView']:
+        """Recorre las cajas por volumen; las vistas siguen apuntando a este lote."""
+        for index in self.volume_order(descending).tolist():
+            yield BoxView(self, index)
+
+    def to_structured(self) -> np.ndarray:
+        """Devuelve el lote como array estructurado con BOX_DTYPE."""
+        records = np.empty(len(self), dtype=BOX_DTYPE)
+        for name, column in zip(BOX_DTYPE.names, self.columns()):
+            records[name] = column
+        return records
+
+    def box(self, index: int) -> Box:
+        """Construye un objeto Box independiente con la caja en la posición dada."""
+        return Box(id=int(self.ids[index]), width=float(self.widths[index]),
+                   length=float(self.lengths[index]), height=float(self.heights[index]),
+                   weight=float(self.weights[index]),
+                   position=tuple(self.positions[index].tolist()))
+
+    def view(self, index: int) -> 'BoxView':
+        """Devuelve una vista de la caja en la posición dada."""
+        return BoxView(self, index)
+
+    def __iter__(self) -> Iterator['BoxView']:
+        """Recorre el lote creando una vista por caja solo cuando se pide."""
+        for index in range(len(self)):
+            yield BoxView(self, index)
+
+    def boxes(self) -> Iterator[Box]:
+        """Recorre el lote creando objetos Box independientes."""
+        # tolist() por bloques evita un acceso escalar a NumPy por campo y caja
+        for start in range(0, len(self), _ITER_CHUNK):
+            stop = start + _ITER_CHUNK
+            columns = [column[start:stop].tolist() for column in self.columns()]
+            positions = self.positions[start:stop].tolist()
+            for box_id, width, length, height, weight, position in zip(*columns, positions):
+                yield Box(id=box_id, width=width, length=length, height=height, weight=weight,
+                          position=tuple(position))
+
+    def __repr__(self) -> str:
+        return f"BoxBatch({len(self)} cajas)"
+
+class BoxView:
+    """Vista de una caja de un BoxBatch con la interfaz de Box.
+
+    Solo guarda el lote y el índice; los atributos se leen de los arrays y
+    position se escribe en BoxBatch.positions, así que colocar millones de
+    cajas no duplica su geometría en objetos Python.
+    """
+    __slots__ = ('batch', 'index')
+    __hash__ = None
+
+    def __init__(self, batch: BoxBatch, index: int):
+        self.batch = batch
+        self.index = index
+
+    @property
+    def id(self) -> int:
+        return int(self.batch.ids[self.index])
+
+    @property
+    def width(self) -> float:
+        return float(self.batch.widths[self.index])
+
+    @property
+    def length(self) -> float:
+        return float(self.batch.lengths[self.index])
+
+    @property
+    def height(self) -> float:
+        return float(self.batch.heights[self.index])
+
+    @property
+    def weight(self) -> float:
+        return float(self.batch.weights[self.index])
+
+    @property
+    def position(self) -> Tuple[float, float, float]:
+        return tuple(self.batch.positions[self.index].tolist())
+
+    # Las dimensiones se leen del lote: una vista no se puede girar
+    rotation = 'fixed'
+    orientation = 0
+    max_load = float('inf')  # Sin límite de carga encima
+
+    @position.setter
+    def position(self, value: Tuple[float, float, float]) -> None:
+        self.batch.positions[self.index] = value
+
+    def volume(self) -> float:
+        """Calcula el volumen de la caja."""
+        return self.width * self.length * self.height
+
+    def detach(self) -> Box:
+        """Copia la caja a un objeto Box independiente del lote."""
+        return self.batch.box(self.index)
+
+    def __copy__(self) -> Box:
+        return self.detach()
+
+    def __deepcopy__(self, memo: dict) -> Box:
+        return self.detach()
+
+    def _fields(self) -> tuple:
+        return (self.id, self.width, self.length, self.height, self.weight, self.position)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (Box, BoxView)):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (f"BoxView(id={self.id!r}, width={self.width!r}, length={self.length!r}, "
+                f"height={self.height!r}, weight={self.weight!r}, position={self.position!r})")
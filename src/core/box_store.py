@@ -0,0 +1,167 @@
+from typing import Sequence, Tuple
+import numpy as np
+
+from .heightmap import EPSILON
+
+# Máximo de comparaciones caja-candidato que se evalúan en un solo bloque
+CHUNK_SIZE = 1_000_000
+
+class BoxStore:
+    """Almacén columnar (struct-of-arrays) con la geometría de las cajas de un pallet.
+
+    Guarda posiciones, dimensiones y pesos en arrays de NumPy que crecen por
+    duplicación, de modo que las comprobaciones de colisión y soporte se
+    evalúan contra todas las cajas en una sola expresión vectorizada.
+    """
+    def __init__(self, capacity: int = 16):
+        self.size = 0
+        self._mins = np.empty((capacity, 3), dtype=np.float64)
+        self._maxs = np.empty((capacity, 3), dtype=np.float64)
+        self._weights = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def mins(self) -> np.ndarray:
+        """Esquinas inferiores (x, y, z) de las cajas almacenadas."""
+        return self._mins[:self.size]
+
+    @property
+    def maxs(self) -> np.ndarray:
+        """Esquinas superiores (x + ancho, y + largo, z + alto) de las cajas."""
+        return self._maxs[:self.size]
+
+    @property
+    def dims(self) -> np.ndarray:
+        """Dimensiones (ancho, largo, alto) de las cajas."""
+        return self.maxs - self.mins
+
+    @property
+    def weights(self) -> np.ndarray:
+        """Pesos de las cajas."""
+        return self._weights[:self.size]
+
+    def append(self, position: Sequence[float], dims: Sequence[float], weight: float) -> None:
+        """Añade una caja, duplicando la capacidad si hace falta."""
+        if self.size == len(self._weights):
+            capacity = max(16, 2 * self.size)
+            self._mins = self._grow(self._mins, capacity)
+            self._maxs = self._grow(self._maxs, capacity)
+            self._weights = self._grow(self._weights, capacity)
+        self._mins[self.size] = position
+        self._maxs[self.size] = np.add(position, dims)
+        self._weights[self.size] = weight
+        self.size += 1
+
+    @staticmethod
+    def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def collides(self, position: Sequence[float], dims: Sequence[float]) -> bool:
+        """Verifica si una caja en la posición dada se solapa con alguna almacenada."""
+        lo = np.asarray(position, dtype=np.float64)
+        hi = lo + np.asarray(dims, dtype=np.float64)
+        return bool(np.any(np.all((lo < self.maxs) & (hi > self.mins), axis=1)))
+
+    def collides_many(self, positions: np.ndarray, dims: np.ndarray) -> np.ndarray:
+        """Evalúa colisiones para k candidatos a la vez.
+
+        Args:
+            positions: Array (k, 3) con las posiciones candidatas
+            dims: Array (3,) o (k, 3) con las dimensiones de cada candidato
+
+        Returns:
+            Array booleano (k,) con True donde el candidato colisiona
+        """
+        lo = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        hi = lo + np.broadcast_to(np.asarray(dims, dtype=np.float64), lo.shape)
+        result = np.zeros(len(lo), dtype=bool)
+        if self.size == 0 or len(lo) == 0:
+            return result
+        # Solo pueden chocar las cajas que solapan la envolvente de los candidatos:
+        # con candidatos próximos (p. ej. un bloque ordenado por altura) quedan pocas
+        near = np.all((lo.min(axis=0) < self.maxs) & (hi.max(axis=0) > self.mins), axis=1)
+        mins, maxs = self.mins[near], self.maxs[near]
+        if len(mins) == 0:
+            return result
+        step = max(1, CHUNK_SIZE // len(mins))
+        for start in range(0, len(lo), step):
+            block = slice(start, start + step)
+            overlap = ((lo[block, None, :] < maxs[None, :, :]) &
+                       (hi[block, None, :] > mins[None, :, :]))
+            result[block] = np.any(np.all(overlap, axis=2), axis=1)
+        return result
+
+    def free_rays(self, points: np.ndarray, start: int = 0) -> np.ndarray:
+        """Distancia libre desde k puntos en +x, +y y +z hasta la primera caja almacenada.
+
+        Una caja colocada en el punto con algún lado mayor que la distancia de
+        su eje choca seguro con la caja que corta ese rayo, así que sirve
+        para descartar candidatos sin la prueba completa de colisiones.
+
+        Args:
+            points: Array (k, 3) con los puntos
+            start: Solo se consideran las cajas a partir de este índice
+
+        Returns:
+            Array (k, 3) con la distancia por eje (inf si ninguna caja corta el rayo)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        result = np.full(points.shape, np.inf)
+        mins, maxs = self.mins[start:], self.maxs[start:]
+        if len(mins) == 0 or len(points) == 0:
+            return result
+        step = max(1, CHUNK_SIZE // len(mins))
+        for begin in range(0, len(points), step):
+            block = points[begin:begin + step, None, :]
+            ahead = maxs[None, :, :] > block
+            inside = ahead & (mins[None, :, :] <= block)
+            for axis, (first, second) in enumerate(((1, 2), (0, 2), (0, 1))):
+                # El rayo corta la caja si la contiene en los otros dos ejes y la caja acaba por delante
+                crosses = inside[:, :, first] & inside[:, :, second] & ahead[:, :, axis]
+                gap = np.where(crosses, mins[None, :, axis] - block[:, :, axis], np.inf)
+                result[begin:begin + step, axis] = np.maximum(gap.min(axis=1), 0.0)
+        return result
+
+    def resting_heights(self, footprints: np.ndarray) -> np.ndarray:
+        """Altura a la que quedan apoyadas k huellas (x, y, width, length) al bajar sobre las cajas.
+
+        Cada huella descansa sobre la cara superior más alta de las cajas que
+        solapa en el plano XY, o en el suelo si no solapa ninguna.
+        """
+        rects = np.asarray(footprints, dtype=np.float64).reshape(-1, 4)
+        result = np.zeros(len(rects), dtype=np.float64)
+        if self.size == 0:
+            return result
+        lo = rects[:, :2]
+        hi = lo + rects[:, 2:]
+        step = max(1, CHUNK_SIZE // self.size)
+        for start in range(0, len(rects), step):
+            block = slice(start, start + step)
+            overlap = np.all((lo[block, None, :] < self.maxs[None, :, :2]) &
+                             (hi[block, None, :] > self.mins[None, :, :2]), axis=2)
+            result[block] = np.where(overlap, self.maxs[None, :, 2], 0.0).max(axis=1)
+        return result
+
+    def tops_at(self, z: float) -> np.ndarray:
+        """Índices de las cajas cuya cara superior está a la altura z."""
+        return np.flatnonzero(np.abs(self.maxs[:, 2] - z) <= EPSILON)
+
+    def project(self, point: Tuple[float, float, float], axis: int) -> float:
+        """Proyecta un punto hacia el origen a lo largo de un eje.
+
+        Devuelve la coordenada de la primera cara que encuentra el punto al
+        desplazarse en sentido negativo por el eje, o 0 si llega a la pared.
+        """
+        if self.size == 0:
+            return 0
+        p = np.asarray(point, dtype=np.float64)
+        others = [a for a in range(3) if a != axis]
+        mask = self.maxs[:, axis] <= p[axis]
+        for a in others:
+            mask &= (self.mins[:, a] <= p[a]) & (p[a] < self.maxs[:, a])
+        faces = self.maxs[mask, axis]
+        return float(faces.max()) if len(faces) else 0
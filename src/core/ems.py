@@ -0,0 +1,161 @@
+import time
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+from .heightmap import EPSILON
+
+# Reglas para elegir un EMS (menor puntuación es mejor)
+EMS_SCORE_RULES = (
+    'bottom_left',
+    'best_volume_fit',
+    'best_short_side_fit',
+    'best_long_side_fit',
+)
+
+class EMSTracker:
+    """Conjunto de espacios máximos vacíos (EMS) de un pallet.
+
+    Cada EMS es un cuboide libre que no está contenido en ningún otro. Al
+    colocar una caja, cada EMS que la intersecta se sustituye por los hasta
+    seis cuboides que quedan a sus lados y se eliminan los que quedan
+    contenidos en otro (poda por contención).
+    """
+    def __init__(self, width: float, length: float, height: float, min_size: float = 0.0):
+        self.min_size = min_size
+        self.mins = np.zeros((1, 3), dtype=np.float64)
+        self.maxs = np.array([[width, length, height]], dtype=np.float64)
+        self.stats: Dict[str, float] = {
+            'updates': 0,
+            'spaces': 1,
+            'max_spaces': 1,
+            'spaces_created': 0,
+            'spaces_pruned': 0,
+            'candidates_evaluated': 0,
+            'last_update_seconds': 0.0,
+            'total_update_seconds': 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self.mins)
+
+    def update(self, position: Sequence[float], dims: Sequence[float]) -> None:
+        """Actualiza los EMS tras ocupar el cuboide de una caja."""
+        start = time.perf_counter()
+        lo = np.asarray(position, dtype=np.float64)
+        hi = lo + np.asarray(dims, dtype=np.float64)
+
+        hit = np.all((self.mins < hi) & (self.maxs > lo), axis=1)
+        kept_mins, kept_maxs = self.mins[~hit], self.maxs[~hit]
+
+        # Cada EMS intersectado genera un cuboide por cada cara libre de la caja
+        new_mins, new_maxs = [], []
+        for space_min, space_max in zip(self.mins[hit], self.maxs[hit]):
+            for axis in range(3):
+                if space_min[axis] < lo[axis]:
+                    upper = space_max.copy()
+                    upper[axis] = lo[axis]
+                    new_mins.append(space_min)
+                    new_maxs.append(upper)
+                if space_max[axis] > hi[axis]:
+                    lower = space_min.copy()
+                    lower[axis] = hi[axis]
+                    new_mins.append(lower)
+                    new_maxs.append(space_max)
+
+        created = len(new_mins)
+        if created:
+            new_mins = np.array(new_mins)
+            new_maxs = np.array(new_maxs)
+            large = np.all(new_maxs - new_mins >= max(self.min_size, EPSILON), axis=1)
+            new_mins, new_maxs = new_mins[large], new_maxs[large]
+            keep = self._maximal(new_mins, new_maxs, kept_mins, kept_maxs)
+            self.mins = np.vstack([kept_mins, new_mins[keep]])
+            self.maxs = np.vstack([kept_maxs, new_maxs[keep]])
+            pruned = created - int(np.count_nonzero(keep))
+        else:
+            self.mins, self.maxs = kept_mins, kept_maxs
+            pruned = 0
+
+        elapsed = time.perf_counter() - start
+        self.stats['updates'] += 1
+        self.stats['spaces'] = len(self.mins)
+        self.stats['max_spaces'] = max(self.stats['max_spaces'], len(self.mins))
+        self.stats['spaces_created'] += created
+        self.stats['spaces_pruned'] += pruned
+        self.stats['last_update_seconds'] = elapsed
+        self.stats['total_update_seconds'] += elapsed
+
+    @staticmethod
+    def _maximal(new_mins: np.ndarray, new_maxs: np.ndarray,
+                 kept_mins: np.ndarray, kept_maxs: np.ndarray) -> np.ndarray:
+        """Máscara de los EMS nuevos que no están contenidos en ningún otro.
+
+        Los EMS conservados ya eran maximales y los nuevos son subconjuntos de
+        EMS anteriores, así que solo hace falta podar los nuevos.
+        """
+        inside_kept = np.any(
+            np.all(kept_mins[None, :, :] <= new_mins[:, None, :] + EPSILON, axis=2) &
+            np.all(kept_maxs[None, :, :] >= new_maxs[:, None, :] - EPSILON, axis=2),
+            axis=1) if len(kept_mins) else np.zeros(len(new_mins), dtype=bool)
+
+        contains = (np.all(new_mins[None, :, :] <= new_mins[:, None, :] + EPSILON, axis=2) &
+                    np.all(new_maxs[None, :, :] >= new_maxs[:, None, :] - EPSILON, axis=2))
+        # contains[i, j]: el EMS i está dentro del j. Entre duplicados sobrevive el primero
+        mutual = contains & contains.T
+        count = len(new_mins)
+        earlier = np.tri(count, k=-1, dtype=bool)
+        strictly_inside = contains & ~mutual
+        duplicate_of_earlier = mutual & earlier
+        return ~(inside_kept | np.any(strictly_inside | duplicate_of_earlier, axis=1))
+
+    def best_space(self, dims: Sequence[float], rule: str = 'bottom_left',
+                   allowed: Optional[np.ndarray] = None) -> Optional[int]:
+        """Devuelve el índice del mejor EMS para una caja según la regla dada.
+
+        Args:
+            dims: Dimensiones (ancho, largo, alto) de la caja
+            rule: Regla de puntuación (ver EMS_SCORE_RULES)
+            allowed: Máscara opcional de EMS admisibles (p. ej. origen soportado)
+        """
+        placement = self.best_placement([dims], rule, None if allowed is None else allowed[:, None])
+        return None if placement is None else placement[0]
+
+    def best_placement(self, table: Sequence[Sequence[float]], rule: str = 'bottom_left',
+                       allowed: Optional[np.ndarray] = None,
+                       penalty: Optional[np.ndarray] = None) -> Optional[Tuple[int, int]]:
+        """Devuelve el mejor par (EMS, orientación) para una caja que admite varias orientaciones.
+
+        Args:
+            table: Dimensiones de la caja en cada orientación, array (k, 3)
+            rule: Regla de puntuación (ver EMS_SCORE_RULES)
+            allowed: Máscara opcional (n_ems, k) de pares admisibles
+            penalty: Array opcional (n_ems, k) que se compara antes que la regla (menor es mejor)
+
+        Returns:
+            Índice del EMS y fila de table, o None; en empate gana la primera fila
+        """
+        if rule not in EMS_SCORE_RULES:
+            raise ValueError(f"Regla de puntuación desconocida: {rule}")
+        sizes = self.maxs - self.mins
+        leftovers = sizes[:, None, :] - np.asarray(table, dtype=np.float64)[None, :, :]
+        fits = np.all(leftovers >= -EPSILON, axis=2)
+        if allowed is not None:
+            fits &= allowed
+        self.stats['candidates_evaluated'] += fits.size
+        spaces, choices = np.nonzero(fits)  # En orden de EMS y, para cada EMS, de orientación
+        if len(spaces) == 0:
+            return None
+
+        # np.lexsort ordena por la última clave: se desempata por (z, y, x)
+        x, y, z = self.mins[spaces].T
+        keys = [x, y, z]
+        if rule == 'best_volume_fit':
+            keys.append(np.prod(sizes[spaces], axis=1))
+        elif rule == 'best_short_side_fit':
+            keys.append(leftovers[spaces, choices].min(axis=1))
+        elif rule == 'best_long_side_fit':
+            keys.append(leftovers[spaces, choices].max(axis=1))
+        if penalty is not None:
+            keys.append(penalty[spaces, choices])
+        best = np.lexsort(keys)[0]
+        return int(spaces[best]), int(choices[best])
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from typing import Collection, Container, List, Optional, Tuple
+from .box import Box
+from .orientation import allowed_orientations
+
+# Reglas para decidir el corte del espacio sobrante en el plano XY
+SPLIT_RULES = (
+    'shorter_leftover_axis',
+    'longer_leftover_axis',
+    'min_area',
+    'max_area',
+    'shorter_axis',
+    'longer_axis',
+)
+
+# Reglas para puntuar un espacio libre (menor es mejor)
+SCORE_RULES = (
+    'best_volume_fit',
+    'best_short_side_fit',
+    'best_long_side_fit',
+    'bottom_left',
+)
+
+@dataclass
+class FreeSpace:
+    """Cuboide libre dentro del pallet."""
+    x: float
+    y: float
+    z: float
+    width: float
+    length: float
+    height: float
+
+    @property
+    def origin(self) -> Tuple[float, float, float]:
+        return (self.x, self.y, self.z)
+
+    def volume(self) -> float:
+        """Calcula el volumen del espacio libre."""
+        return self.width * self.length * self.height
+
+    def fits(self, box: Box) -> bool:
+        """Verifica si la caja cabe en el espacio libre."""
+        return (box.width <= self.width and
+                box.length <= self.length and
+                box.height <= self.height)
+
+class GuillotinePacker:
+    """Empaquetador guillotina 3D basado en una lista de cuboides libres.
+
+    Cada caja se coloca en la esquina inferior de un espacio libre y el resto
+    del espacio se corta en tres cuboides disjuntos: uno encima de la caja
+    (con su misma huella, de modo que siempre queda soportado) y dos en el
+    suelo del espacio, separados según la regla de corte elegida.
+    """
+    def __init__(self, width: float, length: float, height: float,
+                 split_rule: str = 'shorter_leftover_axis',
+                 score_rule: str = 'best_volume_fit'):
+        if split_rule not in SPLIT_RULES:
+            raise ValueError(f"Regla de corte desconocida: {split_rule}")
+        if score_rule not in SCORE_RULES:
+            raise ValueError(f"Regla de puntuación desconocida: {score_rule}")
+        self.split_rule = split_rule
+        self.score_rule = score_rule
+        self.free_spaces: List[FreeSpace] = [FreeSpace(0, 0, 0, width, length, height)]
+
+    def _score(self, space: FreeSpace, dims: Tuple[float, float, float]) -> tuple:
+        """Puntúa un espacio libre para una caja de dimensiones dims; en empate gana el más bajo."""
+        width, length, height = dims
+        leftovers = (space.width - width,
+                     space.length - length,
+                     space.height - height)
+        position = (space.z, space.y, space.x)
+        if self.score_rule == 'best_volume_fit':
+            return (space.volume() - width * length * height,) + position
+        if self.score_rule == 'best_short_side_fit':
+            return (min(leftovers), max(leftovers)) + position
+        if self.score_rule == 'best_long_side_fit':
+            return (max(leftovers), min(leftovers)) + position
+        return position
+
+    def find_space(self, box: Box, exclude: Collection[int] = ()) -> Optional[int]:
+        """Devuelve el índice del mejor espacio libre para la caja tal como está orientada, o None.
+
+        Args:
+            box: Caja a colocar
+            exclude: Índices de espacios que no se consideran (p. ej. ya rechazados por el pallet)
+        """
+        dims = (box.width, box.length, box.height)
+        excluded = {(index, box.orientation) for index in exclude}
+        placement = self._best_placement([(box.orientation, dims)], excluded)
+        return None if placement is None else placement[0]
+
+    def find_placement(self, box: Box,
+                       exclude: Container[Tuple[int, int]] = ()) -> Optional[Tuple[int, int]]:
+        """Devuelve el mejor par (espacio libre, orientación) entre las que admite la caja, o None.
+
+        Args:
+            box: Caja a colocar
+            exclude: Pares (espacio, orientación) que no se consideran
+
+        Returns:
+            Índice del espacio en free_spaces e índice de orientation.ORIENTATIONS
+        """
+        indices, table = allowed_orientations(box)
+        return self._best_placement(list(zip(indices, map(tuple, table.tolist()))), exclude)
+
+    def _best_placement(self, options: List[Tuple[int, Tuple[float, float, float]]],
+                        exclude: Container[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+        """Mejor espacio para alguna de las orientaciones (índice, dimensiones); en empate, la primera."""
+        best = None
+        best_score = None
+        for index, space in enumerate(self.free_spaces):
+            for orientation, (width, length, height) in options:
+                if (index, orientation) in exclude:
+                    continue
+                if width <= space.width and length <= space.length and height <= space.height:
+                    score = self._score(space, (width, length, height))
+                    if best_score is None or score < best_score:
+                        best = (index, orientation)
+                        best_score = score
+        return best
+
+    def _split_along_length(self, space: FreeSpace, box: Box) -> bool:
+        """Decide si el corte del suelo sobrante recorre todo el ancho del espacio."""
+        leftover_width = space.width - box.width
+        leftover_length = space.length - box.length
+        if self.split_rule == 'shorter_leftover_axis':
+            return leftover_width <= leftover_length
+        if self.split_rule == 'longer_leftover_axis':
+            return leftover_width > leftover_length
+        if self.split_rule == 'min_area':
+            return box.width * leftover_length > leftover_width * box.length
+        if self.split_rule == 'max_area':
+            return box.width * leftover_length <= leftover_width * box.length
+        if self.split_rule == 'shorter_axis':
+            return space.width <= space.length
+        return space.width > space.length
+
+    def place(self, index: int, box: Box) -> Tuple[float, float, float]:
+        """Coloca la caja en el espacio indicado y corta el espacio sobrante."""
+        space = self.free_spaces.pop(index)
+        x, y, z = space.origin
+
+        top = FreeSpace(x, y, z + box.height, box.width, box.length, space.height - box.height)
+        if self._split_along_length(space, box):
+            # El espacio frontal ocupa todo el ancho; el lateral solo el largo de la caja
+            right = FreeSpace(x + box.width, y, z, space.width - box.width, box.length, space.height)
+            front = FreeSpace(x, y + box.length, z, space.width, space.length - box.length, space.height)
+        else:
+            right = FreeSpace(x + box.width, y, z, space.width - box.width, space.length, space.height)
+            front = FreeSpace(x, y + box.length, z, box.width, space.length - box.length, space.height)
+
+        self.free_spaces.extend(s for s in (top, right, front) if s.volume() > 0)
+        return space.origin
@@ -0,0 +1,43 @@
+import math
+from typing import Tuple
+import numpy as np
+
+# Tolerancia para comparar alturas y bordes de celda
+EPSILON = 1e-9
+
+class HeightMap:
+    """Mapa de alturas 2.5D (skyline) de la superficie superior de un pallet.
+
+    Cada celda guarda la altura máxima ocupada sobre ella. Las huellas se
+    redondean hacia fuera al tamaño de celda, de modo que una resolución
+    gruesa nunca produce colisiones, solo posiciones algo más conservadoras.
+    """
+    def __init__(self, max_width: float, max_length: float, resolution: float = 1.0):
+        if resolution <= 0:
+            raise ValueError("La resolución del mapa de alturas debe ser positiva")
+        self.resolution = resolution
+        self.cells_x = math.ceil(max_width / resolution - EPSILON)
+        self.cells_y = math.ceil(max_length / resolution - EPSILON)
+        self.heights = np.zeros((self.cells_x, self.cells_y), dtype=np.float64)
+
+    def footprint(self, x: float, y: float, width: float, length: float) -> Tuple[slice, slice]:
+        """Devuelve las celdas que cubre una huella rectangular."""
+        i0 = max(0, math.floor(x / self.resolution + EPSILON))
+        j0 = max(0, math.floor(y / self.resolution + EPSILON))
+        i1 = min(self.cells_x, math.ceil((x + width) / self.resolution - EPSILON))
+        j1 = min(self.cells_y, math.ceil((y + length) / self.resolution - EPSILON))
+        return slice(i0, max(i0 + 1, i1)), slice(j0, max(j0 + 1, j1))
+
+    def resting_z(self, x: float, y: float, width: float, length: float) -> float:
+        """Altura a la que queda apoyada una huella colocada en (x, y)."""
+        return float(self.heights[self.footprint(x, y, width, length)].max())
+
+    def supported_fraction(self, x: float, y: float, width: float, length: float, z: float) -> float:
+        """Fracción de la huella cuya superficie está exactamente a la altura z."""
+        region = self.heights[self.footprint(x, y, width, length)]
+        return float(np.count_nonzero(np.abs(region - z) <= EPSILON)) / region.size
+
+    def update(self, x: float, y: float, z: float, width: float, length: float, height: float) -> None:
+        """Eleva la superficie bajo la huella de una caja recién colocada."""
+        region = self.heights[self.footprint(x, y, width, length)]
+        np.maximum(region, z + height, out=region)
@@ -0,0 +1,167 @@
+import copy
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+from .bounds import lower_bounds
+from .box import Box
+from .metrics import mean_quality
+from .online import OnlinePalletizer
+from .pallet import Pallet
+
+# Movimientos sobre la secuencia de empaquetado
+MOVES = ('swap', 'move', 'empty_weakest')
+
+@dataclass
+class LocalSearchResult:
+    """Resultado de la fase de mejora."""
+    pallets: List[Pallet]
+    initial_pallet_count: int
+    iterations: int
+    improvements: int
+    elapsed_ms: float
+    lower_bound: int  # cota inferior de pallets; si se alcanza, la búsqueda para antes
+
+class LocalSearch:
+    """Mejora anytime de un plan mediante recocido simulado sobre la secuencia de cajas.
+
+    Un plan se representa por el orden en que se empaquetan las cajas y se
+    decodifica con un OnlinePalletizer. Cada iteración intercambia dos cajas,
+    mueve una a otra posición o adelanta una caja del pallet menos lleno para
+    intentar vaciarlo. En todo momento self.incumbent contiene el mejor plan
+    válido encontrado, empezando por el plan de partida.
+
+    El objetivo es, por orden: menos cajas sin colocar, menos pallets y mayor
+    calidad media (metrics.mean_quality).
+    """
+    def __init__(self, pallets: List[Pallet], strategy: str = 'first_fit',
+                 initial_temperature: float = 0.1, seed: Optional[int] = None,
+                 lower_bound: Optional[int] = None):
+        """
+        Args:
+            pallets: Plan de partida, generado por cualquier algoritmo
+            strategy: Estrategia del OnlinePalletizer que decodifica las secuencias
+            initial_temperature: Temperatura inicial del recocido (en fracciones de pallet)
+            seed: Semilla del generador aleatorio
+            lower_bound: Cota inferior de pallets (por defecto, la de core.bounds)
+        """
+        if not pallets:
+            raise ValueError("El plan de partida no tiene pallets")
+        first = pallets[0]
+        self.dims = (first.max_width, first.max_length, first.max_height, first.max_weight)
+        # Las secuencias se decodifican con las mismas restricciones que el plan de partida
+        self.pallet_options = first.constraint_options()
+        self.strategy = strategy
+        self.initial_temperature = initial_temperature
+        self.rng = random.Random(seed)
+        # Cajas originales en orden de colocación; cada decodificación trabaja sobre copias
+        self.sequence: List[Box] = [box for pallet in pallets for box in pallet.boxes]
+        if lower_bound is None:
+            lower_bound = lower_bounds(self.sequence, *self.dims).best
+        self.lower_bound = lower_bound
+        self.incumbent = pallets
+        self.incumbent_key = self._key(pallets, 0)
+        self.iterations = 0
+        self.improvements = 0
+
+    def _decode(self, sequence: Sequence[Box]) -> Tuple[List[Pallet], int]:
+        palletizer = OnlinePalletizer(*self.dims, strategy=self.strategy, pallet_options=self.pallet_options)
+        for box in sequence:
+            palletizer.add_box(copy.copy(box))
+        return palletizer.pallets, len(palletizer.unplaced)
+
+    def _key(self, pallets: List[Pallet], unplaced: int) -> Tuple[int, int, float]:
+        return (unplaced, len(pallets), -mean_quality(pallets))
+
+    def _energy(self, pallets: List[Pallet], unplaced: int) -> float:
+        """Energía del recocido: pallets usados más el llenado del pallet menos lleno.
+
+        El segundo término, entre 0 y 1, guía la búsqueda hacia planes en los
+        que un pallet está casi vacío y puede eliminarse.
+        """
+        min_fill = min(pallet.used_volume / pallet.volume() for pallet in pallets)
+        return unplaced * (len(self.sequence) + 1) + len(pallets) + min_fill
+
+    def _neighbour(self, sequence: List[Box], pallets: List[Pallet]) -> List[Box]:
+        candidate = list(sequence)
+        if len(candidate) < 2:
+            return candidate
+        move = self.rng.choice(MOVES)
+        if move == 'swap':
+            i, j = self.rng.sample(range(len(candidate)), 2)
+            candidate[i], candidate[j] = candidate[j], candidate[i]
+        elif move == 'move':
+            box = candidate.pop(self.rng.randrange(len(candidate)))
+            candidate.insert(self.rng.randrange(len(candidate) + 1), box)
+        else:
+            # Adelantar una caja del pallet menos lleno a un punto anterior de la secuencia
+            weakest = min(pallets, key=lambda pallet: pallet.used_volume)
+            target_id = self.rng.choice(weakest.boxes).id
+            index = next(i for i, box in enumerate(candidate) if box.id == target_id)
+            box = candidate.pop(index)
+            candidate.insert(self.rng.randrange(index + 1), box)
+        return candidate
+
+    def optimal(self) -> bool:
+        """Indica si el mejor plan alcanza la cota inferior y ya no puede mejorar en pallets."""
+        return self.incumbent_key[0] == 0 and self.incumbent_key[1] <= self.lower_bound
+
+    def run(self, time_budget_ms: float) -> LocalSearchResult:
+        """Mejora el plan hasta agotar el presupuesto o alcanzar la cota inferior."""
+        start = time.perf_counter()
+        budget = time_budget_ms / 1000.0
+        initial_count = len(self.incumbent)
+
+        current = self.sequence
+        current_pallets, current_unplaced = self.incumbent, self.incumbent_key[0]
+        current_energy = self._energy(current_pallets, current_unplaced)
+
+        while True:
+            elapsed = time.perf_counter() - start
+            if elapsed >= budget or self.optimal():
+                break
+            # Enfriamiento lineal con el tiempo: la búsqueda se vuelve voraz al final del presupuesto
+            temperature = self.initial_temperature * (1.0 - elapsed / budget)
+            candidate = self._neighbour(current, current_pallets)
+            pallets, unplaced = self._decode(candidate)
+            self.iterations += 1
+            if not pallets:
+                continue
+            energy = self._energy(pallets, unplaced)
+            delta = energy - current_energy
+            if delta <= 0 or (temperature > 0 and self.rng.random() < math.exp(-delta / temperature)):
+                current, current_pallets, current_unplaced, current_energy = candidate, pallets, unplaced, energy
+                # La calidad solo se calcula cuando puede decidir frente al mejor plan
+                if (unplaced, len(pallets)) <= self.incumbent_key[:2]:
+                    key = self._key(pallets, unplaced)
+                    if key < self.incumbent_key:
+                        self.incumbent, self.incumbent_key = pallets, key
+                        self.improvements += 1
+
+        return LocalSearchResult(
+            pallets=self.incumbent,
+            initial_pallet_count=initial_count,
+            iterations=self.iterations,
+            improvements=self.improvements,
+            elapsed_ms=(time.perf_counter() - start) * 1000.0,
+            lower_bound=self.lower_bound,
+        )
+
+def improve_plan(pallets: List[Pallet], time_budget_ms: float = 1000.0, strategy: str = 'first_fit',
+                 seed: Optional[int] = None) -> List[Pallet]:
+    """
+    Mejora un plan existente durante time_budget_ms milisegundos.
+
+    Args:
+        pallets: Plan de partida de cualquier algoritmo
+        time_budget_ms: Presupuesto de tiempo en milisegundos
+        strategy: Estrategia que decodifica cada secuencia de cajas
+        seed: Semilla del generador aleatorio
+
+    Returns:
+        El mejor plan encontrado (nunca peor que el de partida)
+    """
+    if not pallets:
+        return pallets
+    return LocalSearch(pallets, strategy=strategy, seed=seed).run(time_budget_ms).pallets
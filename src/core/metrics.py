@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+import numpy as np
+from .pallet import Pallet
+from .support import UNSUPPORTED_PENALTY
+
+# Ponderación de los componentes de la calidad de un pallet
+QUALITY_WEIGHTS = {
+    'volume': 0.4,      # 40% importancia al volumen
+    'weight': 0.3,      # 30% importancia a la distribución del peso
+    'stability': 0.2,   # 20% importancia a la estabilidad
+    'height': 0.1       # 10% importancia a la altura
+}
+
+@dataclass
+class PalletMetrics:
+    """Métricas de una lista de pallets; cada campo es un array con un valor por pallet."""
+    box_count: np.ndarray
+    used_volume: np.ndarray
+    weight: np.ndarray
+    top_height: np.ndarray
+    center_of_mass: np.ndarray  # (n, 3)
+    unsupported: np.ndarray  # Cajas sin apoyo
+    volume_utilization: np.ndarray
+    weight_utilization: np.ndarray
+    height_utilization: np.ndarray
+    weight_distribution: np.ndarray
+    stability: np.ndarray
+    quality: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.quality)
+
+    def quality_components(self, index: int) -> Tuple[float, dict]:
+        """Calidad de un pallet y sus componentes, con el formato de calculate_pallet_quality."""
+        return float(self.quality[index]), {
+            'volume_utilization': float(self.volume_utilization[index]),
+            'weight_distribution': float(self.weight_distribution[index]),
+            'stability_score': float(self.stability[index]),
+            'height_utilization': float(self.height_utilization[index]),
+            'weights': dict(QUALITY_WEIGHTS),
+        }
+
+def compute_metrics(pallets: Sequence[Pallet]) -> PalletMetrics:
+    """
+    Calcula las métricas de todos los pallets en una pasada vectorizada.
+
+    Volumen, peso, altura, centro de masa y cajas sin apoyo se leen de los
+    agregados y del grafo de apoyo que cada pallet mantiene al colocar cajas.
+
+    Args:
+        pallets: Pallets a evaluar
+
+    Returns:
+        PalletMetrics con un valor por pallet
+    """
+    capacity = np.array([(p.max_width, p.max_length, p.max_height, p.max_weight) for p in pallets],
+                        dtype=np.float64).reshape(-1, 4)
+    box_count = np.array([p.store.size for p in pallets], dtype=np.int64)
+    used_volume = np.array([p.used_volume for p in pallets], dtype=np.float64)
+    weight = np.array([p.current_weight for p in pallets], dtype=np.float64)
+    top_height = np.array([p.top_height for p in pallets], dtype=np.float64)
+    moments = np.array([p.weighted_moments for p in pallets], dtype=np.float64).reshape(-1, 3)
+
+    unsupported = np.array([p.support.unsupported_count(p.min_support_ratio) for p in pallets],
+                           dtype=np.int64)
+
+    width, length, height, max_weight = capacity.T
+    center = np.column_stack([width / 2, length / 2, np.zeros(len(pallets))])
+    loaded = weight > 0
+    center_of_mass = np.where(loaded[:, None], moments / np.where(loaded, weight, 1)[:, None], center)
+
+    # La distribución ideal tiene el centro de masa en el centro del pallet
+    max_deviation = np.hypot(width / 2, length / 2)
+    deviation = np.hypot(*(center_of_mass[:, :2] - center[:, :2]).T)
+    weight_distribution = np.where(loaded, 1 - deviation / max_deviation, 0.0)
+
+    volume_utilization = used_volume / (width * length * height)
+    height_utilization = top_height / height
+    stability = np.clip(1 - UNSUPPORTED_PENALTY * unsupported, 0, 1)
+    quality = (QUALITY_WEIGHTS['volume'] * volume_utilization +
+               QUALITY_WEIGHTS['weight'] * weight_distribution +
+               QUALITY_WEIGHTS['stability'] * stability +
+               QUALITY_WEIGHTS['height'] * height_utilization)
+
+    # Un pallet vacío no tiene calidad
+    empty = box_count == 0
+    for values in (weight_distribution, stability, quality):
+        values[empty] = 0.0
+
+    return PalletMetrics(
+        box_count=box_count,
+        used_volume=used_volume,
+        weight=weight,
+        top_height=top_height,
+        center_of_mass=center_of_mass,
+        unsupported=unsupported,
+        volume_utilization=volume_utilization,
+        weight_utilization=weight / max_weight,
+        height_utilization=height_utilization,
+        weight_distribution=weight_distribution,
+        stability=stability,
+        quality=quality,
+    )
+
+def mean_quality(pallets: Sequence[Pallet]) -> float:
+    """Calidad media de un plan."""
+    if not pallets:
+        return 0.0
+    return float(compute_metrics(pallets).quality.mean())
+
+def calculate_pallet_quality(pallet: Pallet) -> Tuple[float, dict]:
+    """
+    Calcula una métrica de calidad para el pallet basada en varios factores:
+    1. Utilización del volumen (0-1)
+    2. Distribución del peso (0-1)
+    3. Estabilidad de la carga (0-1)
+    4. Altura utilizada (0-1)
+
+    Returns:
+        Tuple[float, dict]:
+            - Puntuación de calidad entre 0 y 1 (1 es mejor)
+            - Diccionario con los componentes individuales y sus pesos
+    """
+    return compute_metrics([pallet]).quality_components(0)
+
+def calculate_pallet_metrics(pallet: Pallet) -> Dict[str, float]:
+    """Calcula métricas importantes del pallet."""
+    # Los agregados del pallet se mantienen al colocar cada caja: lectura O(1)
+    total_volume = pallet.volume()
+    return {
+        "peso_utilizado": pallet.current_weight,
+        "peso_maximo": pallet.max_weight,
+        "porcentaje_peso": (pallet.current_weight / pallet.max_weight) * 100,
+        "volumen_utilizado": pallet.used_volume,
+        "volumen_total": total_volume,
+        "porcentaje_volumen": (pallet.used_volume / total_volume) * 100,
+        "altura_utilizada": pallet.top_height,
+        "altura_maxima": pallet.max_height,
+        "porcentaje_altura": (pallet.top_height / pallet.max_height) * 100
+    }
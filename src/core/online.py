@@ -0,0 +1,125 @@
+import time
+from typing import Dict, List, Optional, Tuple
+from .box import Box
+from .pallet import Pallet
+from .pallet_index import PalletIndex
+from .guillotine import GuillotinePacker
+
+# Estrategias disponibles para decidir la colocación de cada caja
+ONLINE_STRATEGIES = ('first_fit', 'best_fit', 'guillotine', 'ems')
+
+class OnlinePalletizer:
+    """Paletizador incremental: recibe las cajas de una en una.
+
+    Cada llamada a add_box decide y confirma solo la colocación de esa caja;
+    las cajas ya colocadas no se mueven. El coste de cada decisión depende de
+    los pallets abiertos y de las cajas del pallet elegido, no del número de
+    cajas recibidas hasta el momento.
+    """
+    def __init__(self, max_width: float, max_length: float, max_height: float, max_weight: float,
+                 strategy: str = 'first_fit',
+                 split_rule: str = 'shorter_leftover_axis',
+                 score_rule: Optional[str] = None,
+                 pallet_options: Optional[Dict] = None):
+        """
+        Args:
+            max_width: Ancho máximo del pallet
+            max_length: Largo máximo del pallet
+            max_height: Alto máximo del pallet
+            max_weight: Peso máximo del pallet
+            strategy: Estrategia de colocación (ver ONLINE_STRATEGIES)
+            split_rule: Regla de corte para la estrategia 'guillotine'
+            score_rule: Regla de puntuación para 'guillotine' o 'ems'
+            pallet_options: Argumentos extra de cada Pallet que se abre (p. ej. max_cog_offset)
+        """
+        if strategy not in ONLINE_STRATEGIES:
+            raise ValueError(f"Estrategia desconocida: {strategy}")
+        self.max_width = max_width
+        self.max_length = max_length
+        self.max_height = max_height
+        self.max_weight = max_weight
+        self.strategy = strategy
+        self.split_rule = split_rule
+        if score_rule is None:
+            score_rule = 'best_volume_fit' if strategy == 'guillotine' else 'bottom_left'
+        self.score_rule = score_rule
+        self.pallet_options = dict(pallet_options or {})
+        self.index = PalletIndex()
+        self.packers: List[GuillotinePacker] = []  # Uno por pallet con la estrategia 'guillotine'
+        self.unplaced: List[Box] = []
+        self.decision_times: List[float] = []  # Segundos empleados en decidir cada caja
+
+    @property
+    def pallets(self) -> List[Pallet]:
+        """Pallets abiertos hasta el momento, en orden de apertura."""
+        return self.index.pallets
+
+    def add_box(self, box: Box) -> Optional[Pallet]:
+        """Coloca una caja y devuelve el pallet elegido, o None si no cabe en ninguno."""
+        start = time.perf_counter()
+        pallet = self._place(box)
+        self.decision_times.append(time.perf_counter() - start)
+        if pallet is None:
+            self.unplaced.append(box)
+            print(f"Advertencia: La caja {box.id} no pudo ser colocada en ningún pallet")
+        return pallet
+
+    def _place(self, box: Box) -> Optional[Pallet]:
+        if self.strategy == 'best_fit':
+            candidates = self.index.iter_best_fit(box)
+        else:
+            # Guillotine y EMS pueden rellenar huecos por debajo de la altura máxima
+            candidates = self.index.iter_first_fit(
+                box, check_height=self.strategy == 'first_fit')
+        for position in candidates:
+            packer = self.packers[position] if self.packers else None
+            if self._try_place(self.index.pallets[position], packer, box):
+                self.index.update(position)
+                return self.index.pallets[position]
+
+        # Si no se pudo colocar en ningún pallet existente, abrir uno nuevo
+        new_pallet = Pallet(self.max_width, self.max_length, self.max_height, self.max_weight,
+                            track_ems=self.strategy == 'ems', **self.pallet_options)
+        new_packer = None
+        if self.strategy == 'guillotine':
+            new_packer = GuillotinePacker(self.max_width, self.max_length, self.max_height,
+                                          self.split_rule, self.score_rule)
+        if not self._try_place(new_pallet, new_packer, box):
+            return None
+        self.index.add(new_pallet)
+        if new_packer is not None:
+            self.packers.append(new_packer)
+        return new_pallet
+
+    @staticmethod
+    def _place_in_space(pallet: Pallet, packer: GuillotinePacker, box: Box, placement: Tuple[int, int]) -> bool:
+        """Coloca la caja en el par (espacio libre, orientación) si el pallet lo admite."""
+        space, orientation = placement
+        if not pallet.place_box_at(box, packer.free_spaces[space].origin, orientation):
+            return False
+        packer.place(space, box)  # La caja ya está girada a la orientación elegida
+        return True
+
+    def _try_place(self, pallet: Pallet, packer: Optional[GuillotinePacker], box: Box) -> bool:
+        """Intenta colocar la caja en el pallet según la estrategia."""
+        if self.strategy in ('first_fit', 'best_fit'):
+            return pallet.place_box(box)
+        if self.strategy == 'guillotine':
+            rejected = set()
+            deferred = []  # Pares que dejarían el centro de gravedad fuera de la envolvente
+            placement = packer.find_placement(box)
+            while placement is not None:
+                space, orientation = placement
+                excess = pallet.cog_excess(box, packer.free_spaces[space].origin, orientation)
+                if excess > 0:
+                    deferred.append((excess, placement))
+                elif self._place_in_space(pallet, packer, box, placement):
+                    return True
+                # El pallet rechaza el par (apoyo, carga o centro de gravedad): se prueba el siguiente
+                rejected.add(placement)
+                placement = packer.find_placement(box, rejected)
+            # Si ningún par deja el pallet equilibrado, primero los que más lo corrigen
+            deferred.sort(key=lambda item: item[0])
+            return any(self._place_in_space(pallet, packer, box, placement) for _, placement in deferred)
+        placement = pallet.best_ems_placement(box, self.score_rule)
+        return placement is not None and pallet.place_box_at(box, *placement)
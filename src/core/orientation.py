@@ -0,0 +1,70 @@
+from functools import lru_cache
+from typing import Tuple
+import numpy as np
+from .box import Box
+
+# Orientaciones: permutación de las dimensiones originales (ancho, largo, alto).
+# La 0 es la caja tal como llega y la 1 la gira 90° sobre el eje vertical.
+ORIENTATIONS = ((0, 1, 2), (1, 0, 2), (0, 2, 1), (2, 0, 1), (1, 2, 0), (2, 1, 0))
+
+# Orientaciones admitidas por cada modo de rotación
+ROTATION_MODES = {
+    'fixed': (0,),  # Sin girar
+    'upright': (0, 1),  # Solo giros sobre el eje vertical: la cara superior sigue arriba
+    'all': tuple(range(len(ORIENTATIONS))),  # Las seis orientaciones
+}
+
+def base_dims(box: Box) -> Tuple[float, float, float]:
+    """Dimensiones originales de la caja, deshaciendo su orientación actual."""
+    dims = [0.0, 0.0, 0.0]
+    for axis, source in enumerate(ORIENTATIONS[box.orientation]):
+        dims[source] = (box.width, box.length, box.height)[axis]
+    return tuple(dims)
+
+@lru_cache(maxsize=4096)
+def _distinct(dims: Tuple[float, float, float], rotation: str) -> Tuple[Tuple[int, ...], np.ndarray]:
+    """Orientaciones del modo con dimensiones distintas: un cubo solo se evalúa una vez."""
+    if rotation not in ROTATION_MODES:
+        raise ValueError(f"Modo de rotación desconocido: {rotation}")
+    indices, seen = [], set()
+    for index in ROTATION_MODES[rotation]:
+        oriented = tuple(dims[source] for source in ORIENTATIONS[index])
+        if oriented not in seen:
+            seen.add(oriented)
+            indices.append(index)
+    table = np.array([[dims[source] for source in ORIENTATIONS[index]] for index in indices],
+                     dtype=np.float64)
+    table.setflags(write=False)
+    return tuple(indices), table
+
+def allowed_orientations(box: Box) -> Tuple[Tuple[int, ...], np.ndarray]:
+    """
+    Orientaciones que se pueden probar para una caja, sin repeticiones por simetría.
+
+    Returns:
+        Índices de ORIENTATIONS y array (k, 3) de solo lectura con las
+        dimensiones (ancho, largo, alto) de la caja en cada uno
+    """
+    return _distinct(base_dims(box), box.rotation)
+
+def min_height(box: Box) -> float:
+    """Menor altura que puede tener la caja en alguna de sus orientaciones."""
+    return float(allowed_orientations(box)[1][:, 2].min())
+
+def oriented_dims(box: Box, index: int) -> Tuple[float, float, float]:
+    """Dimensiones (ancho, largo, alto) que tendría la caja en la orientación index."""
+    dims = base_dims(box)
+    return tuple(dims[source] for source in ORIENTATIONS[index])
+
+def set_orientation(box: Box, index: int) -> None:
+    """Gira la caja a la orientación index respecto de sus dimensiones originales."""
+    box.width, box.length, box.height = oriented_dims(box, index)
+    box.orientation = index
+
+def orientation_of(box: Box, dims: Tuple[float, float, float]) -> int:
+    """Índice de la orientación en la que la caja tiene las dimensiones dadas."""
+    indices, table = allowed_orientations(box)
+    matches = np.flatnonzero(np.all(np.abs(table - np.asarray(dims)) <= 1e-9, axis=1))
+    if len(matches) == 0:
+        raise ValueError(f"La caja {box.id} no admite las dimensiones {dims}")
+    return indices[int(matches[0])]
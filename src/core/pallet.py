@@ -1,26 +1,101 @@
-from typing import List, Tuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+import numpy as np
 from .box import Box
+from .box_store import BoxStore
+from .ems import EMSTracker
+from .heightmap import EPSILON, HeightMap
+from .orientation import (ROTATION_MODES, allowed_orientations, min_height, orientation_of, oriented_dims,
+                          set_orientation)
+from .support import SUPPORT_TOLERANCE, UNSUPPORTED_PENALTY, SupportGraph
+
+# Candidatos que _first_valid_placement comprueba de una vez contra las cajas colocadas
+PLACEMENT_CHUNK = 32
+
+Point = Tuple[float, float, float]
+Footprint = Tuple[float, float, float, float]  # (x, y, width, length) en el plano de la capa
+
+@dataclass
+class Layer:
+    """Capa de cajas colocada de una vez sobre el pallet."""
+    z: float  # Altura de la carga al colocar la capa; cada caja puede bajar por debajo (ver place_layer)
+    height: float
+    boxes: List[Box]
+    pattern: str = ''  # Nombre del patrón que generó la capa, si lo hay
 
 class Pallet:
     """Representa un pallet con su capacidad y las cajas asignadas."""
-    def __init__(self, max_width: float, max_length: float, max_height: float, max_weight: float):
+    def __init__(self, max_width: float, max_length: float, max_height: float, max_weight: float, *,
+                 height_map_resolution: Optional[float] = None,
+                 track_ems: bool = False, ems_min_size: float = 0.0,
+                 min_support_ratio: float = 0.0, support_tolerance: float = SUPPORT_TOLERANCE,
+                 max_cog_offset: Optional[float] = None, max_cog_height: Optional[float] = None):
+        if not 0 <= min_support_ratio <= 1:
+            raise ValueError("La fracción mínima de apoyo debe estar entre 0 y 1")
+        if (max_cog_offset is not None and max_cog_offset < 0) or (max_cog_height is not None and max_cog_height < 0):
+            raise ValueError("Los límites del centro de gravedad no pueden ser negativos")
         self.max_width = max_width
         self.max_length = max_length
         self.max_height = max_height
         self.max_weight = max_weight
         self.boxes: List[Box] = []
+        # Geometría de las cajas en arrays contiguos; self.boxes mantiene los objetos Box
+        self.store = BoxStore()
+        # Grafo de apoyo: qué cajas sostienen a cada una y qué fracción de su base
+        self.support = SupportGraph(self.store, support_tolerance)
+        # Fracción mínima de la base que debe quedar apoyada al colocar (0: basta con tocar)
+        self.min_support_ratio = min_support_ratio
+        # Envolvente opcional del centro de gravedad: distancia máxima en XY al
+        # centro del pallet y altura máxima (None: sin límite)
+        self.max_cog_offset = max_cog_offset
+        self.max_cog_height = max_cog_height
         self.current_weight = 0.0
-        self.occupied_space = []  # Lista de espacios ocupados (x, y, z, width, length, height)
-        self.layers = []  # Lista para mantener registro de las capas
+        # Agregados incrementales: se actualizan en cada colocación
+        self.used_volume = 0.0
+        self.top_height = 0.0  # Altura máxima alcanzada por las cajas
+        self.weighted_moments = [0.0, 0.0, 0.0]  # Suma de peso * centro en x, y, z
+        self.layers: List[Layer] = []  # Capas colocadas con place_layer
+        # Puntos extremos: esquinas candidatas generadas por las cajas colocadas
+        self.extreme_points: Set[Point] = {(0, 0, 0)}
+        # Distancias libres de los puntos extremos (ver _free_rays): fila de cada punto,
+        # puntos, distancias y número de cajas que ya tienen en cuenta
+        self._ray_cache: Tuple[Dict[Point, int], np.ndarray, np.ndarray, int] = (
+            {}, np.zeros((0, 3)), np.zeros((0, 3)), 0)
+        # Mapa de alturas opcional: las consultas geométricas pasan a ser O(huella)
+        self.height_map: Optional[HeightMap] = None
+        if height_map_resolution is not None:
+            self.height_map = HeightMap(max_width, max_length, height_map_resolution)
+        # Espacios máximos vacíos opcionales, consultables con best_ems_position
+        self.ems: Optional[EMSTracker] = None
+        if track_ems:
+            self.ems = EMSTracker(max_width, max_length, max_height, ems_min_size)
+        # Registro de deshacer: solo existe mientras hay una colocación de prueba abierta
+        self._undo_log: Optional[List[Callable[[], None]]] = None
+
+    def constraint_options(self) -> dict:
+        """Restricciones de colocación del pallet, para crear otros pallets con las mismas."""
+        return {
+            'min_support_ratio': self.min_support_ratio,
+            'support_tolerance': self.support.tolerance,
+            'max_cog_offset': self.max_cog_offset,
+            'max_cog_height': self.max_cog_height,
+        }
 
     def volume(self) -> float:
         """Calcula el volumen total del pallet."""
         return self.max_width * self.max_length * self.max_height
-    
+
+    @property
+    def occupied_space(self) -> List[Tuple[float, float, float, float, float, float]]:
+        """Espacios ocupados (x, y, z, width, length, height), leídos del BoxStore."""
+        # La geometría solo se guarda en los arrays del BoxStore; no se duplica en tuplas
+        return [tuple(row) for row in np.hstack([self.store.mins, self.store.dims]).tolist()]
+
     def remaining_volume(self) -> float:
         """Calcula el volumen restante en el pallet."""
-        used_volume = sum(box.volume() for box in self.boxes)
-        return self.volume() - used_volume
+        return self.volume() - self.used_volume
     
     def can_place_box(self, box: Box) -> bool:
         """Verifica si una caja puede ser colocada en el pallet."""
@@ -28,41 +103,38 @@ class Pallet:
         if self.current_weight + box.weight > self.max_weight:
             return False
         
-        # Verificar límites de altura
-        max_height = max((box.position[2] + box.height for box in self.boxes), default=0)
-        if max_height + box.height > self.max_height:
+        # Verificar límites de altura (con la orientación más baja que admite la caja)
+        if self.top_height + min_height(box) > self.max_height:
             return False
         
         return True
     
     def is_position_valid(self, box: Box, position: Tuple[float, float, float]) -> bool:
         """Verifica si una posición es válida para colocar una caja."""
+        return self._position_valid(position, (box.width, box.length, box.height))
+
+    def _position_valid(self, position: Point, dims: Tuple[float, float, float]) -> bool:
+        """Verifica límites y colisiones de un cuboide de dimensiones dims en la posición."""
         x, y, z = position
+        width, length, height = dims
         
         # Verificar límites del pallet
-        if (x + box.width > self.max_width or
-            y + box.length > self.max_length or
-            z + box.height > self.max_height):
+        if (x + width > self.max_width or
+            y + length > self.max_length or
+            z + height > self.max_height):
             return False
         
-        # Verificar colisiones con otras cajas
-        for other_box in self.boxes:
-            if (x < other_box.position[0] + other_box.width and
-                x + box.width > other_box.position[0] and
-                y < other_box.position[1] + other_box.length and
-                y + box.length > other_box.position[1] and
-                z < other_box.position[2] + other_box.height and
-                z + box.height > other_box.position[2]):
-                return False
+        # Con mapa de alturas basta con quedar por encima de la superficie
+        if self.height_map is not None:
+            return z >= self.height_map.resting_z(x, y, width, length) - EPSILON
         
-        return True
+        # Verificar colisiones con todas las cajas de una vez
+        return not self.store.collides(position, dims)
     
     def calculate_waste(self, box: Box, position: Tuple[float, float, float]) -> float:
         """Calcula el desperdicio de espacio al colocar una caja en una posición."""
-        x, y, z = position
-        
         # Calcular el espacio ocupado
-        occupied_volume = sum(b.volume() for b in self.boxes) + box.volume()
+        occupied_volume = self.used_volume + box.volume()
         
         # Calcular el espacio total disponible
         total_volume = self.volume()
@@ -73,69 +145,619 @@ class Pallet:
     def place_box(self, box: Box) -> bool:
         """Coloca una caja en el pallet."""
         if self.can_place_box(box):
-            # Encontrar la mejor posición para la caja
-            best_position = None
-            min_z = float('inf')
-            
-            # Buscar en todas las posiciones posibles
-            for z in range(0, int(self.max_height - box.height) + 1):
-                for y in range(0, int(self.max_length - box.length) + 1):
-                    for x in range(0, int(self.max_width - box.width) + 1):
-                        # Verificar si la posición es válida
-                        if self.is_position_valid(box, (x, y, z)):
-                            # Preferir posiciones más bajas
-                            if z < min_z:
-                                min_z = z
-                                best_position = (x, y, z)
-            
-            if best_position:
-                x, y, z = best_position
-                box.position = (x, y, z)
-                self.boxes.append(box)
-                self.current_weight += box.weight
+            # Los candidatos llegan ordenados por (z, y, x): el primero válido
+            # es la posición más baja disponible. Un punto extremo puede quedar
+            # en el aire, así que se exige apoyo como en el barrido original
+            placement = self._first_valid_placement(box, require_support=True)
+            if placement is not None:
+                self._place_oriented(box, *placement)
                 return True
         return False
-    
+
+    def place_box_at(self, box: Box, position: Point, orientation: Optional[int] = None) -> bool:
+        """Coloca una caja en una posición concreta si el peso y el espacio lo permiten.
+
+        Con orientation (índice de ORIENTATIONS) la caja se gira antes de
+        colocarla; si la colocación se rechaza, conserva su orientación.
+        """
+        if orientation is None:
+            orientation = box.orientation
+        elif orientation not in ROTATION_MODES[box.rotation]:
+            raise ValueError(f"La caja {box.id} no admite la orientación {orientation}")
+        if self.current_weight + box.weight > self.max_weight:
+            return False
+        dims = oriented_dims(box, orientation) if orientation != box.orientation else (box.width, box.length, box.height)
+        if not self._position_valid(position, dims):
+            return False
+        if self.min_support_ratio > 0 and not self._supported(position, dims)[0]:
+            return False
+        if self._cog_limited and not self._box_cog_allows(box, position, dims)[0]:
+            return False
+        if not self.support.fits_load([position], [dims], [box.weight], [box.max_load]):
+            return False
+        self._place_oriented(box, tuple(position), orientation)
+        return True
+
+    def place_layer(self, boxes: Sequence[Box], footprints: Sequence[Footprint], pattern: str = '') -> bool:
+        """Coloca una capa completa sobre la carga actual en un solo paso.
+
+        Cada caja va a su huella (x, y, width, length); si la huella es la de
+        la caja girada 90° sobre el eje vertical, se intercambian su ancho y
+        su largo. Cada caja baja hasta la cara superior más alta que hay bajo
+        su huella (como mucho top_height), así que no puede chocar con las
+        cajas ya colocadas, no queda en el aire donde la carga de debajo es
+        más estrecha o más baja y no hace falta ninguna búsqueda. Con
+        min_support_ratio, cada caja debe además alcanzar esa fracción apoyada.
+        """
+        if len(boxes) != len(footprints) or not boxes:
+            raise ValueError("La capa necesita una huella por caja")
+        z = self.top_height
+        height = max(box.height for box in boxes)
+        if z + height > self.max_height + EPSILON:
+            return False
+        if self.current_weight + sum(box.weight for box in boxes) > self.max_weight:
+            return False
+        positions, dims, orientations = self._layer_geometry(boxes, footprints)
+        # Cada caja toca la cara más alta bajo su huella; la comprobación exige además
+        # min_support_ratio y descarta huellas que solo rozan la carga dentro de la tolerancia
+        if self.top_height > 0 and not self._supported(positions, dims).all():
+            return False
+        if self._cog_limited:
+            # La capa entera cuenta como una sola carga: su peso y sus momentos sumados
+            centers = positions + dims / 2
+            weights = np.array([box.weight for box in boxes], dtype=np.float64)
+            if not self._cog_allows(weights.sum(), weights @ centers)[0]:
+                return False
+        # Ninguna caja de la capa se apoya en otra: se comprueban todas juntas
+        if not self.support.fits_load(positions.tolist(), dims.tolist(),
+                                      [box.weight for box in boxes], [box.max_load for box in boxes]):
+            return False
+
+        for box, position, orientation in zip(boxes, positions.tolist(), orientations):
+            self._place_oriented(box, tuple(position), orientation, update_points=False)
+        self._add_layer_points(boxes)
+        self.layers.append(Layer(z=z, height=height, boxes=list(boxes), pattern=pattern))
+        self._record_undo(self.layers.pop)
+        return True
+
+    def layer_fit(self, boxes: Sequence[Box], footprints: Sequence[Footprint]) -> np.ndarray:
+        """Cajas de una capa que el pallet admite juntas.
+
+        Se descartan las cajas que no caben en altura o no alcanzan el apoyo
+        exigido y el resto se recorre en orden: cada caja se queda si la capa
+        parcial sigue respetando el peso, el centro de gravedad y la carga
+        máxima. place_layer acepta la capa formada por las cajas marcadas.
+
+        Returns:
+            Array booleano con True en las cajas que se quedan en la capa
+        """
+        if len(boxes) != len(footprints):
+            raise ValueError("La capa necesita una huella por caja")
+        keep = np.zeros(len(boxes), dtype=bool)
+        if not boxes:
+            return keep
+        positions, dims, _ = self._layer_geometry(boxes, footprints)
+        weights = np.array([box.weight for box in boxes], dtype=np.float64)
+        max_loads = [box.max_load for box in boxes]
+        candidates = self.top_height + dims[:, 2] <= self.max_height + EPSILON
+        if self.top_height > 0:
+            candidates &= self._supported(positions, dims)
+        weight, moments = 0.0, np.zeros(3)
+        kept: List[int] = []
+        for index in np.flatnonzero(candidates).tolist():
+            if self.current_weight + weight + weights[index] > self.max_weight:
+                continue
+            added = moments + weights[index] * (positions[index] + dims[index] / 2)
+            if self._cog_limited and not self._cog_allows(weight + weights[index], added)[0]:
+                continue
+            trial = kept + [index]
+            if not self.support.fits_load(positions[trial].tolist(), dims[trial].tolist(),
+                                          weights[trial].tolist(), [max_loads[i] for i in trial]):
+                continue
+            kept.append(index)
+            weight += weights[index]
+            moments = added
+        keep[kept] = True
+        return keep
+
+    def supports_footprint(self, x: float, y: float, width: float, length: float) -> bool:
+        """Verifica si una caja de la capa con esa huella queda apoyada al bajar sobre la carga."""
+        z = float(self._resting_heights([(x, y, width, length)])[0])
+        return bool(self._supported([(x, y, z)], (width, length, 0.0))[0])
+
+    def _layer_geometry(self, boxes: Sequence[Box], footprints: Sequence[Footprint]
+                        ) -> Tuple[np.ndarray, np.ndarray, List[int]]:
+        """Posición asentada, dimensiones y orientación de cada caja de una capa."""
+        orientations = []
+        for box, (x, y, width, length) in zip(boxes, footprints):
+            if x + width > self.max_width + EPSILON or y + length > self.max_length + EPSILON:
+                raise ValueError(f"Huella inválida para la caja {box.id}: {(x, y, width, length)}")
+            # Falla si la huella exige un giro que la caja no admite
+            orientations.append(orientation_of(box, (width, length, box.height)))
+        positions = np.array([(x, y, 0.0) for x, y, _, _ in footprints], dtype=np.float64)
+        positions[:, 2] = self._resting_heights(footprints)
+        dims = np.array([(width, length, box.height) for box, (_, _, width, length)
+                         in zip(boxes, footprints)], dtype=np.float64)
+        return positions, dims, orientations
+
+    def _resting_heights(self, footprints: Sequence[Footprint]) -> np.ndarray:
+        """Altura a la que quedaría apoyada cada huella (x, y, width, length) al bajar sobre la carga."""
+        if self.height_map is not None:
+            return np.array([self.height_map.resting_z(*footprint) for footprint in footprints], dtype=np.float64)
+        return self.store.resting_heights(footprints)
+
+    def _place_oriented(self, box: Box, position: Point, orientation: int, update_points: bool = True) -> None:
+        """Gira la caja a la orientación elegida y la registra en la posición."""
+        if orientation != box.orientation:
+            self._record_undo(partial(set_orientation, box, box.orientation))
+            set_orientation(box, orientation)
+        self._register_box(box, position, update_points)
+
+    def _add_layer_points(self, boxes: Sequence[Box]) -> None:
+        """Actualiza los puntos extremos tras una capa completa en una sola pasada.
+
+        Se descartan los puntos que quedan dentro de alguna caja de la capa y
+        cada caja aporta sus esquinas derecha, frontal y superior, sin las
+        proyecciones de _update_extreme_points: la capa ya forma una superficie.
+        """
+        mins = np.array([box.position for box in boxes], dtype=np.float64)
+        maxs = mins + np.array([(box.width, box.length, box.height) for box in boxes], dtype=np.float64)
+        points = list(self.extreme_points)
+        if points:
+            array = np.array(points, dtype=np.float64)
+            inside = np.any(np.all((mins[None, :, :] <= array[:, None, :]) &
+                                   (array[:, None, :] < maxs[None, :, :]), axis=2), axis=1)
+            points = [point for point, drop in zip(points, inside) if not drop]
+        corners = np.concatenate([
+            np.column_stack([maxs[:, 0], mins[:, 1], mins[:, 2]]),
+            np.column_stack([mins[:, 0], maxs[:, 1], mins[:, 2]]),
+            np.column_stack([mins[:, 0], mins[:, 1], maxs[:, 2]]),
+        ])
+        limits = np.array([self.max_width, self.max_length, self.max_height])
+        corners = corners[np.all(corners < limits, axis=1)]
+        self.extreme_points = set(points) | set(map(tuple, corners.tolist()))
+
+    def _first_valid_placement(self, box: Box, require_support: bool = False) -> Optional[Tuple[Point, int]]:
+        """Devuelve la primera posición y orientación libres (y soportadas, si se pide)."""
+        indices, table = allowed_orientations(box)
+        candidates, choices = self._candidate_placements(box, table)
+        if not candidates:
+            return None
+        check_support = require_support or self.min_support_ratio > 0
+        if self.height_map is not None:
+            # Los candidatos ya descansan sobre la superficie del mapa de alturas
+            order = range(len(candidates))
+            balanced = None
+            if self._cog_limited:
+                balanced = self._box_cog_allows(box, candidates, table[choices])
+                # Primero las posiciones que más acercan el centro de gravedad a la envolvente
+                order = np.argsort(self._box_cog_excess(box, candidates, table[choices]), kind='stable').tolist()
+            for rank in order:
+                position, choice = candidates[rank], choices[rank]
+                width, length, _ = table[choice]
+                if balanced is not None and not balanced[rank]:
+                    continue
+                if self.min_support_ratio and self.height_map.supported_fraction(
+                        position[0], position[1], width, length, position[2]) < self.min_support_ratio:
+                    continue
+                if self._fits_load(box, position, table[choice]):
+                    return position, indices[choice]
+            return None
+        positions = np.array(candidates, dtype=np.float64)
+        dims = table[choices]
+        order = np.arange(len(candidates))
+        if self._cog_limited:
+            # Comprobación O(1) por candidato con los momentos acumulados; primero
+            # las posiciones que más acercan el centro de gravedad a la envolvente
+            order = order[self._box_cog_allows(box, positions, dims)]
+            order = order[np.argsort(self._box_cog_excess(box, positions[order], dims[order]), kind='stable')]
+        # Las colisiones cuestan O(cajas) por candidato: se comprueban por bloques
+        # en el orden de preferencia y se para en el primero válido
+        start, pruned = 0, False
+        while start < len(order):
+            if start and not pruned and len(order) - start > 4 * PLACEMENT_CHUNK:
+                # El primer bloque no bastó y quedan muchos candidatos: se descartan los que
+                # tienen algún lado más largo que la distancia libre desde su punto (chocan seguro)
+                rest = order[start:]
+                rays = self._free_rays([candidates[index] for index in rest.tolist()])
+                order = rest[np.all(dims[rest] <= rays + EPSILON, axis=1)]
+                start, pruned = 0, True
+                continue
+            block = order[start:start + PLACEMENT_CHUNK]
+            start += PLACEMENT_CHUNK
+            block = block[~self.store.collides_many(positions[block], dims[block])]
+            if check_support and len(block):
+                block = block[self._supported(positions[block], dims[block])]
+            # La carga sobre las cajas de debajo solo se comprueba en los candidatos que pasan lo demás
+            for index in block.tolist():
+                if self._fits_load(box, candidates[index], dims[index]):
+                    return candidates[index], indices[choices[index]]
+        return None
+
+    def _free_rays(self, points: List[Point]) -> np.ndarray:
+        """Distancias libres (ver BoxStore.free_rays) de los puntos, reutilizando las ya calculadas.
+
+        La caché solo se recorta con las cajas colocadas desde la última
+        consulta y calcula desde cero los puntos nuevos. Nunca se modifica en
+        sitio: _register_box guarda la anterior para deshacer una prueba.
+        """
+        rows, cached, rays, size = self._ray_cache
+        if len(rows) > 2 * len(self.extreme_points):
+            # Se olvidan los puntos que ya no son extremos
+            kept = [row for point, row in rows.items() if point in self.extreme_points]
+            rows = {point: index for index, point in enumerate(map(tuple, cached[kept].tolist()))}
+            cached, rays = cached[kept], rays[kept]
+        if size < self.store.size and len(rows):
+            rays = np.minimum(rays, self.store.free_rays(cached, size))
+        missing = [point for point in dict.fromkeys(points) if point not in rows]
+        if missing:
+            rows = dict(rows)
+            rows.update((point, len(cached) + index) for index, point in enumerate(missing))
+            cached = np.vstack([cached, np.array(missing, dtype=np.float64)])
+            rays = np.vstack([rays, self.store.free_rays(missing)])
+        self._ray_cache = (rows, cached, rays, self.store.size)
+        return rays[[rows[point] for point in points]]
+
+    def _fits_load(self, box: Box, position: Point, dims) -> bool:
+        """Verifica que la caja en la posición dada no sobrecarga ni a ella ni a las de debajo."""
+        return self.support.fits_load([position], [tuple(dims)], [box.weight], [box.max_load])
+
+    def _candidate_placements(self, box: Box, table: np.ndarray) -> Tuple[List[Point], np.ndarray]:
+        """Devuelve los pares (punto extremo, orientación) en que cabe la caja.
+
+        Args:
+            box: Caja a colocar
+            table: Dimensiones de la caja en cada orientación admitida, array (k, 3)
+
+        Returns:
+            Posiciones ordenadas de la más baja a la más alta (z, y, x) y, para
+            cada una, la fila de table con la orientación que se prueba
+        """
+        if self.height_map is not None:
+            return self._resting_candidates(table)
+        points = list(self.extreme_points)
+        if not points:
+            return [], np.zeros(0, dtype=int)
+        array = np.array(points, dtype=np.float64)
+        ranked = np.lexsort((array[:, 0], array[:, 1], array[:, 2]))  # Por (z, y, x)
+        limits = np.array([self.max_width, self.max_length, self.max_height])
+        fits = np.all(array[ranked, None, :] + table[None, :, :] <= limits, axis=2)
+        point_index, choices = np.nonzero(fits)  # En orden de punto y, para cada punto, de orientación
+        return [points[i] for i in ranked[point_index].tolist()], choices
+
+    def _resting_candidates(self, table: np.ndarray) -> Tuple[List[Point], np.ndarray]:
+        """Proyecta la huella de cada punto extremo y orientación sobre el mapa de alturas."""
+        candidates = []
+        for choice, (width, length, height) in enumerate(table.tolist()):
+            footprints = {
+                (x, y) for x, y, _ in self.extreme_points
+                if x + width <= self.max_width and y + length <= self.max_length
+            }
+            for x, y in footprints:
+                z = self.height_map.resting_z(x, y, width, length)
+                if z + height <= self.max_height:
+                    candidates.append(((x, y, z), choice))
+        candidates.sort(key=lambda c: (c[0][2], c[0][1], c[0][0], c[1]))
+        return [position for position, _ in candidates], np.array([c for _, c in candidates], dtype=int)
+
+    @contextmanager
+    def trial(self) -> Iterator["Pallet"]:
+        """Abre una colocación de prueba sobre el propio pallet.
+
+        Las cajas colocadas dentro del bloque se retiran al salir, dejando el
+        pallet y las posiciones de las cajas exactamente como estaban. Abrirla
+        cuesta O(1) y deshacer cuesta lo mismo que las colocaciones hechas.
+        """
+        outer_log = self._undo_log
+        self._undo_log = []
+        try:
+            yield self
+        finally:
+            while self._undo_log:
+                self._undo_log.pop()()
+            self._undo_log = outer_log
+
+    def _record_undo(self, undo: Callable[[], None]) -> None:
+        """Anota cómo deshacer una modificación si hay una prueba abierta."""
+        if self._undo_log is not None:
+            self._undo_log.append(undo)
+
+    def _register_box(self, box: Box, position: Point, update_points: bool = True) -> None:
+        """Registra una caja ya validada en la posición indicada."""
+        if self._undo_log is not None:
+            region = None
+            if self.height_map is not None:
+                footprint = self.height_map.footprint(position[0], position[1], box.width, box.length)
+                region = (footprint, self.height_map.heights[footprint].copy())
+            self._record_undo(partial(self._unregister_box, box, (
+                box.position, self.current_weight, self.used_volume, self.top_height,
+                list(self.weighted_moments), self.extreme_points, region)))
+        box.position = position
+        self.boxes.append(box)
+        self.store.append(position, (box.width, box.length, box.height), box.weight)
+        self.support.add(self.store.size - 1, box.max_load)
+        self.current_weight += box.weight
+        self.used_volume += box.volume()
+        self.top_height = max(self.top_height, position[2] + box.height)
+        self.weighted_moments[0] += box.weight * (position[0] + box.width / 2)
+        self.weighted_moments[1] += box.weight * (position[1] + box.length / 2)
+        self.weighted_moments[2] += box.weight * (position[2] + box.height / 2)
+        if update_points:
+            self._update_extreme_points(box)
+        self._record_undo(partial(setattr, self, '_ray_cache', self._ray_cache))
+        if self.height_map is not None:
+            self.height_map.update(*position, box.width, box.length, box.height)
+        if self.ems is not None:
+            self._record_undo(partial(self._restore_ems, self.ems.mins, self.ems.maxs))
+            self.ems.update(position, (box.width, box.length, box.height))
+
+    def _unregister_box(self, box: Box, state: tuple) -> None:
+        """Retira la última caja registrada y restaura el estado previo."""
+        (box.position, self.current_weight, self.used_volume, self.top_height,
+         self.weighted_moments, self.extreme_points, region) = state
+        self.boxes.pop()
+        self.support.remove_last()
+        self.store.size -= 1
+        if region is not None:
+            footprint, heights = region
+            self.height_map.heights[footprint] = heights
+
+    def _restore_ems(self, mins: np.ndarray, maxs: np.ndarray) -> None:
+        """Restaura los EMS previos a una colocación de prueba."""
+        self.ems.mins, self.ems.maxs = mins, maxs
+        self.ems.stats['spaces'] = len(mins)
+
+    def best_ems_position(self, box: Box, rule: str = 'bottom_left',
+                          require_support: bool = True) -> Optional[Point]:
+        """Devuelve el origen del mejor EMS para la caja tal como está orientada.
+
+        Args:
+            box: Caja a colocar
+            rule: Regla de puntuación (ver ems.EMS_SCORE_RULES)
+            require_support: Descartar EMS cuyo origen no descansa sobre el suelo o una caja
+                (o no alcanza min_support_ratio)
+        """
+        table = np.array([(box.width, box.length, box.height)], dtype=np.float64)
+        placement = self._best_ems(box, rule, require_support, (box.orientation,), table)
+        return None if placement is None else placement[0]
+
+    def best_ems_placement(self, box: Box, rule: str = 'bottom_left',
+                           require_support: bool = True) -> Optional[Tuple[Point, int]]:
+        """Como best_ems_position, pero probando todas las orientaciones que admite la caja.
+
+        Returns:
+            Origen del mejor EMS e índice de ORIENTATIONS con que se coloca, o None
+        """
+        indices, table = allowed_orientations(box)
+        return self._best_ems(box, rule, require_support, indices, table)
+
+    def _best_ems(self, box: Box, rule: str, require_support: bool, indices: Sequence[int],
+                  table: np.ndarray) -> Optional[Tuple[Point, int]]:
+        """Mejor par (EMS, orientación) entre las filas de table que respeta las restricciones."""
+        if self.ems is None:
+            raise ValueError("El pallet no mantiene EMS: créalo con track_ems=True")
+        if self.current_weight + box.weight > self.max_weight:
+            return None
+        count, options = len(self.ems.mins), len(table)
+        # Un candidato por par (EMS, orientación), en el orden de EMSTracker.best_placement
+        positions = np.repeat(self.ems.mins, options, axis=0)
+        dims = np.tile(table, (count, 1))
+        far = np.repeat(self.ems.maxs, options, axis=0) - dims
+        allowed = np.all(far - positions >= -EPSILON, axis=1)
+        # El apoyo y el centro de gravedad solo se evalúan en los pares en que la caja cabe
+        fitting = np.flatnonzero(allowed)
+        penalty = None
+        if self._cog_limited:
+            # Con envolvente, la caja puede ir a cualquier esquina inferior del EMS: en cada par
+            # se usa la admisible que más acerca el centro de gravedad a la envolvente
+            best = np.full(len(fitting), np.inf)
+            chosen = positions[fitting]
+            for far_x in (False, True):
+                for far_y in (False, True):
+                    corners = positions[fitting].copy()
+                    if far_x:
+                        corners[:, 0] = far[fitting, 0]
+                    if far_y:
+                        corners[:, 1] = far[fitting, 1]
+                    ok = self._box_cog_allows(box, corners, dims[fitting])
+                    if require_support:
+                        checked = np.flatnonzero(ok)
+                        ok[checked] = self._supported(corners[checked], dims[fitting][checked])
+                    excess = np.where(ok, self._box_cog_excess(box, corners, dims[fitting]), np.inf)
+                    better = excess < best  # En empate se queda la esquina de origen
+                    best[better] = excess[better]
+                    chosen[better] = corners[better]
+            positions[fitting] = chosen
+            allowed[fitting] = np.isfinite(best)
+            # Los pares que más acercan el centro de gravedad a la envolvente van primero
+            penalty = np.zeros(len(allowed))
+            penalty[fitting] = np.where(np.isfinite(best), best, 0.0)
+            penalty = penalty.reshape(count, options)
+        elif require_support:
+            allowed[fitting] = self._supported(positions[fitting], dims[fitting])
+        allowed = allowed.reshape(count, options)
+        placement = self.ems.best_placement(table, rule, allowed, penalty)
+        while placement is not None and not self._fits_load(
+                box, tuple(positions[placement[0] * options + placement[1]].tolist()), table[placement[1]]):
+            # Se descarta el par que sobrecargaría alguna caja y se busca el siguiente mejor
+            allowed[placement] = False
+            placement = self.ems.best_placement(table, rule, allowed, penalty)
+        if placement is None:
+            return None
+        x, y, z = positions[placement[0] * options + placement[1]].tolist()
+        return (x, y, z), indices[placement[1]]
+
+    def _update_extreme_points(self, box: Box) -> None:
+        """Actualiza los puntos extremos tras colocar una caja.
+
+        Cada caja aporta sus tres esquinas (derecha, frontal y superior) y
+        la proyección de cada una sobre las caras de las cajas ya colocadas
+        (o las paredes del pallet) en los otros dos ejes.
+        """
+        x, y, z = box.position
+        x2, y2, z2 = x + box.width, y + box.length, z + box.height
+
+        # Descartar los puntos que quedan dentro de la nueva caja
+        self.extreme_points = {
+            p for p in self.extreme_points
+            if not (x <= p[0] < x2 and y <= p[1] < y2 and z <= p[2] < z2)
+        }
+
+        new_points = [
+            (x2, y, z), (x2, self.store.project((x2, y, z), 1), z),
+            (x2, y, self.store.project((x2, y, z), 2)),
+            (x, y2, z), (self.store.project((x, y2, z), 0), y2, z),
+            (x, y2, self.store.project((x, y2, z), 2)),
+            (x, y, z2), (self.store.project((x, y, z2), 0), y, z2),
+            (x, self.store.project((x, y, z2), 1), z2),
+        ]
+        for px, py, pz in new_points:
+            if px < self.max_width and py < self.max_length and pz < self.max_height:
+                self.extreme_points.add((px, py, pz))
+
+    @property
+    def _cog_limited(self) -> bool:
+        return self.max_cog_offset is not None or self.max_cog_height is not None
+
+    def _box_cog_allows(self, box: Box, positions, dims) -> np.ndarray:
+        """Envolvente del centro de gravedad para la caja en k posiciones candidatas."""
+        centers = np.asarray(positions, dtype=np.float64).reshape(-1, 3) + np.asarray(dims, dtype=np.float64) / 2
+        return self._cog_allows(box.weight, box.weight * centers)
+
+    def _cog_allows(self, weight: float, moments: np.ndarray) -> np.ndarray:
+        """
+        Comprueba la envolvente del centro de gravedad para k cargas candidatas.
+
+        Una carga es admisible si deja el centro de gravedad dentro de los
+        límites o, si ya estaba fuera, no lo aleja más: la primera caja de un
+        pallet vacío casi nunca queda centrada y las siguientes deben ir
+        corrigiéndolo. Con los momentos acumulados cada candidato cuesta O(1).
+
+        Args:
+            weight: Peso que añade cada candidato
+            moments: Array (k, 3) con la suma de peso * centro de lo que añade cada candidato
+
+        Returns:
+            Array booleano (k,) con True en los candidatos admisibles
+        """
+        moments = np.asarray(moments, dtype=np.float64).reshape(-1, 3)
+        allowed = np.ones(len(moments), dtype=bool)
+        total = self.current_weight + weight
+        if total <= 0:
+            return allowed
+        cog = (np.asarray(self.weighted_moments) + moments) / total
+        current = self.get_center_of_mass() if self.current_weight > 0 else None
+        if self.max_cog_offset is not None:
+            center_x, center_y = self.max_width / 2, self.max_length / 2
+            limit = np.inf
+            if current is not None:
+                limit = max(self.max_cog_offset, np.hypot(current[0] - center_x, current[1] - center_y))
+            allowed &= np.hypot(cog[:, 0] - center_x, cog[:, 1] - center_y) <= limit + EPSILON
+        if self.max_cog_height is not None:
+            limit = np.inf if current is None else max(self.max_cog_height, current[2])
+            allowed &= cog[:, 2] <= limit + EPSILON
+        return allowed
+
+    def _cog_excess(self, weight: float, moments: np.ndarray) -> np.ndarray:
+        """
+        Distancia a la que cada carga candidata deja el centro de gravedad fuera de la envolvente.
+
+        Suma lo que el centro se pasa del radio max_cog_offset y de la altura
+        max_cog_height, y vale 0 si queda dentro. Entre las colocaciones que
+        _cog_allows admite, las de menor exceso son las que devuelven el
+        pallet a la envolvente.
+
+        Args:
+            weight: Peso que añade cada candidato
+            moments: Array (k, 3) con la suma de peso * centro de lo que añade cada candidato
+
+        Returns:
+            Array (k,) con el exceso de cada candidato
+        """
+        moments = np.asarray(moments, dtype=np.float64).reshape(-1, 3)
+        excess = np.zeros(len(moments))
+        total = self.current_weight + weight
+        if total <= 0:
+            return excess
+        cog = (np.asarray(self.weighted_moments) + moments) / total
+        if self.max_cog_offset is not None:
+            offset = np.hypot(cog[:, 0] - self.max_width / 2, cog[:, 1] - self.max_length / 2)
+            excess += np.maximum(offset - self.max_cog_offset, 0.0)
+        if self.max_cog_height is not None:
+            excess += np.maximum(cog[:, 2] - self.max_cog_height, 0.0)
+        # Las diferencias de redondeo no deben alterar el orden de los candidatos
+        excess[excess <= EPSILON] = 0.0
+        return excess
+
+    def _box_cog_excess(self, box: Box, positions, dims) -> np.ndarray:
+        """Exceso del centro de gravedad (ver _cog_excess) para la caja en k posiciones candidatas."""
+        centers = np.asarray(positions, dtype=np.float64).reshape(-1, 3) + np.asarray(dims, dtype=np.float64) / 2
+        return self._cog_excess(box.weight, box.weight * centers)
+
+    def cog_excess(self, box: Box, position: Point, orientation: Optional[int] = None) -> float:
+        """Cuánto quedaría el centro de gravedad fuera de la envolvente al colocar la caja (0 si dentro)."""
+        if not self._cog_limited:
+            return 0.0
+        if orientation is None:
+            orientation = box.orientation
+        return float(self._box_cog_excess(box, position, oriented_dims(box, orientation))[0])
+
+    def balanced_footprints(self, boxes: Sequence[Box], footprints: Sequence[Footprint]) -> List[Footprint]:
+        """Refleja la capa en X, en Y o en ambos para acercar el centro de gravedad al del pallet.
+
+        Se prefieren los reflejos en que todas las cajas quedan apoyadas y,
+        entre ellos, el de menor exceso sobre la envolvente y después el más
+        centrado. Sin envolvente, o si ningún reflejo mejora, se devuelven
+        las huellas tal cual.
+        """
+        footprints = list(footprints)
+        if not self._cog_limited or not boxes:
+            return footprints
+        weights = np.array([box.weight for box in boxes], dtype=np.float64)
+        best, best_key = footprints, None
+        for flip_x in (False, True):
+            for flip_y in (False, True):
+                variant = [(max(0.0, self.max_width - x - width) if flip_x else x,
+                            max(0.0, self.max_length - y - length) if flip_y else y, width, length)
+                           for x, y, width, length in footprints]
+                positions, dims, _ = self._layer_geometry(boxes, variant)
+                moments = weights @ (positions + dims / 2)
+                cog = (np.asarray(self.weighted_moments) + moments) / (self.current_weight + weights.sum())
+                key = (self.top_height > 0 and not self._supported(positions, dims).all(),
+                       float(self._cog_excess(weights.sum(), moments)[0]),
+                       float(np.hypot(cog[0] - self.max_width / 2, cog[1] - self.max_length / 2)))
+                if best_key is None or key < best_key:
+                    best, best_key = variant, key
+        return best
+
+    def cog_within_limits(self) -> bool:
+        """Verifica si el centro de gravedad actual está dentro de la envolvente."""
+        center_x, center_y, center_z = self.get_center_of_mass()
+        if self.max_cog_offset is not None and \
+                np.hypot(center_x - self.max_width / 2, center_y - self.max_length / 2) > self.max_cog_offset + EPSILON:
+            return False
+        return self.max_cog_height is None or center_z <= self.max_cog_height + EPSILON
+
     def get_center_of_mass(self) -> Tuple[float, float, float]:
         """Calcula el centro de masa del pallet."""
         if not self.boxes:
             return (self.max_width/2, self.max_length/2, 0)
         
-        total_weight = sum(box.weight for box in self.boxes)
+        total_weight = self.current_weight
         if total_weight == 0:
             return (self.max_width/2, self.max_length/2, 0)
         
-        center_x = sum(box.weight * (box.position[0] + box.width/2) for box in self.boxes) / total_weight
-        center_y = sum(box.weight * (box.position[1] + box.length/2) for box in self.boxes) / total_weight
-        center_z = sum(box.weight * (box.position[2] + box.height/2) for box in self.boxes) / total_weight
+        # Los momentos se acumulan en cada colocación: el cálculo es O(1)
+        center_x, center_y, center_z = (m / total_weight for m in self.weighted_moments)
         
         return (center_x, center_y, center_z)
     
     def get_stability_score(self) -> float:
         """Calcula un score de estabilidad para el pallet."""
-        score = 1.0
-        
-        for box in self.boxes:
-            # Verificar si la caja tiene soporte
-            has_support = False
-            if box.position[2] == 0:  # Si está en el suelo
-                has_support = True
-            else:
-                for other_box in self.boxes:
-                    if other_box != box:
-                        # Verificar si hay soporte debajo
-                        if (other_box.position[2] + other_box.height == box.position[2] and
-                            other_box.position[0] <= box.position[0] + box.width and
-                            other_box.position[0] + other_box.width >= box.position[0] and
-                            other_box.position[1] <= box.position[1] + box.length and
-                            other_box.position[1] + other_box.length >= box.position[1]):
-                            has_support = True
-                            break
-            
-            if not has_support:
-                score -= 0.1  # Penalización por cada caja sin soporte
-        
-        return max(0, min(1, score))  # Asegurar que el score esté entre 0 y 1
+        # Penalización por cada caja sin soporte; el grafo de apoyo ya guarda
+        # la fracción apoyada de cada caja
+        unsupported = self.support.unsupported_count(self.min_support_ratio)
+        return max(0, min(1, 1.0 - UNSUPPORTED_PENALTY * unsupported))  # Asegurar que el score esté entre 0 y 1
 
     def can_fit(self, box: Box) -> bool:
         """Verifica si la caja puede caber en el pallet."""
@@ -143,13 +765,10 @@ class Pallet:
         if self.current_weight + box.weight > self.max_weight:
             return False
 
-        # Verificar límites de dimensiones
-        if (box.width > self.max_width or 
-            box.length > self.max_length or 
-            box.height > self.max_height):
-            return False
-
-        return True
+        # Verificar límites de dimensiones en alguna de las orientaciones admitidas
+        _, table = allowed_orientations(box)
+        limits = np.array([self.max_width, self.max_length, self.max_height])
+        return bool(np.any(np.all(table <= limits, axis=1)))
 
     def _is_position_available(self, x: float, y: float, z: float, box: Box) -> bool:
         """Verifica si una posición específica está disponible."""
@@ -159,82 +778,57 @@ class Pallet:
             z + box.height > self.max_height):
             return False
 
-        # Verificar colisiones con otras cajas
-        for occupied in self.occupied_space:
-            ox, oy, oz, ow, ol, oh = occupied
-            if not (x + box.width <= ox or ox + ow <= x or
-                    y + box.length <= oy or oy + ol <= y or
-                    z + box.height <= oz or oz + oh <= z):
-                return False
+        if self.height_map is not None:
+            return z >= self.height_map.resting_z(x, y, box.width, box.length) - EPSILON
 
-        return True
+        # Verificar colisiones con todas las cajas de una vez
+        return not self.store.collides((x, y, z), (box.width, box.length, box.height))
 
     def _get_supported_area(self, z: float) -> List[Tuple[float, float, float, float]]:
         """Obtiene las áreas soportadas en una altura específica."""
-        supported_areas = []
-        current_z = z
-
         # Encontrar todas las cajas que soportan esta altura
-        supporting_boxes = [box for box in self.boxes 
-                          if box.position[2] + box.height == current_z]
+        supporting = self.store.tops_at(z)
 
-        if not supporting_boxes:
+        if len(supporting) == 0:
             # Si no hay cajas soportando, el área soportada es el piso del pallet
             return [(0, 0, self.max_width, self.max_length)]
 
         # Calcular las áreas soportadas por las cajas
-        for box in supporting_boxes:
-            x, y, _ = box.position
-            supported_area = (x, y, x + box.width, y + box.length)
-            supported_areas.append(supported_area)
+        mins = self.store.mins[supporting, :2]
+        maxs = self.store.maxs[supporting, :2]
+        return [(float(x1), float(y1), float(x2), float(y2))
+                for (x1, y1), (x2, y2) in zip(mins, maxs)]
 
-        return supported_areas
+    def _supported(self, positions, dims) -> np.ndarray:
+        """Para k candidatos, si su base queda apoyada según min_support_ratio."""
+        ratios = self.support.support_ratios(positions, dims)
+        if self.min_support_ratio > 0:
+            return ratios >= self.min_support_ratio - EPSILON
+        return ratios > 0
+
+    def support_ratio(self, x: float, y: float, box: Box, z: float) -> float:
+        """Fracción de la base de la caja que quedaría apoyada en la posición dada."""
+        if self.height_map is not None and z > self.support.tolerance:
+            return self.height_map.supported_fraction(x, y, box.width, box.length, z)
+        return float(self.support.support_ratios((x, y, z), (box.width, box.length, box.height))[0])
 
     def _is_position_supported(self, x: float, y: float, box: Box, z: float) -> bool:
         """Verifica si una posición está soportada por cajas debajo."""
-        if z == 0:  # Si está en el piso, siempre está soportada
-            return True
-
-        supported_areas = self._get_supported_area(z)
-        box_area = (x, y, x + box.width, y + box.length)
-
-        # Verificar si el área de la caja está completamente soportada
-        for area in supported_areas:
-            ax1, ay1, ax2, ay2 = area
-            bx1, by1, bx2, by2 = box_area
-
-            # Verificar si hay superposición
-            if not (bx2 <= ax1 or bx1 >= ax2 or by2 <= ay1 or by1 >= ay2):
-                return True
-
-        return False
+        # En el piso siempre está soportada; encima, según el grafo de apoyo
+        ratio = self.support_ratio(x, y, box, z)
+        if self.min_support_ratio > 0:
+            return ratio >= self.min_support_ratio - EPSILON
+        return ratio > 0
 
     def add_box(self, box: Box) -> bool:
         """Intenta agregar una caja al pallet."""
         if not self.can_fit(box):
             return False
 
-        # Buscar la mejor posición en todas las capas posibles
-        best_position = None
-        min_z = float('inf')
-
-        # Probar diferentes alturas
-        for z in range(0, int(self.max_height - box.height) + 1):
-            # Probar diferentes posiciones en x e y
-            for y in range(0, int(self.max_length - box.length) + 1):
-                for x in range(0, int(self.max_width - box.width) + 1):
-                    if (self._is_position_available(x, y, z, box) and 
-                        self._is_position_supported(x, y, box, z)):
-                        if z < min_z:
-                            min_z = z
-                            best_position = (x, y, z)
-
-        if best_position is not None:
-            x, y, z = best_position
-            box.position = (x, y, z)
-            self.boxes.append(box)
-            self.occupied_space.append((x, y, z, box.width, box.length, box.height))
-            self.current_weight += box.weight
+        # Buscar la posición soportada más baja entre los puntos extremos
+        placement = self._first_valid_placement(box, require_support=True)
+        if placement is not None:
+            self._place_oriented(box, *placement)
             return True
 
-        return False 
\ No newline at end of file
+        return False
@@ -0,0 +1,114 @@
+from bisect import bisect_left, insort
+from typing import Iterator, List, Tuple
+from .box import Box
+from .heightmap import EPSILON
+from .orientation import min_height
+from .pallet import Pallet
+
+class PalletIndex:
+    """Índice de pallets abiertos por capacidad restante.
+
+    Un árbol de segmentos guarda, para cada rango de pallets, el máximo de
+    peso, altura y volumen restantes; así First-Fit desciende solo por las
+    ramas que pueden admitir la caja. Una lista ordenada por volumen restante
+    permite a Best-Fit empezar directamente por el pallet más ajustado.
+    Ambos filtros se aplican antes de cualquier comprobación geométrica.
+    """
+    def __init__(self) -> None:
+        self.pallets: List[Pallet] = []
+        self._capacity = 1
+        # Árbol implícito: el nodo i tiene hijos 2i y 2i+1; las hojas empiezan en _capacity
+        self._tree: List[List[float]] = [[float('-inf')] * 2 for _ in range(3)]
+        self._by_volume: List[Tuple[float, int]] = []
+        self._volume_keys: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.pallets)
+
+    @staticmethod
+    def _remaining(pallet: Pallet) -> Tuple[float, float, float]:
+        """Peso, altura y volumen restantes del pallet."""
+        return (pallet.max_weight - pallet.current_weight,
+                pallet.max_height - pallet.top_height,
+                pallet.remaining_volume())
+
+    @staticmethod
+    def _required(box: Box, check_height: bool = True) -> Tuple[float, float, float]:
+        """Peso, altura y volumen que necesita la caja."""
+        height = min_height(box) - EPSILON if check_height else float('-inf')
+        return (box.weight - EPSILON, height, box.volume() - EPSILON)
+
+    def add(self, pallet: Pallet) -> int:
+        """Añade un pallet al índice y devuelve su posición."""
+        index = len(self.pallets)
+        self.pallets.append(pallet)
+        if index == self._capacity:
+            self._capacity *= 2
+            self._tree = [[float('-inf')] * (2 * self._capacity) for _ in range(3)]
+            for i, other in enumerate(self.pallets[:-1]):
+                self._set_leaf(i, self._remaining(other))
+            for node in range(self._capacity - 1, 0, -1):
+                self._pull(node)
+        self._volume_keys.append(pallet.remaining_volume())
+        insort(self._by_volume, (self._volume_keys[index], index))
+        self._set_leaf(index, self._remaining(pallet))
+        self._propagate(index)
+        return index
+
+    def update(self, index: int) -> None:
+        """Refresca la capacidad restante de un pallet tras colocar cajas."""
+        pallet = self.pallets[index]
+        old_key = (self._volume_keys[index], index)
+        del self._by_volume[bisect_left(self._by_volume, old_key)]
+        self._volume_keys[index] = pallet.remaining_volume()
+        insort(self._by_volume, (self._volume_keys[index], index))
+        self._set_leaf(index, self._remaining(pallet))
+        self._propagate(index)
+
+    def _set_leaf(self, index: int, values: Tuple[float, float, float]) -> None:
+        for tree, value in zip(self._tree, values):
+            tree[self._capacity + index] = value
+
+    def _pull(self, node: int) -> None:
+        for tree in self._tree:
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+
+    def _propagate(self, index: int) -> None:
+        node = (self._capacity + index) // 2
+        while node:
+            self._pull(node)
+            node //= 2
+
+    def _admits(self, node: int, required: Tuple[float, float, float]) -> bool:
+        return all(tree[node] >= need for tree, need in zip(self._tree, required))
+
+    def iter_first_fit(self, box: Box, check_height: bool = True) -> Iterator[int]:
+        """Recorre, de izquierda a derecha, los pallets con capacidad para la caja.
+
+        Las ramas cuyo máximo no alcanza lo que pide la caja se descartan sin
+        visitarlas; el primer candidato se encuentra en O(log n) cuando un
+        mismo pallet domina los tres criterios.
+
+        Con check_height=False no se exige altura libre sobre la carga, para
+        estrategias que también rellenan huecos por debajo de la cima.
+        """
+        required = self._required(box, check_height)
+        stack = [1]
+        while stack:
+            node = stack.pop()
+            if not self._admits(node, required):
+                continue
+            if node >= self._capacity:
+                yield node - self._capacity
+            else:
+                stack.append(2 * node + 1)
+                stack.append(2 * node)
+
+    def iter_best_fit(self, box: Box) -> Iterator[int]:
+        """Recorre los pallets con capacidad para la caja, del menor al mayor volumen restante."""
+        required = self._required(box)
+        start = bisect_left(self._by_volume, (required[2], -1))
+        for position in range(start, len(self._by_volume)):
+            index = self._by_volume[position][1]
+            if self._admits(self._capacity + index, required):
+                yield index
@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .box import Box
+from .box_batch import BoxBatch
+from .heightmap import EPSILON
+from .pallet import Footprint, Pallet
+
+# Tipos de patrón de capa, del más sencillo al más elaborado; en caso de
+# empate en número de cajas se prefiere el primero
+PATTERN_KINDS = ('block', 'rows', 'pinwheel')
+
+# Caja idéntica: misma huella, altura, peso y modo de rotación; si la caja
+# puede girar sobre el eje vertical, la huella no depende de su giro actual
+SkuKey = Tuple[float, float, float, float, str]
+
+@dataclass(frozen=True)
+class LayerPattern:
+    """Disposición de cajas iguales en una capa del pallet."""
+    kind: str
+    footprints: Tuple[Footprint, ...]  # (x, y, width, length) de cada hueco
+
+    @property
+    def count(self) -> int:
+        return len(self.footprints)
+
+    def coverage(self, max_width: float, max_length: float) -> float:
+        """Fracción de la superficie del pallet cubierta por la capa."""
+        return sum(width * length for _, _, width, length in self.footprints) / (max_width * max_length)
+
+def sku_key(box: Box) -> SkuKey:
+    if box.rotation == 'fixed':
+        return (box.width, box.length, box.height, box.weight, box.rotation)
+    # Los patrones prueban los dos giros: una caja ya girada sigue en su grupo
+    return (min(box.width, box.length), max(box.width, box.length), box.height, box.weight, box.rotation)
+
+def group_by_sku(boxes: Iterable[Box]) -> Dict[SkuKey, List[Box]]:
+    """Agrupa las cajas idénticas, en orden de primera aparición."""
+    if isinstance(boxes, BoxBatch):
+        # Cajas independientes: place_layer puede girarlas
+        boxes = boxes.boxes()
+    groups: Dict[SkuKey, List[Box]] = {}
+    for box in boxes:
+        groups.setdefault(sku_key(box), []).append(box)
+    return groups
+
+def _grid(x: float, y: float, width: float, length: float, columns: int, rows: int) -> List[Footprint]:
+    """Huellas de una rejilla de columns x rows cajas con esquina en (x, y)."""
+    return [(x + i * width, y + j * length, width, length) for j in range(rows) for i in range(columns)]
+
+def _fits(size: float, space: float) -> int:
+    """Cuántas cajas de lado size caben en space."""
+    return int(np.floor(space / size + EPSILON)) if size > 0 else 0
+
+def _is_valid(footprints: List[Footprint], max_width: float, max_length: float) -> bool:
+    """Comprueba que las huellas quedan dentro del pallet y no se solapan."""
+    if not footprints:
+        return False
+    rects = np.array(footprints, dtype=np.float64)
+    mins, maxs = rects[:, :2], rects[:, :2] + rects[:, 2:]
+    if (mins < -EPSILON).any() or (maxs[:, 0] > max_width + EPSILON).any() or \
+            (maxs[:, 1] > max_length + EPSILON).any():
+        return False
+    overlap = ((mins[:, None, :] < maxs[None, :, :] - EPSILON) &
+               (mins[None, :, :] < maxs[:, None, :] - EPSILON)).all(axis=2)
+    np.fill_diagonal(overlap, False)
+    return not overlap.any()
+
+def block_pattern(width: float, length: float, max_width: float, max_length: float) -> List[Footprint]:
+    """Todas las cajas con la misma orientación, en la mejor de las dos."""
+    options = [_grid(0, 0, w, l, _fits(w, max_width), _fits(l, max_length))
+               for w, l in ((width, length), (length, width))]
+    return max(options, key=len)
+
+def fixed_block_pattern(width: float, length: float, max_width: float, max_length: float) -> List[Footprint]:
+    """Bloque sin girar ninguna caja, para cajas con rotación 'fixed'."""
+    return _grid(0, 0, width, length, _fits(width, max_width), _fits(length, max_length))
+
+def rows_pattern(width: float, length: float, max_width: float, max_length: float) -> List[Footprint]:
+    """Filas (o columnas) de una orientación seguidas de filas de la orientación girada."""
+    best: List[Footprint] = []
+    for w, l in ((width, length), (length, width)):
+        # Filas a lo largo del largo del pallet
+        for rows in range(_fits(l, max_length) + 1):
+            first = _grid(0, 0, w, l, _fits(w, max_width), rows)
+            rest = max_length - rows * l
+            second = _grid(0, rows * l, l, w, _fits(l, max_width), _fits(w, rest))
+            if len(first) + len(second) > len(best):
+                best = first + second
+        # Columnas a lo ancho del pallet
+        for columns in range(_fits(w, max_width) + 1):
+            first = _grid(0, 0, w, l, columns, _fits(l, max_length))
+            rest = max_width - columns * w
+            second = _grid(columns * w, 0, l, w, _fits(l, rest), _fits(w, max_length))
+            if len(first) + len(second) > len(best):
+                best = first + second
+    return best
+
+def pinwheel_pattern(width: float, length: float, max_width: float, max_length: float) -> List[Footprint]:
+    """Cuatro bloques girados alrededor del centro del pallet (molinete).
+
+    Los bloques opuestos son iguales: uno en la esquina inferior izquierda
+    con la caja tal cual y otro en la inferior derecha con la caja girada,
+    repetidos por simetría central en las esquinas contrarias.
+    """
+    best: List[Footprint] = []
+    w, l = width, length
+    for columns in range(1, _fits(w, max_width) + 1):
+        for rows in range(1, _fits(l, max_length) + 1):
+            block_w, block_l = columns * w, rows * l
+            side_columns = _fits(l, max_width - block_w)
+            side_rows = _fits(w, max_length - block_l)
+            side_w, side_l = side_columns * l, side_rows * w
+            footprints = (
+                _grid(0, 0, w, l, columns, rows) +
+                _grid(max_width - side_w, 0, l, w, side_columns, side_rows) +
+                _grid(max_width - block_w, max_length - block_l, w, l, columns, rows) +
+                _grid(0, max_length - side_l, l, w, side_columns, side_rows)
+            )
+            if len(footprints) > len(best) and _is_valid(footprints, max_width, max_length):
+                best = footprints
+    return best
+
+_PATTERN_BUILDERS = {
+    'block': block_pattern,
+    'rows': rows_pattern,
+    'pinwheel': pinwheel_pattern,
+}
+
+@lru_cache(maxsize=1024)
+def best_layer_pattern(width: float, length: float, max_width: float, max_length: float,
+                       rotate: bool = True) -> Optional[LayerPattern]:
+    """Patrón de capa con más cajas para una huella; se calcula una vez por SKU y pallet.
+
+    Con rotate=False (cajas que no pueden girar) solo se considera el bloque
+    con las cajas tal como llegan.
+    """
+    if not rotate:
+        footprints = fixed_block_pattern(width, length, max_width, max_length)
+        return LayerPattern('block', tuple(footprints)) if footprints else None
+    best: Optional[LayerPattern] = None
+    for kind in PATTERN_KINDS:
+        footprints = _PATTERN_BUILDERS[kind](width, length, max_width, max_length)
+        if best is None or len(footprints) > best.count:
+            best = LayerPattern(kind, tuple(footprints))
+    return best if best is not None and best.count > 0 else None
+
+def build_sku_layers(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float,
+                     max_weight: float, min_layer_count: int = 2, **pallet_options) -> Tuple[List[Pallet], List[Box]]:
+    """
+    Paletiza por capas completas los grupos de cajas idénticas.
+
+    Cada grupo se reparte en capas con su mejor patrón y cada capa se coloca
+    con Pallet.place_layer en el primer pallet que la admite, sin buscar
+    posiciones caja a caja. Las capas más densas y pesadas van abajo.
+
+    Args:
+        boxes: Cajas a paletizar (lista, generador o BoxBatch)
+        max_width: Ancho máximo del pallet
+        max_length: Largo máximo del pallet
+        max_height: Alto máximo del pallet
+        max_weight: Peso máximo del pallet
+        min_layer_count: Cajas mínimas por capa para que el patrón compense
+        **pallet_options: Restricciones de colocación de cada Pallet (ver Pallet)
+
+    Returns:
+        Pallets con las capas completas y cajas que quedan por colocar una a una
+    """
+    layers = []  # (patrón, cajas)
+    remaining: List[Box] = []
+    for (width, length, height, weight, rotation), group in group_by_sku(boxes).items():
+        pattern = best_layer_pattern(width, length, max_width, max_length, rotation != 'fixed')
+        if pattern is None or pattern.count < min_layer_count or height > max_height:
+            remaining.extend(group)
+            continue
+        full = len(group) // pattern.count
+        for i in range(full):
+            layers.append((pattern, group[i * pattern.count:(i + 1) * pattern.count]))
+        remaining.extend(group[full * pattern.count:])
+
+    layers.sort(key=lambda layer: (-layer[0].coverage(max_width, max_length), -layer[1][0].weight))
+    pallets: List[Pallet] = []
+    for pattern, layer_boxes in layers:
+        for pallet in pallets:
+            # El patrón parte de una esquina: se refleja si así equilibra mejor el pallet
+            if pallet.place_layer(layer_boxes, pallet.balanced_footprints(layer_boxes, pattern.footprints),
+                                  pattern.kind):
+                break
+        else:
+            pallet = Pallet(max_width, max_length, max_height, max_weight, **pallet_options)
+            if pallet.place_layer(layer_boxes, pallet.balanced_footprints(layer_boxes, pattern.footprints),
+                                  pattern.kind):
+                pallets.append(pallet)
+            else:
+                # La capa entera excede el peso del pallet o sus restricciones: sus cajas van una a una
+                remaining.extend(layer_boxes)
+    return pallets, remaining
@@ -0,0 +1,185 @@
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, List, Optional, Union
+import numpy as np
+from .box import Box
+from .pallet import Pallet
+from .sequence import build_sequence, sequence_ranks
+
+# Formato binario del plan de colocación:
+#   cabecera fija de HEADER_DTYPE.itemsize bytes
+#   un registro PLAN_DTYPE por caja, agrupados por pallet y en orden de colocación;
+#   el campo sequence da el paso de montaje de cada caja dentro de su pallet
+# Todos los campos son little-endian para poder leerlos con numpy.memmap en cualquier máquina.
+PLAN_MAGIC = b'PALPLAN'  # Se guarda en 8 bytes, terminado en nulo
+PLAN_VERSION = 2  # La 2 añade el paso de montaje (sequence)
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('record_size', '<u4'),
+    ('pallet_width', '<f8'),
+    ('pallet_length', '<f8'),
+    ('pallet_height', '<f8'),
+    ('pallet_weight', '<f8'),
+    ('box_count', '<u8'),
+    ('pallet_count', '<u8'),
+])
+
+PLAN_DTYPE = np.dtype([
+    ('box_id', '<i8'),
+    ('pallet', '<u4'),
+    ('sequence', '<u4'),  # Paso de montaje dentro del pallet (ver sequence.build_sequence)
+    ('orientation', 'u1'),  # Índice de orientation.ORIENTATIONS; 0 = dimensiones tal como llegan
+    ('reserved', 'u1', (7,)),
+    ('x', '<f8'),
+    ('y', '<f8'),
+    ('z', '<f8'),
+    ('width', '<f8'),
+    ('length', '<f8'),
+    ('height', '<f8'),
+    ('weight', '<f8'),
+])
+
+def plan_records(pallet: Pallet, pallet_index: int, approach: Optional[str] = None,
+                 clearance: float = 0.0) -> np.ndarray:
+    """Registros del plan para las cajas de un pallet, a partir de sus arrays."""
+    records = np.zeros(len(pallet.boxes), dtype=PLAN_DTYPE)
+    records['box_id'] = [box.id for box in pallet.boxes]
+    records['pallet'] = pallet_index
+    records['sequence'] = sequence_ranks(build_sequence(pallet, approach, clearance))
+    records['orientation'] = [box.orientation for box in pallet.boxes]
+    for axis, name in enumerate(('x', 'y', 'z')):
+        records[name] = pallet.store.mins[:, axis]
+    for axis, name in enumerate(('width', 'length', 'height')):
+        records[name] = pallet.store.dims[:, axis]
+    records['weight'] = pallet.store.weights
+    return records
+
+class PlanWriter:
+    """Escribe un plan de colocación de forma incremental.
+
+    Cada pallet se añade al final del fichero en cuanto se cierra y la
+    cabecera se actualiza con los totales, de modo que el fichero es un plan
+    válido después de cada write_pallet.
+    """
+    def __init__(self, target: Union[str, BinaryIO], max_width: float, max_length: float,
+                 max_height: float, max_weight: float, approach: Optional[str] = None,
+                 clearance: float = 0.0):
+        """
+        Args:
+            target: Ruta del fichero o flujo binario con seek (p. ej. io.BytesIO)
+            max_width, max_length, max_height, max_weight: Dimensiones del pallet
+            approach: Dirección de llegada de la pinza para el orden de montaje (ver sequence)
+            clearance: Margen lateral de la pinza para el orden de montaje
+        """
+        self.approach = approach
+        self.clearance = clearance
+        self._owns_file = isinstance(target, str)
+        self.file: BinaryIO = open(target, 'wb') if self._owns_file else target
+        self._start = self.file.tell()
+        self.header = np.zeros((), dtype=HEADER_DTYPE)
+        self.header['magic'] = PLAN_MAGIC
+        self.header['version'] = PLAN_VERSION
+        self.header['record_size'] = PLAN_DTYPE.itemsize
+        self.header['pallet_width'] = max_width
+        self.header['pallet_length'] = max_length
+        self.header['pallet_height'] = max_height
+        self.header['pallet_weight'] = max_weight
+        self._write_header()
+
+    def _write_header(self) -> None:
+        end = self.file.tell()
+        self.file.seek(self._start)
+        self.file.write(self.header.tobytes())
+        if end > self._start:
+            self.file.seek(end)
+        self.file.flush()
+
+    def write_pallet(self, pallet: Pallet) -> int:
+        """Añade las cajas de un pallet cerrado y devuelve su índice en el plan."""
+        pallet_index = int(self.header['pallet_count'])
+        self.file.write(plan_records(pallet, pallet_index, self.approach, self.clearance).tobytes())
+        self.header['pallet_count'] += 1
+        self.header['box_count'] += len(pallet.boxes)
+        self._write_header()
+        return pallet_index
+
+    def close(self) -> None:
+        if self._owns_file:
+            self.file.close()
+
+    def __enter__(self) -> 'PlanWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def write_plan(target: Union[str, BinaryIO], pallets: Iterable[Pallet], approach: Optional[str] = None,
+               clearance: float = 0.0) -> None:
+    """Escribe un plan con todos los pallets (deben compartir dimensiones) y su orden de montaje."""
+    pallets = list(pallets)
+    if not pallets:
+        raise ValueError("No hay pallets que escribir en el plan")
+    first = pallets[0]
+    with PlanWriter(target, first.max_width, first.max_length, first.max_height, first.max_weight,
+                    approach, clearance) as writer:
+        for pallet in pallets:
+            writer.write_pallet(pallet)
+
+@dataclass
+class Plan:
+    """Plan de colocación leído de disco; records es un memmap de PLAN_DTYPE."""
+    max_width: float
+    max_length: float
+    max_height: float
+    max_weight: float
+    pallet_count: int
+    records: np.ndarray
+
+    def pallet(self, index: int) -> np.ndarray:
+        """Registros de un pallet; es una vista sobre el fichero, sin copia."""
+        # Los registros están agrupados por pallet en orden creciente
+        start, stop = np.searchsorted(self.records['pallet'], [index, index + 1])
+        return self.records[start:stop]
+
+    def build_order(self, index: int) -> np.ndarray:
+        """Registros de un pallet en orden de montaje."""
+        records = self.pallet(index)
+        return records[np.argsort(records['sequence'], kind='stable')]
+
+    def to_pallets(self) -> List[Pallet]:
+        """Reconstruye los objetos Pallet del plan sin volver a ejecutar ningún algoritmo."""
+        pallets = []
+        for index in range(self.pallet_count):
+            pallet = Pallet(self.max_width, self.max_length, self.max_height, self.max_weight)
+            for record in self.pallet(index).tolist():
+                fields = dict(zip(PLAN_DTYPE.names, record))
+                box = Box(id=fields['box_id'], width=fields['width'], length=fields['length'],
+                          height=fields['height'], weight=fields['weight'],
+                          orientation=fields['orientation'])
+                if not pallet.place_box_at(box, (fields['x'], fields['y'], fields['z'])):
+                    raise ValueError(f"El plan coloca la caja {box.id} en una posición inválida")
+            pallets.append(pallet)
+        return pallets
+
+def read_plan(path: str) -> Plan:
+    """Lee un plan de colocación proyectando sus registros en memoria."""
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header[0]['magic'] != PLAN_MAGIC:
+        raise ValueError(f"El archivo {path} no es un plan de colocación")
+    header = header[0]
+    if header['version'] != PLAN_VERSION or header['record_size'] != PLAN_DTYPE.itemsize:
+        raise ValueError(f"Versión de plan no soportada: {header['version']}")
+    count = int(header['box_count'])
+    if count:
+        records = np.memmap(path, dtype=PLAN_DTYPE, mode='r', offset=HEADER_DTYPE.itemsize, shape=(count,))
+    else:
+        records = np.zeros(0, dtype=PLAN_DTYPE)
+    return Plan(
+        max_width=float(header['pallet_width']),
+        max_length=float(header['pallet_length']),
+        max_height=float(header['pallet_height']),
+        max_weight=float(header['pallet_weight']),
+        pallet_count=int(header['pallet_count']),
+        records=records,
+    )
@@ -0,0 +1,154 @@
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .algorithms import ALGORITHMS
+from .bounds import LowerBounds, lower_bounds
+from .box import Box
+from .box_batch import BoxBatch
+from .metrics import mean_quality
+from .pallet import Pallet
+
+@dataclass
+class AlgorithmResult:
+    """Resultado de un algoritmo dentro del portafolio."""
+    name: str
+    status: str  # 'ok', 'error', 'timeout' o 'cancelled' (otro alcanzó la cota inferior)
+    seconds: float  # tiempo de reloj hasta terminar o cancelarse
+    pallets: Optional[List[Pallet]] = field(default=None, repr=False)
+    unplaced: int = 0  # cajas que el algoritmo no consiguió colocar
+    quality: float = 0.0  # calidad media de los pallets (metrics.mean_quality)
+    error: Optional[str] = None
+
+    def rank_key(self) -> Tuple[int, int, float]:
+        """Clave de ordenación: menos cajas sin colocar, menos pallets, más calidad."""
+        return (self.unplaced, len(self.pallets), -self.quality)
+
+@dataclass
+class PortfolioResult:
+    """Resultados de todos los algoritmos y el mejor plan encontrado."""
+    results: List[AlgorithmResult]
+    best: Optional[AlgorithmResult]
+    bounds: LowerBounds
+
+    @property
+    def gap(self) -> Optional[float]:
+        """Distancia relativa del mejor plan a la cota inferior."""
+        return self.bounds.gap(len(self.best.pallets)) if self.best is not None else None
+
+    @property
+    def pallets(self) -> List[Pallet]:
+        return self.best.pallets if self.best is not None else []
+
+    def timings(self) -> Dict[str, float]:
+        """Segundos empleados por cada algoritmo."""
+        return {result.name: result.seconds for result in self.results}
+
+def _run_algorithm(connection, name: str, boxes: List[Box], dims: Tuple[float, float, float, float],
+                   pallet_options: Dict) -> None:
+    """Ejecuta un algoritmo en un proceso hijo y envía los pallets por la tubería."""
+    try:
+        pallets = ALGORITHMS[name](boxes, *dims, **pallet_options)
+        connection.send(('ok', pallets))
+    except Exception as error:  # El fallo de un algoritmo no debe tumbar el portafolio
+        connection.send(('error', f"{type(error).__name__}: {error}"))
+    finally:
+        connection.close()
+
+def run_portfolio(boxes: Iterable[Box], max_width: float, max_length: float, max_height: float,
+                  max_weight: float, algorithms: Optional[Sequence[str]] = None,
+                  deadline_seconds: Optional[float] = None,
+                  max_workers: Optional[int] = None,
+                  pallet_options: Optional[Dict] = None) -> PortfolioResult:
+    """
+    Ejecuta varios algoritmos en paralelo sobre el mismo pedido y devuelve el mejor plan.
+
+    Cada algoritmo corre en su propio proceso. Al vencer el plazo, los
+    procesos que siguen en marcha se terminan y los que no llegaron a
+    arrancar se descartan; ambos se marcan como 'timeout'. Si un algoritmo
+    coloca todas las cajas en tantos pallets como la cota inferior, el plan
+    es óptimo en pallets y el resto se cancela sin esperar al plazo.
+
+    Args:
+        boxes: Cajas a paletizar
+        max_width: Ancho máximo del pallet
+        max_length: Largo máximo del pallet
+        max_height: Alto máximo del pallet
+        max_weight: Peso máximo del pallet
+        algorithms: Nombres de ALGORITHMS a ejecutar (por defecto, todos)
+        deadline_seconds: Plazo total de reloj; None para esperar a todos
+        max_workers: Procesos simultáneos (por defecto, número de CPUs)
+        pallet_options: Restricciones de colocación de cada Pallet (ver Pallet)
+
+    Returns:
+        PortfolioResult con el resultado de cada algoritmo y el mejor
+    """
+    names = list(algorithms) if algorithms is not None else list(ALGORITHMS)
+    unknown = [name for name in names if name not in ALGORITHMS]
+    if unknown:
+        raise ValueError(f"Algoritmos desconocidos: {unknown}")
+    # Los hijos reciben cajas independientes, no vistas sobre un lote
+    box_list = list(boxes.boxes()) if isinstance(boxes, BoxBatch) else list(boxes)
+    dims = (max_width, max_length, max_height, max_weight)
+    max_workers = max_workers or os.cpu_count() or 1
+    bounds = lower_bounds(box_list, *dims)
+    optimal_found = False
+
+    start = time.perf_counter()
+    deadline = start + deadline_seconds if deadline_seconds is not None else None
+    pending = list(names)
+    running = {}  # conexión -> (nombre, proceso, instante de arranque)
+    results: Dict[str, AlgorithmResult] = {}
+
+    while (pending or running) and not optimal_found:
+        while pending and len(running) < max_workers:
+            name = pending.pop(0)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_algorithm,
+                                              args=(sender, name, box_list, dims, pallet_options or {}),
+                                              daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (name, process, time.perf_counter())
+
+        timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        ready = wait(list(running), timeout)
+        if not ready:
+            break  # Plazo vencido
+
+        for receiver in ready:
+            name, process, started = running.pop(receiver)
+            try:
+                status, payload = receiver.recv()
+            except EOFError:
+                status, payload = 'error', "El proceso terminó sin devolver resultado"
+            receiver.close()
+            process.join()
+            seconds = time.perf_counter() - started
+            if status == 'ok':
+                placed = sum(len(pallet.boxes) for pallet in payload)
+                results[name] = AlgorithmResult(name, 'ok', seconds, pallets=payload,
+                                                unplaced=len(box_list) - placed,
+                                                quality=mean_quality(payload))
+                if placed == len(box_list) and len(payload) <= bounds.best:
+                    optimal_found = True
+            else:
+                results[name] = AlgorithmResult(name, 'error', seconds, error=payload)
+
+    # Cancelar lo que siga en marcha al vencer el plazo o al alcanzar la cota
+    status = 'cancelled' if optimal_found else 'timeout'
+    now = time.perf_counter()
+    for receiver, (name, process, started) in running.items():
+        process.terminate()
+        process.join()
+        receiver.close()
+        results[name] = AlgorithmResult(name, status, now - started)
+    for name in pending:
+        results[name] = AlgorithmResult(name, status, 0.0)
+
+    ordered = [results[name] for name in names]
+    finished = [result for result in ordered if result.status == 'ok']
+    best = min(finished, key=AlgorithmResult.rank_key) if finished else None
+    return PortfolioResult(results=ordered, best=best, bounds=bounds)
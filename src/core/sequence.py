@@ -0,0 +1,104 @@
+import heapq
+from typing import List, Optional
+import numpy as np
+from .box_store import CHUNK_SIZE
+from .pallet import Pallet
+
+# Direcciones desde las que la pinza acerca la caja: (eje, sentido de llegada).
+# 'top' baja en vertical; '+x' entra desde el lado de x máxima, etc.
+APPROACH_DIRECTIONS = {
+    'top': (2, 1),
+    '+x': (0, 1),
+    '-x': (0, -1),
+    '+y': (1, 1),
+    '-y': (1, -1),
+}
+
+def _approach_successors(mins: np.ndarray, maxs: np.ndarray, approach: str, clearance: float,
+                         tolerance: float) -> List[np.ndarray]:
+    """
+    Para cada caja, las cajas que estorbarían a la pinza si ya estuvieran colocadas.
+
+    Una caja estorba si está en el prisma que recorre la caja al llegar: por
+    delante de ella en el sentido de llegada y solapando su sección, ampliada
+    en clearance a cada lado. Esas cajas deben colocarse después.
+    """
+    if approach not in APPROACH_DIRECTIONS:
+        raise ValueError(f"Dirección de aproximación desconocida: {approach}")
+    axis, sign = APPROACH_DIRECTIONS[approach]
+    across = [a for a in range(3) if a != axis]
+    count = len(mins)
+    successors: List[np.ndarray] = []
+    step = max(1, CHUNK_SIZE // max(count, 1))
+    for start in range(0, count, step):
+        block = slice(start, start + step)
+        lo, hi = mins[block], maxs[block]
+        if sign > 0:
+            ahead = mins[None, :, axis] >= hi[:, None, axis] - tolerance
+        else:
+            ahead = maxs[None, :, axis] <= lo[:, None, axis] + tolerance
+        for a in across:
+            ahead &= (lo[:, None, a] - clearance < maxs[None, :, a]) & (hi[:, None, a] + clearance > mins[None, :, a])
+        rows, cols = np.nonzero(ahead)
+        splits = np.searchsorted(rows, np.arange(1, len(lo)))
+        successors.extend(np.split(cols, splits))
+    return successors
+
+def build_sequence(pallet: Pallet, approach: Optional[str] = None, clearance: float = 0.0) -> List[int]:
+    """
+    Calcula un orden de montaje válido para un pallet terminado.
+
+    Cada caja va después de las cajas que la sostienen (el grafo de apoyo
+    del pallet) y, si se indica approach, antes de las que bloquearían el
+    recorrido de la pinza hacia ella. El orden es una ordenación topológica
+    (algoritmo de Kahn) que, entre las cajas disponibles, elige siempre la
+    colocada antes: si el orden de colocación ya es montable, se conserva.
+
+    Args:
+        pallet: Pallet con las cajas ya colocadas
+        approach: Dirección de llegada de la pinza (ver APPROACH_DIRECTIONS) o None
+        clearance: Margen lateral que ocupa la pinza alrededor de la caja
+
+    Returns:
+        Índices de pallet.boxes en orden de montaje
+
+    Raises:
+        ValueError: Si las restricciones forman un ciclo y no hay orden posible
+    """
+    count = len(pallet.boxes)
+    successors: List[List[int]] = [[] for _ in range(count)]
+    for box, below in enumerate(pallet.support.below):
+        for supporter in below:
+            successors[supporter].append(box)
+    if approach is not None and count:
+        blocking = _approach_successors(pallet.store.mins, pallet.store.maxs, approach, clearance,
+                                        pallet.support.tolerance)
+        for box, blockers in enumerate(blocking):
+            successors[box].extend(blockers.tolist())
+
+    indegree = [0] * count
+    for box in range(count):
+        # Una caja puede sostener a otra y además estar en su recorrido: la arista cuenta una vez
+        successors[box] = list(set(successors[box]))
+        for successor in successors[box]:
+            indegree[successor] += 1
+
+    ready = [box for box in range(count) if indegree[box] == 0]
+    heapq.heapify(ready)
+    order: List[int] = []
+    while ready:
+        box = heapq.heappop(ready)
+        order.append(box)
+        for successor in successors[box]:
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                heapq.heappush(ready, successor)
+    if len(order) < count:
+        raise ValueError("No existe un orden de montaje que respete el apoyo y la aproximación de la pinza")
+    return order
+
+def sequence_ranks(order: List[int]) -> np.ndarray:
+    """Paso de montaje de cada caja a partir del orden: ranks[i] es el paso de pallet.boxes[i]."""
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[np.asarray(order, dtype=np.int64)] = np.arange(len(order))
+    return ranks
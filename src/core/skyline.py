@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+from .heightmap import EPSILON
+
+@dataclass
+class SkylineSegment:
+    """Tramo horizontal del contorno superior: cubre [x, x + width) a la altura y."""
+    x: float
+    y: float
+    width: float
+
+class SkylinePacker:
+    """Empaquetador 2D por contorno superior (skyline) para rellenar una capa.
+
+    Los rectángulos se apilan a lo largo del eje y sobre un contorno que
+    recorre el ancho del pallet. Cada rectángulo va a la posición más baja
+    (y después más a la izquierda) en la que cabe; lo que queda bajo el
+    contorno se da por ocupado, lo que mantiene el contorno con pocos tramos
+    y cada inserción en O(tramos).
+    """
+    def __init__(self, width: float, length: float):
+        self.width = width
+        self.length = length
+        self.skyline: List[SkylineSegment] = [SkylineSegment(0.0, 0.0, width)]
+        self.used_area = 0.0
+
+    def _fit(self, index: int, width: float, length: float) -> Optional[float]:
+        """Altura a la que descansaría un rectángulo que empieza en el tramo index, o None."""
+        x = self.skyline[index].x
+        if x + width > self.width + EPSILON:
+            return None
+        y = 0.0
+        remaining = width
+        while remaining > EPSILON:
+            if index == len(self.skyline):
+                return None
+            segment = self.skyline[index]
+            y = max(y, segment.y)
+            if y + length > self.length + EPSILON:
+                return None
+            remaining -= segment.width
+            index += 1
+        return y
+
+    def find_position(self, width: float, length: float,
+                      accept: Optional[Callable[[float, float, float, float], bool]] = None
+                      ) -> Optional[Tuple[float, float]]:
+        """Devuelve la posición (x, y) más baja y a la izquierda para el rectángulo, o None.
+
+        Args:
+            width: Ancho del rectángulo
+            length: Largo del rectángulo
+            accept: Filtro opcional accept(x, y, width, length) que descarta posiciones
+        """
+        candidates = []
+        for index, segment in enumerate(self.skyline):
+            y = self._fit(index, width, length)
+            if y is not None:
+                candidates.append((y, segment.x))
+        for y, x in sorted(candidates):
+            if accept is None or accept(x, y, width, length):
+                return (x, y)
+        return None
+
+    def place(self, x: float, y: float, width: float, length: float) -> None:
+        """Coloca el rectángulo y actualiza el contorno."""
+        top = y + length
+        right = x + width
+        skyline = []
+        for segment in self.skyline:
+            end = segment.x + segment.width
+            # Parte del tramo a la izquierda y a la derecha del rectángulo
+            if segment.x < x - EPSILON:
+                skyline.append(SkylineSegment(segment.x, segment.y, min(end, x) - segment.x))
+            if end > right + EPSILON:
+                start = max(segment.x, right)
+                skyline.append(SkylineSegment(start, segment.y, end - start))
+        skyline.append(SkylineSegment(x, top, width))
+        skyline.sort(key=lambda s: s.x)
+        # Unir tramos contiguos a la misma altura
+        merged = [skyline[0]]
+        for segment in skyline[1:]:
+            if abs(segment.y - merged[-1].y) <= EPSILON:
+                merged[-1].width += segment.width
+            else:
+                merged.append(segment)
+        self.skyline = merged
+        self.used_area += width * length
+
+    def insert(self, width: float, length: float, rotate: bool = False,
+               accept: Optional[Callable[[float, float, float, float], bool]] = None
+               ) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Coloca un rectángulo en la mejor posición, girándolo 90° si se permite y queda más bajo.
+
+        Args:
+            width: Ancho del rectángulo
+            length: Largo del rectángulo
+            rotate: Permitir el giro de 90°
+            accept: Filtro opcional accept(x, y, width, length) de posiciones admisibles
+
+        Returns:
+            Huella (x, y, width, length) colocada, o None si no cabe
+        """
+        options = [(width, length), (length, width)] if rotate and width != length else [(width, length)]
+        best = None
+        for w, l in options:
+            position = self.find_position(w, l, accept)
+            if position is not None:
+                # Más bajo, luego más a la izquierda, luego el que deja el contorno más bajo
+                key = (position[1], position[0], position[1] + l)
+                if best is None or key < best[0]:
+                    best = (key, (position[0], position[1], w, l))
+        if best is None:
+            return None
+        x, y, w, l = best[1]
+        self.place(x, y, w, l)
+        return (x, y, w, l)
@@ -0,0 +1,148 @@
+import os
+from typing import Dict, Iterator, List
+import numpy as np
+import pandas as pd
+from .box import Box
+from .box_batch import BOX_DTYPE, BoxBatch
+
+# Columnas que debe tener un fichero de cajas y su tipo
+BOX_COLUMNS = ('id', 'width', 'length', 'height', 'weight')
+BOX_DTYPES: Dict[str, str] = {
+    'id': 'int64',
+    'width': 'float64',
+    'length': 'float64',
+    'height': 'float64',
+    'weight': 'float64',
+}
+
+# Formatos de entrada admitidos; los columnares requieren pyarrow
+BOX_FILE_EXTENSIONS = ('.csv', '.parquet', '.arrow', '.feather', '.ipc', '.npy')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+
+# Filas leídas por bloque: acota la memoria con independencia del tamaño del fichero
+DEFAULT_CHUNK_SIZE = 65_536
+
+def iter_box_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Lee un CSV de cajas por bloques con columnas tipadas.
+
+    Solo se cargan las columnas de BOX_COLUMNS; si falta alguna, pandas
+    lanza ValueError al abrir el fichero.
+
+    Args:
+        path: Ruta al archivo CSV
+        chunk_size: Número máximo de filas por bloque
+    """
+    if chunk_size < 1:
+        raise ValueError("El tamaño de bloque debe ser positivo")
+    with pd.read_csv(path, usecols=list(BOX_COLUMNS), dtype=BOX_DTYPES,
+                     chunksize=chunk_size) as reader:
+        yield from reader
+
+def _chunk_to_boxes(chunk: pd.DataFrame) -> List[Box]:
+    """Convierte un bloque en cajas recorriendo columnas, no filas."""
+    # tolist() devuelve int/float de Python, sin pasar por una Series por fila
+    columns = [chunk[column].tolist() for column in BOX_COLUMNS]
+    return [Box(id=box_id, width=width, length=length, height=height, weight=weight)
+            for box_id, width, length, height, weight in zip(*columns)]
+
+def iter_box_batches(path: str, batch_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Box]]:
+    """Devuelve las cajas de un CSV en lotes de como mucho batch_size cajas."""
+    for chunk in iter_box_chunks(path, batch_size):
+        yield _chunk_to_boxes(chunk)
+
+def _extension(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in BOX_FILE_EXTENSIONS:
+        raise ValueError(f"Formato de archivo de cajas no soportado: {extension}")
+    return extension
+
+def iter_boxes(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Box]:
+    """Devuelve las cajas de un fichero de una en una.
+
+    Los CSV se leen por bloques: en memoria solo hay un bloque cada vez, así
+    que el generador puede pasarse directamente a los algoritmos o a la cinta
+    con exportaciones de millones de filas. Los formatos binarios se proyectan
+    en memoria con load_box_batch y se recorren sin copiarlos.
+    """
+    if _extension(path) == '.csv':
+        for batch in iter_box_batches(path, chunk_size):
+            yield from batch
+    else:
+        yield from load_box_batch(path)
+
+def count_boxes(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Cuenta las cajas de un fichero sin construirlas."""
+    if _extension(path) == '.csv':
+        return sum(len(chunk) for chunk in iter_box_chunks(path, chunk_size))
+    return len(load_box_batch(path))
+
+def load_box_batch(path: str) -> BoxBatch:
+    """Carga un fichero de cajas como BoxBatch según su extensión.
+
+    Los .npy se abren con mmap y los Parquet/Arrow se leen sobre un mapa de
+    memoria, de modo que las columnas del lote son vistas sobre el fichero
+    siempre que los tipos coinciden. Los CSV se leen por bloques y se copian.
+    """
+    extension = _extension(path)
+    if extension == '.npy':
+        return load_npy(path)
+    if extension == '.parquet':
+        return load_parquet(path)
+    if extension in ARROW_EXTENSIONS:
+        return load_arrow(path)
+    chunks = list(iter_box_chunks(path))
+    if not chunks:
+        return BoxBatch.from_structured(np.empty(0, dtype=BOX_DTYPE))
+    return BoxBatch(*(np.concatenate([chunk[column].to_numpy() for chunk in chunks])
+                      for column in BOX_COLUMNS))
+
+def load_npy(path: str) -> BoxBatch:
+    """Carga un array estructurado de NumPy (.npy) sin leerlo entero en memoria."""
+    records = np.load(path, mmap_mode='r')
+    if records.dtype.names is None:
+        raise ValueError(f"El archivo {path} no contiene un array estructurado de cajas")
+    return BoxBatch.from_structured(records)
+
+def save_npy(path: str, batch: BoxBatch) -> None:
+    """Guarda un lote de cajas como array estructurado de NumPy (.npy)."""
+    np.save(path, batch.to_structured())
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError(
+            "Para leer Parquet o Arrow hace falta pyarrow: pip install paletizacion_dhl[columnar]"
+        ) from error
+    return pyarrow
+
+def _table_to_batch(table) -> BoxBatch:
+    """Convierte una tabla de Arrow en BoxBatch; sin copia si cada columna es un solo bloque."""
+    missing = [column for column in BOX_COLUMNS if column not in table.column_names]
+    if missing:
+        raise ValueError(f"Faltan columnas en el archivo de cajas: {missing}")
+    columns = []
+    for name in BOX_COLUMNS:
+        column = table.column(name)
+        if column.num_chunks == 1:
+            array = column.chunk(0).to_numpy(zero_copy_only=False)
+        else:
+            array = column.to_numpy()
+        columns.append(np.asarray(array, dtype=BOX_DTYPE[name]))
+    return BoxBatch(*columns)
+
+def load_parquet(path: str) -> BoxBatch:
+    """Carga un fichero Parquet de cajas leyendo solo las columnas necesarias."""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, columns=list(BOX_COLUMNS), memory_map=True)
+    return _table_to_batch(table)
+
+def load_arrow(path: str) -> BoxBatch:
+    """Carga un fichero Arrow IPC (o Feather v2) proyectándolo en memoria."""
+    pyarrow = _require_pyarrow()
+    import pyarrow.ipc
+    # El mapa no se cierra: las columnas del lote apuntan a sus páginas
+    source = pyarrow.memory_map(path, 'r')
+    table = pyarrow.ipc.open_file(source).read_all()
+    return _table_to_batch(table)
@@ -0,0 +1,329 @@
+import heapq
+import math
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .box_store import BoxStore
+
+# Diferencia de altura máxima para considerar que una base descansa sobre una cara superior
+SUPPORT_TOLERANCE = 1e-6
+
+# Margen al comparar la carga sobre una caja con su carga máxima
+LOAD_TOLERANCE = 1e-9
+
+# Penalización de estabilidad por cada caja sin apoyo (Pallet.get_stability_score y metrics)
+UNSUPPORTED_PENALTY = 0.1
+
+@dataclass
+class _Level:
+    """Cajas con una cara (superior o inferior) a una misma altura, ordenadas por x mínima."""
+    xs: List[float] = field(default_factory=list)
+    ids: List[int] = field(default_factory=list)
+    rects: List[Tuple[float, float, float, float, float]] = field(default_factory=list)  # (x1, y1, x2, y2, z)
+    max_width: float = 0.0  # Para acotar qué cajas pueden solapar en x
+
+class SupportGraph:
+    """Grafo de apoyo de las cajas de un pallet, mantenido en cada colocación.
+
+    Para cada caja guarda las cajas directamente debajo con el área de
+    contacto y la fracción de su base que está apoyada. Las caras
+    superiores e inferiores se agrupan por altura (con tolerancia) y, dentro
+    de cada altura, se ordenan por x: una consulta solo examina las cajas de
+    la misma altura cuyo intervalo en x puede solapar (sweep and prune), no
+    todas las cajas del pallet.
+    """
+    def __init__(self, store: BoxStore, tolerance: float = SUPPORT_TOLERANCE):
+        if tolerance <= 0:
+            raise ValueError("La tolerancia de apoyo debe ser positiva")
+        self.store = store
+        self.tolerance = tolerance
+        self.below: List[Dict[int, float]] = []  # caja -> {caja de debajo: área de contacto}
+        self.above: List[List[int]] = []  # caja -> cajas apoyadas sobre ella
+        self.ratios: List[float] = []  # fracción apoyada de la base de cada caja
+        self._contact: List[float] = []  # Área de contacto total con las cajas de debajo
+        self._base_z: List[float] = []
+        self._tops: Dict[int, _Level] = {}  # Caras superiores por altura
+        self._bases: Dict[int, _Level] = {}  # Caras inferiores (fuera del suelo) por altura
+        # Cargas: peso de las cajas de encima que soporta cada caja, repartido por
+        # área de contacto. Solo se mantienen si alguna caja tiene carga máxima finita.
+        self.loads: List[float] = []
+        self.max_loads: List[float] = []
+        self.tracking_loads = False
+        self._limited = 0  # Cajas con carga máxima finita
+        self._load_log: List[Optional[Dict[int, float]]] = []  # Incrementos aplicados por cada add
+
+    def __len__(self) -> int:
+        return len(self.ratios)
+
+    def _key(self, z: float) -> int:
+        return int(np.floor(z / self.tolerance))
+
+    def _nearby(self, levels: Dict[int, _Level], z: float, x_min: float, x_max: float
+                ) -> List[Tuple[int, Tuple[float, float, float, float, float]]]:
+        """Cajas con la cara indicada a la altura z (± tolerancia) que pueden solapar [x_min, x_max)."""
+        found = []
+        key = self._key(z)
+        for level_key in (key - 1, key, key + 1):
+            level = levels.get(level_key)
+            if level is None:
+                continue
+            start = bisect_left(level.xs, x_min - level.max_width)
+            stop = bisect_left(level.xs, x_max)
+            found.extend(item for item in zip(level.ids[start:stop], level.rects[start:stop])
+                         if abs(item[1][4] - z) <= self.tolerance)
+        return found
+
+    def _contacts(self, levels: Dict[int, _Level], z: float, x1: float, y1: float,
+                  x2: float, y2: float) -> Dict[int, float]:
+        """Cajas de un nivel cuya huella solapa el rectángulo [x1, x2) x [y1, y2) y el área de contacto."""
+        contacts = {}
+        # Los niveles son pequeños frente al pallet: un bucle simple evita el coste fijo de NumPy
+        for index, (bx1, by1, bx2, by2, _) in self._nearby(levels, z, x1, x2):
+            overlap_x = min(bx2, x2) - max(bx1, x1)
+            overlap_y = min(by2, y2) - max(by1, y1)
+            if overlap_x > 0 and overlap_y > 0:
+                contacts[index] = overlap_x * overlap_y
+        return contacts
+
+    def support_ratios(self, positions: np.ndarray, dims: np.ndarray) -> np.ndarray:
+        """
+        Fracción apoyada de la base de k cajas candidatas.
+
+        Args:
+            positions: Array (k, 3) con las posiciones candidatas
+            dims: Array (3,) o (k, 3) con las dimensiones de cada candidato
+
+        Returns:
+            Array (k,) con 1 en el suelo y el área de contacto entre el área de la base en el resto
+        """
+        lo = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        size = np.broadcast_to(np.asarray(dims, dtype=np.float64), lo.shape)
+        ratios = (lo[:, 2] <= self.tolerance).astype(np.float64)
+        lifted = np.flatnonzero(lo[:, 2] > self.tolerance)
+        if len(lifted) == 0 or not self._tops:
+            return ratios
+        # Una consulta por altura: los candidatos de la misma altura comparten las cajas de debajo
+        heights, group = np.unique(lo[lifted, 2], return_inverse=True)
+        for level, z in enumerate(heights):
+            members = lifted[group.ravel() == level]
+            x1, y1 = lo[members, 0], lo[members, 1]
+            x2, y2 = x1 + size[members, 0], y1 + size[members, 1]
+            below = self._nearby(self._tops, z, float(x1.min()), float(x2.max()))
+            if not below:
+                continue
+            rects = np.array([rect for _, rect in below], dtype=np.float64)
+            overlap_x = np.clip(np.minimum(rects[None, :, 2], x2[:, None]) -
+                                np.maximum(rects[None, :, 0], x1[:, None]), 0, None)
+            overlap_y = np.clip(np.minimum(rects[None, :, 3], y2[:, None]) -
+                                np.maximum(rects[None, :, 1], y1[:, None]), 0, None)
+            ratios[members] = (overlap_x * overlap_y).sum(axis=1) / ((x2 - x1) * (y2 - y1))
+        return ratios
+
+    def add(self, index: int, max_load: float = math.inf) -> None:
+        """Registra la caja index del almacén, que debe ser la última añadida.
+
+        La caja puede apoyarse en cajas anteriores y, si ocupa un hueco bajo
+        una caja volada, también pasar a sostener cajas ya colocadas.
+        """
+        x1, y1, z1 = self.store.mins[index].tolist()
+        x2, y2, z2 = self.store.maxs[index].tolist()
+        below = self._contacts(self._tops, z1, x1, y1, x2, y2) if z1 > self.tolerance else {}
+        supported = self._contacts(self._bases, z2, x1, y1, x2, y2)
+
+        if math.isfinite(max_load):
+            self._limited += 1
+            if not self.tracking_loads:
+                self._rebuild_loads()
+        deltas, own_load = None, 0.0
+        if self.tracking_loads:
+            # Se calcula antes de tocar el grafo: usa el reparto previo de las cajas de encima
+            start, own_load = self._load_changes(float(self.store.weights[index]), below, supported)
+            deltas = self._spread(start)
+            for box, delta in deltas.items():
+                self.loads[box] += delta
+
+        self.below.append(below)
+        self._contact.append(sum(below.values()))
+        self._base_z.append(z1)
+        self.ratios.append(min(1.0, self._contact[-1] / ((x2 - x1) * (y2 - y1))) if z1 > self.tolerance else 1.0)
+        for supporter in below:
+            self.above[supporter].append(index)
+        self.above.append(list(supported))
+        for box, area in supported.items():
+            self.below[box][index] = area
+            self._update_ratio(box)
+        self.loads.append(own_load)
+        self.max_loads.append(max_load)
+        self._load_log.append(deltas)
+
+        self._insert(self._tops, z2, index, (x1, y1, x2, y2, z2))
+        if z1 > self.tolerance:
+            self._insert(self._bases, z1, index, (x1, y1, x2, y2, z1))
+
+    def _update_ratio(self, index: int) -> None:
+        width, length = (self.store.maxs[index, :2] - self.store.mins[index, :2]).tolist()
+        self._contact[index] = sum(self.below[index].values())
+        self.ratios[index] = min(1.0, self._contact[index] / (width * length))
+
+    def _insert(self, levels: Dict[int, _Level], z: float, index: int,
+                rect: Tuple[float, float, float, float, float]) -> None:
+        level = levels.setdefault(self._key(z), _Level())
+        slot = bisect_left(level.xs, rect[0])
+        level.xs.insert(slot, rect[0])
+        level.ids.insert(slot, index)
+        level.rects.insert(slot, rect)
+        level.max_width = max(level.max_width, rect[2] - rect[0])
+
+    def _remove(self, levels: Dict[int, _Level], z: float, index: int) -> None:
+        key = self._key(z)
+        level = levels[key]
+        slot = level.ids.index(index)
+        del level.xs[slot]
+        del level.ids[slot]
+        del level.rects[slot]
+        if not level.ids:
+            del levels[key]
+
+    def remove_last(self) -> None:
+        """Retira la última caja registrada (para deshacer colocaciones de prueba)."""
+        index = len(self.ratios) - 1
+        z1, z2 = float(self.store.mins[index, 2]), float(self.store.maxs[index, 2])
+        for box in self.above.pop():
+            del self.below[box][index]
+            self._update_ratio(box)
+        for supporter in self.below.pop():
+            self.above[supporter].remove(index)
+        self.ratios.pop()
+        self._contact.pop()
+        self._base_z.pop()
+        self.loads.pop()
+        if math.isfinite(self.max_loads.pop()):
+            self._limited -= 1
+        deltas = self._load_log.pop()
+        if self.tracking_loads:
+            if deltas is None or self._limited == 0:
+                # Caja registrada antes de empezar a seguir cargas: se recalculan al volver a hacer falta
+                self.tracking_loads = False
+            else:
+                for box, delta in deltas.items():
+                    self.loads[box] -= delta
+        self._remove(self._tops, z2, index)
+        if z1 > self.tolerance:
+            self._remove(self._bases, z1, index)
+
+    def _rebuild_loads(self) -> None:
+        """Calcula las cargas de todas las cajas registradas, de arriba abajo."""
+        count = len(self.ratios)
+        loads: Dict[int, float] = {}
+        weights = self.store.weights.tolist()
+        for box in np.argsort(-np.array(self._base_z), kind='stable').tolist():
+            self._pass_down(weights[box] + loads.get(box, 0.0), self.below[box], self._contact[box], loads)
+        self.loads = [loads.get(box, 0.0) for box in range(count)]
+        self.tracking_loads = True
+
+    @staticmethod
+    def _pass_down(amount: float, below: Dict[int, float], contact: float, loads: Dict[int, float]) -> None:
+        """Reparte amount entre las cajas de below según el área de contacto con cada una."""
+        # En el suelo (o sin apoyo) la carga no llega a ninguna caja
+        for supporter, area in below.items():
+            loads[supporter] = loads.get(supporter, 0.0) + amount * area / contact
+
+    def _spread(self, start: Dict[int, float], check: bool = False) -> Optional[Dict[int, float]]:
+        """Propaga hacia abajo incrementos de carga sobre cajas registradas.
+
+        Las cajas se procesan de la base más alta a la más baja: cuando una
+        sale del montículo ya ha recibido todo lo que le llega desde arriba,
+        así que cada caja del cono de apoyo se visita una sola vez y el coste
+        crece con la profundidad de la pila, no con el tamaño del pallet.
+
+        Args:
+            start: Incremento inicial de carga de cada caja
+            check: Parar en cuanto una caja supere su carga máxima
+
+        Returns:
+            Incremento de carga de cada caja afectada, o None si check y alguna se sobrecarga
+        """
+        pending = dict(start)
+        base_z, below, contact = self._base_z, self.below, self._contact
+        loads, max_loads = self.loads, self.max_loads
+        heap = [(-base_z[box], box) for box in pending]
+        heapq.heapify(heap)
+        deltas: Dict[int, float] = {}
+        while heap:
+            _, box = heapq.heappop(heap)
+            amount = deltas[box] = pending.pop(box)
+            if check and amount > 0 and loads[box] + amount > max_loads[box] + LOAD_TOLERANCE:
+                return None
+            for supporter, area in below[box].items():
+                share = amount * area / contact[box]
+                if supporter in pending:
+                    pending[supporter] += share
+                else:
+                    pending[supporter] = share
+                    heapq.heappush(heap, (-base_z[supporter], supporter))
+        return deltas
+
+    def _load_changes(self, weight: float, below: Dict[int, float],
+                      supported: Dict[int, float]) -> Tuple[Dict[int, float], float]:
+        """
+        Efecto inmediato de añadir una caja sobre las cargas.
+
+        Las cajas que descansan sobre el hueco que ocupa pasan a repartir su
+        peso (y lo que soportan) también con ella; la nueva caja transmite su
+        peso y esa carga a las cajas de debajo.
+
+        Returns:
+            Incrementos sobre las cajas registradas que la rodean y carga sobre la nueva caja
+        """
+        start: Dict[int, float] = {}
+        own_load = 0.0
+        for box, area in supported.items():
+            total = float(self.store.weights[box]) + self.loads[box]
+            old = self.below[box]
+            old_contact = self._contact[box]
+            new_contact = old_contact + area
+            # Una caja sin apoyo (old vacío) no transmitía su peso a nadie
+            for supporter, contact in old.items():
+                start[supporter] = start.get(supporter, 0.0) + \
+                    total * (contact / new_contact - contact / old_contact)
+            own_load += total * area / new_contact
+        self._pass_down(weight + own_load, below, sum(below.values()), start)
+        return start, own_load
+
+    def fits_load(self, positions: Sequence, dims: Sequence, weights: Sequence[float],
+                  max_loads: Sequence[float]) -> bool:
+        """
+        Comprueba que colocar unas cajas no sobrecarga ninguna caja.
+
+        Las cajas no deben apoyarse unas en otras (una sola caja o una capa
+        completa). Solo se recorren las cajas del cono de apoyo de las nuevas.
+
+        Args:
+            positions: Posición (x, y, z) de cada caja nueva
+            dims: Dimensiones (ancho, largo, alto) de cada caja nueva
+            weights: Peso de cada caja nueva
+            max_loads: Carga máxima que admite encima cada caja nueva
+        """
+        if not self.tracking_loads:
+            if not any(math.isfinite(limit) for limit in max_loads):
+                return True  # Ninguna caja del pallet ni de las nuevas tiene límite
+            self._rebuild_loads()
+        start: Dict[int, float] = {}
+        for (x1, y1, z1), (width, length, height), weight, limit in zip(positions, dims, weights, max_loads):
+            x2, y2, z2 = x1 + width, y1 + length, z1 + height
+            below = self._contacts(self._tops, z1, x1, y1, x2, y2) if z1 > self.tolerance else {}
+            supported = self._contacts(self._bases, z2, x1, y1, x2, y2)
+            changes, own_load = self._load_changes(weight, below, supported)
+            if own_load > limit + LOAD_TOLERANCE:
+                return False
+            for box, delta in changes.items():
+                start[box] = start.get(box, 0.0) + delta
+        return self._spread(start, check=True) is not None
+
+    def unsupported_count(self, min_ratio: float = 0.0) -> int:
+        """Cajas con menos apoyo que min_ratio (o sin ningún apoyo si min_ratio es 0)."""
+        ratios = np.asarray(self.ratios)
+        if min_ratio > 0:
+            return int(np.count_nonzero(ratios < min_ratio - 1e-12))
+        return int(np.count_nonzero(ratios <= 0))
@@ -1,49 +1,58 @@
-import pandas as pd
 import time
-from typing import List
+from typing import List, Optional
 from ..core.box import Box
 from ..core.pallet import Pallet
-from ..core.algorithms import first_fit_palletization
+from ..core.online import OnlinePalletizer
+from ..core.plan import write_plan
+from ..core.sources import iter_boxes
+from .eventos import InformeSimulacion, LlegadasFijas, ProcesoLlegadas, SimulacionEventos, TiempoServicio
 
 class CintaTransportadora:
     """Clase que simula una cinta transportadora para el procesamiento de cajas."""
     
-    def __init__(self, archivo_cajas: str, intervalo_segundos: float = 2.0):
+    def __init__(self, archivo_cajas: str, intervalo_segundos: float = 2.0,
+                 proceso_llegadas: Optional[ProcesoLlegadas] = None,
+                 tiempo_servicio: TiempoServicio = 0.0):
         """
         Inicializa la cinta transportadora.
         
         Args:
             archivo_cajas: Ruta al archivo CSV con los datos de las cajas
             intervalo_segundos: Tiempo entre la llegada de cada caja
+            proceso_llegadas: Proceso de llegadas para la simulación con reloj virtual
+                (por defecto, llegadas fijas cada intervalo_segundos)
+            tiempo_servicio: Segundos que la estación tarda en paletizar cada caja
+                en la simulación con reloj virtual
         """
         self.archivo_cajas = archivo_cajas
         self.intervalo_segundos = intervalo_segundos
+        self.proceso_llegadas = proceso_llegadas or LlegadasFijas(intervalo_segundos)
+        self.tiempo_servicio = tiempo_servicio
         self.cajas: List[Box] = []
         self.pallets: List[Pallet] = []
         self.max_width = 100  # cm
         self.max_length = 100  # cm
         self.max_height = 150  # cm
         self.max_weight = 1000  # kg
+        # Paletizador incremental: cada caja se coloca una sola vez al llegar
+        self.paletizador = OnlinePalletizer(
+            max_width=self.max_width,
+            max_length=self.max_length,
+            max_height=self.max_height,
+            max_weight=self.max_weight
+        )
 
     def cargar_cajas(self) -> None:
         """Carga las cajas desde el archivo CSV y simula su llegada a la cinta."""
-        df = pd.read_csv(self.archivo_cajas)
+        # El fichero se lee por bloques a medida que llegan las cajas
+        cajas = iter_boxes(self.archivo_cajas)
         print("\n📦 Cargando cajas de la cinta transportadora...")
         print("=" * 50)
         
-        for _, row in df.iterrows():
+        for box in cajas:
             # Simular el tiempo que tarda en llegar cada caja
             time.sleep(self.intervalo_segundos)
             
-            # Crear la caja
-            box = Box(
-                id=int(row['id']),
-                width=float(row['width']),
-                length=float(row['length']),
-                height=float(row['height']),
-                weight=float(row['weight'])
-            )
-            
             print(f"\n⏳ Nueva caja detectada en la cinta:")
             print(f"   ID: {box.id}")
             print(f"   Dimensiones: {box.width}x{box.length}x{box.height} cm")
@@ -52,39 +61,88 @@ class CintaTransportadora:
             # Añadir la caja a la lista
             self.cajas.append(box)
             
-            # Realizar la paletización con las cajas disponibles hasta el momento
-            self.pallets = first_fit_palletization(
-                boxes=self.cajas,
-                max_width=self.max_width,
-                max_length=self.max_length,
-                max_height=self.max_height,
-                max_weight=self.max_weight
-            )
+            # Colocar solo la caja recién llegada; las anteriores no se mueven
+            self.paletizador.add_box(box)
+            self.pallets = self.paletizador.pallets
             
             # Mostrar estado actual de la paletización
             print("\n📊 Estado actual de la paletización:")
             print(f"   Cajas procesadas: {len(self.cajas)}")
             print(f"   Pallets utilizados: {len(self.pallets)}")
 
-def simular_cinta(archivo_cajas: str, intervalo_segundos: float = 3.0) -> None:
+    def simular(self, semilla: Optional[int] = None) -> InformeSimulacion:
+        """
+        Simula la llegada de las cajas con un reloj virtual, sin esperas reales.
+        
+        Args:
+            semilla: Semilla para los procesos aleatorios de llegada y servicio
+        
+        Returns:
+            Informe con throughput, longitud de cola y latencia de decisión
+        """
+        simulacion = SimulacionEventos(
+            iter_boxes(self.archivo_cajas), self.paletizador, self.proceso_llegadas, self.tiempo_servicio, semilla
+        )
+        for _, box, _ in simulacion.ejecutar():
+            self.cajas.append(box)
+        self.pallets = self.paletizador.pallets
+        return simulacion.informe
+
+    def guardar_plan(self, ruta: str) -> None:
+        """Guarda el plan de colocación de los pallets en formato binario (ver core.plan)."""
+        write_plan(ruta, self.pallets)
+
+def imprimir_informe(informe: InformeSimulacion) -> None:
+    """Imprime el resumen de una simulación con reloj virtual."""
+    print("\n📈 Resultados de la simulación:")
+    print(f"   Cajas procesadas: {informe.cajas_procesadas} ({informe.cajas_rechazadas} rechazadas)")
+    print(f"   Pallets utilizados: {informe.pallets_utilizados}")
+    print(f"   Tiempo simulado: {informe.tiempo_simulado:.1f} s (real: {informe.tiempo_real:.2f} s)")
+    print(f"   Throughput: {informe.throughput_por_hora:.1f} cajas/hora")
+    print(f"   Cola media: {informe.cola_media:.2f} cajas (máxima: {informe.cola_maxima})")
+    print(f"   Espera media: {informe.espera_media:.2f} s")
+    print(f"   Latencia de decisión: p50 {informe.latencia_p50 * 1000:.2f} ms, "
+          f"p95 {informe.latencia_p95 * 1000:.2f} ms, máx {informe.latencia_maxima * 1000:.2f} ms")
+
+def simular_cinta(archivo_cajas: str, intervalo_segundos: float = 3.0,
+                  reloj_virtual: bool = False,
+                  proceso_llegadas: Optional[ProcesoLlegadas] = None,
+                  tiempo_servicio: TiempoServicio = 0.0,
+                  semilla: Optional[int] = None) -> Optional[InformeSimulacion]:
     """
     Función principal para ejecutar la simulación de la cinta transportadora.
     
     Args:
         archivo_cajas: Ruta al archivo CSV con los datos de las cajas
         intervalo_segundos: Tiempo entre la llegada de cada caja
+        reloj_virtual: Simular con eventos discretos en lugar de esperar en tiempo real
+        proceso_llegadas: Proceso de llegadas para el reloj virtual
+        tiempo_servicio: Segundos de servicio por caja para el reloj virtual
+        semilla: Semilla para los procesos aleatorios del reloj virtual
+    
+    Returns:
+        Informe de la simulación con reloj virtual, o None en tiempo real
     """
     # Crear instancia de la cinta transportadora
     cinta = CintaTransportadora(
         archivo_cajas=archivo_cajas,
-        intervalo_segundos=intervalo_segundos
+        intervalo_segundos=intervalo_segundos,
+        proceso_llegadas=proceso_llegadas,
+        tiempo_servicio=tiempo_servicio
     )
     
     # Iniciar la simulación
     print("\n🔄 Iniciando simulación de cinta transportadora...")
     print("=" * 50)
-    cinta.cargar_cajas()
+    informe = None
+    if reloj_virtual:
+        informe = cinta.simular(semilla)
+        imprimir_informe(informe)
+    else:
+        cinta.cargar_cajas()
     
     # Mostrar resumen final
     print("\n✅ Simulación completada")
-    print("=" * 50) 
\ No newline at end of file
+    print("=" * 50)
+    
+    return informe
@@ -0,0 +1,195 @@
+import heapq
+from collections import deque
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from ..core.box import Box
+from ..core.pallet import Pallet
+from ..core.online import OnlinePalletizer
+
+class LlegadasFijas:
+    """Proceso de llegadas con un intervalo constante entre cajas."""
+    def __init__(self, intervalo_segundos: float):
+        if intervalo_segundos < 0:
+            raise ValueError("El intervalo entre llegadas no puede ser negativo")
+        self.intervalo_segundos = intervalo_segundos
+
+    def intervalos(self, rng: random.Random) -> Iterator[float]:
+        while True:
+            yield self.intervalo_segundos
+
+class LlegadasPoisson:
+    """Proceso de Poisson: intervalos exponenciales con la tasa media indicada."""
+    def __init__(self, cajas_por_segundo: float):
+        if cajas_por_segundo <= 0:
+            raise ValueError("La tasa de llegadas debe ser positiva")
+        self.cajas_por_segundo = cajas_por_segundo
+
+    def intervalos(self, rng: random.Random) -> Iterator[float]:
+        while True:
+            yield rng.expovariate(self.cajas_por_segundo)
+
+class LlegadasRafagas:
+    """Llegadas en ráfagas: grupos de cajas muy seguidas separados por pausas."""
+    def __init__(self, cajas_por_rafaga: int, intervalo_en_rafaga: float, pausa_entre_rafagas: float):
+        if cajas_por_rafaga < 1:
+            raise ValueError("Cada ráfaga debe tener al menos una caja")
+        self.cajas_por_rafaga = cajas_por_rafaga
+        self.intervalo_en_rafaga = intervalo_en_rafaga
+        self.pausa_entre_rafagas = pausa_entre_rafagas
+
+    def intervalos(self, rng: random.Random) -> Iterator[float]:
+        while True:
+            yield self.pausa_entre_rafagas
+            for _ in range(self.cajas_por_rafaga - 1):
+                yield self.intervalo_en_rafaga
+
+ProcesoLlegadas = Union[LlegadasFijas, LlegadasPoisson, LlegadasRafagas]
+TiempoServicio = Union[float, Callable[[random.Random], float]]
+
+PROCESOS_LLEGADA = {
+    'fixed': LlegadasFijas,
+    'poisson': LlegadasPoisson,
+    'bursty': LlegadasRafagas,
+}
+
+def crear_proceso_llegadas(tipo: str, intervalo_segundos: float) -> ProcesoLlegadas:
+    """Crea un proceso de llegadas con el intervalo medio indicado.
+
+    Args:
+        tipo: 'fixed', 'poisson' o 'bursty'
+        intervalo_segundos: Intervalo medio entre cajas (positivo)
+    """
+    if tipo not in PROCESOS_LLEGADA:
+        raise ValueError(f"Proceso de llegadas desconocido: {tipo}")
+    if intervalo_segundos <= 0:
+        raise ValueError("El intervalo medio entre llegadas debe ser positivo")
+    if tipo == 'fixed':
+        return LlegadasFijas(intervalo_segundos)
+    if tipo == 'poisson':
+        return LlegadasPoisson(1.0 / intervalo_segundos)
+    # Ráfagas de 10 cajas a un décimo del intervalo, manteniendo la tasa media
+    en_rafaga = intervalo_segundos / 10
+    return LlegadasRafagas(10, en_rafaga, 10 * intervalo_segundos - 9 * en_rafaga)
+
+@dataclass
+class InformeSimulacion:
+    """Resultados de una simulación de eventos discretos."""
+    cajas_procesadas: int
+    cajas_rechazadas: int
+    pallets_utilizados: int
+    tiempo_simulado: float  # segundos de reloj virtual
+    tiempo_real: float  # segundos de reloj de pared empleados
+    throughput_por_hora: float
+    cola_media: float  # longitud media de la cola ponderada en el tiempo
+    cola_maxima: int
+    espera_media: float  # segundos de reloj virtual en cola
+    latencias_decision: List[float] = field(repr=False, default_factory=list)
+
+    @property
+    def latencia_p50(self) -> float:
+        return float(np.percentile(self.latencias_decision, 50)) if self.latencias_decision else 0.0
+
+    @property
+    def latencia_p95(self) -> float:
+        return float(np.percentile(self.latencias_decision, 95)) if self.latencias_decision else 0.0
+
+    @property
+    def latencia_maxima(self) -> float:
+        return max(self.latencias_decision, default=0.0)
+
+class SimulacionEventos:
+    """Simulación de eventos discretos de la cinta con un reloj virtual.
+
+    Las cajas llegan según un proceso de llegadas y esperan en cola a la
+    estación de paletizado, que atiende una caja cada vez durante su tiempo
+    de servicio. El reloj salta de un evento al siguiente, de modo que un
+    turno completo se simula en lo que tarda el algoritmo en decidir.
+    """
+    def __init__(self, cajas: Iterable[Box], paletizador: OnlinePalletizer,
+                 proceso_llegadas: ProcesoLlegadas, tiempo_servicio: TiempoServicio = 0.0,
+                 semilla: Optional[int] = None):
+        self.cajas = cajas
+        self.paletizador = paletizador
+        self.proceso_llegadas = proceso_llegadas
+        self.tiempo_servicio = tiempo_servicio
+        self.rng = random.Random(semilla)
+        self.reloj = 0.0
+        self.informe: Optional[InformeSimulacion] = None
+
+    def _duracion_servicio(self) -> float:
+        if callable(self.tiempo_servicio):
+            return self.tiempo_servicio(self.rng)
+        return self.tiempo_servicio
+
+    def ejecutar(self) -> Iterator[Tuple[float, Box, Optional[Pallet]]]:
+        """Ejecuta la simulación y devuelve (tiempo virtual, caja, pallet) por cada decisión.
+
+        Al agotarse el generador, el resumen queda disponible en self.informe.
+        """
+        inicio_real = time.perf_counter()
+        intervalos = self.proceso_llegadas.intervalos(self.rng)
+        cajas = iter(self.cajas)
+        # Eventos: (tiempo, orden, tipo, caja); el orden desempata eventos simultáneos
+        eventos: List[Tuple[float, int, str, Optional[Box]]] = []
+        orden = 0
+        cola: Deque[Tuple[float, Box]] = deque()
+        estacion_ocupada = False
+        area_cola = 0.0
+        cola_maxima = 0
+        espera_total = 0.0
+        procesadas = 0
+        latencias: List[float] = []
+
+        def programar_llegada(tiempo: float) -> None:
+            nonlocal orden
+            caja = next(cajas, None)
+            if caja is not None:
+                heapq.heappush(eventos, (tiempo + next(intervalos), orden, 'llegada', caja))
+                orden += 1
+
+        programar_llegada(0.0)
+        while eventos:
+            tiempo, _, tipo, caja = heapq.heappop(eventos)
+            area_cola += len(cola) * (tiempo - self.reloj)
+            self.reloj = tiempo
+
+            if tipo == 'llegada':
+                cola.append((tiempo, caja))
+                cola_maxima = max(cola_maxima, len(cola))
+                programar_llegada(tiempo)
+            else:
+                estacion_ocupada = False
+
+            if not estacion_ocupada and cola:
+                llegada, siguiente = cola.popleft()
+                espera_total += self.reloj - llegada
+                inicio_decision = time.perf_counter()
+                pallet = self.paletizador.add_box(siguiente)
+                latencias.append(time.perf_counter() - inicio_decision)
+                procesadas += 1
+                estacion_ocupada = True
+                heapq.heappush(eventos, (self.reloj + self._duracion_servicio(), orden, 'fin_servicio', None))
+                orden += 1
+                yield self.reloj, siguiente, pallet
+
+        self.informe = InformeSimulacion(
+            cajas_procesadas=procesadas,
+            cajas_rechazadas=len(self.paletizador.unplaced),
+            pallets_utilizados=len(self.paletizador.pallets),
+            tiempo_simulado=self.reloj,
+            tiempo_real=time.perf_counter() - inicio_real,
+            throughput_por_hora=procesadas / self.reloj * 3600 if self.reloj > 0 else 0.0,
+            cola_media=area_cola / self.reloj if self.reloj > 0 else 0.0,
+            cola_maxima=cola_maxima,
+            espera_media=espera_total / procesadas if procesadas else 0.0,
+            latencias_decision=latencias,
+        )
+
+    def correr(self) -> InformeSimulacion:
+        """Ejecuta la simulación completa y devuelve el informe."""
+        for _ in self.ejecutar():
+            pass
+        return self.informe
@@ -3,8 +3,9 @@ from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 from core.pallet import Pallet
 from core.box import Box
+from core.plan import Plan, read_plan
 from matplotlib.colors import LinearSegmentedColormap
-from typing import List
+from typing import List, Union
 
 def get_box_color(weight: float) -> tuple:
     """
@@ -65,6 +66,35 @@ def visualize_pallets(pallets: List[Pallet], rotation_angle: float = 45) -> plt.
                     box.width, box.length, box.height,
                     color=color, alpha=0.8)
     
+    _finish_figure(fig, ax, rotation_angle)
+    return fig
+
+def visualize_plan(plan: Union[Plan, str], rotation_angle: float = 45) -> plt.Figure:
+    """
+    Visualiza un plan de colocación guardado en disco sin reconstruir los pallets.
+    
+    Args:
+        plan: Plan leído con read_plan o ruta al fichero del plan
+        rotation_angle: Ángulo de rotación de la vista
+    """
+    if isinstance(plan, str):
+        plan = read_plan(plan)
+    fig = plt.figure(figsize=(12, 8))
+    ax = fig.add_subplot(111, projection='3d')
+    
+    if plan.pallet_count:
+        ax.bar3d(0, 0, 0, plan.max_width, plan.max_length, 0.1, color='gray', alpha=0.3)
+    
+    # Las cajas se leen directamente de los registros proyectados en memoria
+    columns = [plan.records[name].tolist() for name in ('x', 'y', 'z', 'width', 'length', 'height', 'weight')]
+    for x, y, z, width, length, height, weight in zip(*columns):
+        ax.bar3d(x, y, z, width, length, height, color=get_box_color(weight), alpha=0.8)
+    
+    _finish_figure(fig, ax, rotation_angle)
+    return fig
+
+def _finish_figure(fig: plt.Figure, ax, rotation_angle: float) -> None:
+    """Configura la vista y añade la barra de colores por peso."""
     # Configurar la vista
     ax.view_init(elev=20, azim=rotation_angle)
     ax.set_xlabel('Ancho (cm)')
@@ -107,7 +137,6 @@ def visualize_pallets(pallets: List[Pallet], rotation_angle: float = 45) -> plt.
     cbar.set_ticklabels(['0-10', '10-20', '20-30', '30-40', '40-50', '50-60', '>60'])
     
     plt.tight_layout()
-    return fig
 
 def print_palletization_summary(pallets: List[Pallet]) -> None:
     """Imprime un resumen de la paletización."""
@@ -118,18 +147,33 @@ def print_palletization_summary(pallets: List[Pallet]) -> None:
         print(f"\nPallet {i}:")
         print(f"- Peso total: {pallet.current_weight:.1f} kg")
         print(f"- Número de cajas: {len(pallet.boxes)}")
-        print(f"- Altura utilizada: {max((box.position[2] + box.height for box in pallet.boxes), default=0):.1f} cm")
+        print(f"- Altura utilizada: {pallet.top_height:.1f} cm")
+        if not pallet.cog_within_limits():
+            center_x, center_y, center_z = pallet.get_center_of_mass()
+            print(f"- Advertencia: centro de gravedad fuera de la envolvente "
+                  f"({center_x:.1f}, {center_y:.1f}, {center_z:.1f}) cm")
+        
+        # Los algoritmos por capas las registran en Pallet.layers, en orden de colocación;
+        # las cajas que no forman parte de ninguna capa se agrupan por altura
+        print("\nDistribución por capas:")
+        in_layers = set()
+        for number, layer in enumerate(pallet.layers, 1):
+            pattern = f", {layer.pattern}" if layer.pattern else ""
+            print(f"  Capa {number} a {layer.z} cm{pattern}:")
+            for box in layer.boxes:
+                in_layers.add(id(box))
+                print(f"    - Caja {box.id}: {box.width}x{box.length}x{box.height} cm, {box.weight} kg")
         
-        # Agrupar cajas por capa
         layers = {}
         for box in pallet.boxes:
+            if id(box) in in_layers:
+                continue
             z = box.position[2]
             if z not in layers:
                 layers[z] = []
             layers[z].append(box)
         
-        print("\nDistribución por capas:")
         for z in sorted(layers.keys()):
-            print(f"  Capa a {z} cm:")
+            print(f"  {'Cajas sueltas' if pallet.layers else 'Capa'} a {z} cm:")
             for box in layers[z]:
                 print(f"    - Caja {box.id}: {box.width}x{box.length}x{box.height} cm, {box.weight} kg") 
\ No newline at end of file
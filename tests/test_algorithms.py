@@ -1,7 +1,8 @@
+import random
 import pytest
 from src.core.box import Box
 from src.core.pallet import Pallet
-from src.core.algorithms import first_fit_palletization
+from src.core.algorithms import first_fit_palletization, best_fit_lookahead_palletization
 
 def test_first_fit_palletization_single_box():
     """Test para verificar la paletización de una sola caja."""
@@ -103,4 +104,32 @@ def test_first_fit_palletization_optimal_placement():
     
     # Verificar que las cajas están colocadas de manera óptima
     box_positions = [box.position for box in pallets[0].boxes]
-    assert len(set(box_positions)) == 3  # Todas las posiciones deben ser únicas 
\ No newline at end of file
+    assert len(set(box_positions)) == 3  # Todas las posiciones deben ser únicas 
+
+def test_best_fit_lookahead_keeps_committed_positions():
+    """Test para verificar que el lookahead no mueve cajas ya colocadas."""
+    boxes = [Box(id=i, width=40, length=30, height=20, weight=10) for i in range(1, 7)]
+    pallets = best_fit_lookahead_palletization(
+        boxes=boxes,
+        max_width=100,
+        max_length=100,
+        max_height=150,
+        max_weight=1000
+    )
+
+    placed = [box for pallet in pallets for box in pallet.boxes]
+    assert len(placed) == 6
+    for pallet in pallets:
+        stored = [tuple(row) for row in pallet.store.mins]
+        assert stored == [box.position for box in pallet.boxes]
+
+def test_first_fit_never_leaves_boxes_floating():
+    """Test para verificar que First-Fit solo coloca cajas sobre el suelo o sobre otra caja."""
+    rng = random.Random(0)
+    boxes = [Box(id=i, width=rng.choice([20, 30, 40, 60]), length=rng.choice([20, 30, 40, 50]),
+                 height=rng.choice([10, 15, 20, 25, 30]), weight=rng.randint(1, 20))
+             for i in range(200)]
+    pallets = first_fit_palletization(boxes, max_width=120, max_length=100, max_height=150, max_weight=1000)
+
+    assert sum(len(pallet.boxes) for pallet in pallets) == 200
+    assert all(pallet.support.unsupported_count() == 0 for pallet in pallets)
@@ -0,0 +1,63 @@
+import random
+from src.core.box import Box
+from src.core.box_batch import BoxBatch
+from src.core.algorithms import ALGORITHMS
+from src.core.bounds import lower_bounds
+from src.core.local_search import LocalSearch
+from src.core.portfolio import run_portfolio
+
+def test_bounds_big_boxes():
+    """Test para verificar que las cajas que no caben de dos en dos dan la cota L1 exacta."""
+    boxes = [Box(id=i, width=60, length=60, height=60, weight=10) for i in range(3)]
+    bounds = lower_bounds(boxes, 100, 100, 100, 1000)
+
+    assert bounds.volume == 1
+    assert bounds.l1 == 3
+    assert bounds.best == 3
+    assert bounds.gap(3) == 0.0
+    assert bounds.gap(4) == 1 / 3
+
+def test_bounds_volume_and_weight():
+    """Test para verificar las cotas continuas de volumen y peso."""
+    boxes = [Box(id=i, width=50, length=50, height=50, weight=400) for i in range(10)]
+    bounds = lower_bounds(boxes, 100, 100, 100, 1000)
+    assert bounds.volume == 2  # 10 * 1/8 de pallet
+    assert bounds.weight == 4  # 4000 kg / 1000 kg
+    assert bounds.best == 4
+    # Un BoxBatch da las mismas cotas que la lista de cajas
+    assert lower_bounds(BoxBatch.from_boxes(boxes), 100, 100, 100, 1000) == bounds
+    assert lower_bounds([], 100, 100, 100, 1000).best == 0
+
+def test_bounds_do_not_depend_on_rotation():
+    """Test para verificar que girar las cajas no cambia su volumen en las cotas."""
+    for rotation in ('fixed', 'upright', 'all'):
+        boxes = [Box(id=i, width=10, length=20, height=40, weight=1, rotation=rotation) for i in range(1000)]
+        bounds = lower_bounds(boxes, 100, 100, 100, 1000)
+        assert bounds.volume == 8
+        assert bounds.l2 == 8
+
+def test_bounds_never_exceed_solutions():
+    """Test para verificar que la cota nunca supera el número de pallets de ningún algoritmo."""
+    rng = random.Random(3)
+    for _ in range(20):
+        boxes = [Box(id=i, width=rng.randint(10, 90), length=rng.randint(10, 90),
+                     height=rng.randint(10, 90), weight=rng.randint(1, 100)) for i in range(30)]
+        bound = lower_bounds(boxes, 100, 100, 100, 800).best
+        for algorithm in ALGORITHMS.values():
+            copies = [Box(b.id, b.width, b.length, b.height, b.weight) for b in boxes]
+            pallets = algorithm(copies, 100, 100, 100, 800)
+            assert bound <= len(pallets)
+
+def test_bounds_stop_search_early():
+    """Test para verificar que la búsqueda local y el portafolio paran al alcanzar la cota."""
+    boxes = [Box(id=i, width=60, length=60, height=60, weight=10) for i in range(4)]
+    result = run_portfolio(boxes, 100, 100, 100, 1000, max_workers=1)
+    assert result.results[0].status == 'ok'
+    assert all(r.status == 'cancelled' for r in result.results[1:])
+    assert result.gap == 0.0
+
+    search = LocalSearch(result.pallets, seed=0)
+    assert search.optimal()
+    improvement = search.run(time_budget_ms=10_000)
+    assert improvement.iterations == 0
+    assert improvement.lower_bound == 4
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import numpy as np
+import pytest
+from src.core.box import Box
+from src.core.box_batch import BOX_DTYPE, BoxBatch
+from src.core.sources import count_boxes, iter_boxes, load_box_batch, save_npy
+from src.core.algorithms import first_fit_decreasing_palletization
+
+def make_boxes():
+    return [Box(id=i, width=10 + (i % 4) * 10, length=30, height=20, weight=5) for i in range(12)]
+
+def test_box_batch_roundtrip():
+    """Test para verificar la conversión entre cajas, columnas y array estructurado."""
+    boxes = make_boxes()
+    batch = BoxBatch.from_boxes(boxes)
+    assert len(batch) == 12
+    assert batch.to_structured().dtype == BOX_DTYPE
+    assert list(batch) == boxes
+    assert batch.box(5) == boxes[5]
+    np.testing.assert_allclose(batch.volumes(), [box.volume() for box in boxes])
+
+def test_box_batch_sorted_by_volume_is_stable():
+    """Test para verificar que el orden por volumen coincide con sorted()."""
+    boxes = make_boxes()
+    expected = sorted(boxes, key=lambda box: box.volume(), reverse=True)
+    batch = BoxBatch.from_boxes(boxes)
+    assert [box.id for box in batch.sorted_by_volume()] == [box.id for box in expected]
+    assert [box.id for box in batch.take(batch.volume_order())] == [box.id for box in expected]
+
+def test_box_batch_rejects_mismatched_columns():
+    """Test para verificar la validación de columnas del lote."""
+    with pytest.raises(ValueError):
+        BoxBatch(np.arange(3), np.ones(3), np.ones(3), np.ones(2), np.ones(3))
+    with pytest.raises(ValueError):
+        BoxBatch.from_structured(np.zeros(3, dtype=[('id', np.int64), ('width', np.float64)]))
+
+def test_load_npy_is_memory_mapped():
+    """Test para verificar la carga sin copia de un .npy y su uso en los algoritmos."""
+    boxes = make_boxes()
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.npy')
+    temp_file.close()
+    try:
+        save_npy(temp_file.name, BoxBatch.from_boxes(boxes))
+        batch = load_box_batch(temp_file.name)
+        assert isinstance(batch.widths.base, np.memmap) or isinstance(batch.widths, np.memmap)
+        assert count_boxes(temp_file.name) == 12
+        assert [box.id for box in iter_boxes(temp_file.name)] == list(range(12))
+
+        from_batch = first_fit_decreasing_palletization(batch, 100, 100, 150, 1000)
+        from_list = first_fit_decreasing_palletization(make_boxes(), 100, 100, 150, 1000)
+        assert [[(box.id, box.position) for box in p.boxes] for p in from_batch] == \
+            [[(box.id, box.position) for box in p.boxes] for p in from_list]
+    finally:
+        os.unlink(temp_file.name)
+
+def test_load_parquet_and_arrow():
+    """Test para verificar la lectura de Parquet y Arrow IPC."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+    boxes = make_boxes()
+    table = pa.table({name: BoxBatch.from_boxes(boxes).to_structured()[name] for name in BOX_DTYPE.names})
+    directory = tempfile.mkdtemp()
+    parquet_path = os.path.join(directory, "cajas.parquet")
+    arrow_path = os.path.join(directory, "cajas.arrow")
+    pq.write_table(table, parquet_path)
+    feather.write_feather(table, arrow_path, compression='uncompressed')
+
+    for path in (parquet_path, arrow_path):
+        assert list(load_box_batch(path)) == boxes
+
+def test_load_unknown_format():
+    """Test para verificar el error con extensiones no soportadas."""
+    with pytest.raises(ValueError):
+        load_box_batch("cajas.xlsx")
+
+def test_box_views_write_positions_to_batch():
+    """Test para verificar que las vistas escriben la posición en los arrays del lote."""
+    import copy
+    batch = BoxBatch.from_boxes(make_boxes())
+    pallets = first_fit_decreasing_palletization(batch, 100, 100, 150, 1000)
+    placed = [box for pallet in pallets for box in pallet.boxes]
+    assert len(placed) == 12
+
+    for box in placed:
+        assert tuple(batch.positions[box.index]) == box.position
+    detached = copy.deepcopy(placed[0])
+    assert isinstance(detached, Box)
+    assert detached == placed[0]
+    detached.position = (1, 2, 3)
+    assert placed[0].position != (1, 2, 3)
+
+def test_box_is_slotted():
+    """Test para verificar que Box no tiene __dict__ y conserva la semántica de la dataclass."""
+    box = Box(id=1, width=10, length=20, height=30, weight=5)
+    assert not hasattr(box, '__dict__')
+    assert box == Box(id=1, width=10, length=20, height=30, weight=5)
+    assert box != Box(id=2, width=10, length=20, height=30, weight=5)
+    assert repr(box) == "Box(id=1, width=10, length=20, height=30, weight=5, position=(0, 0, 0))"
+    with pytest.raises(TypeError):
+        hash(box)
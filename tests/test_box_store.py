@@ -0,0 +1,57 @@
+import numpy as np
+from src.core.box_store import BoxStore
+
+def test_box_store_grows():
+    """Test para verificar que el almacén crece al añadir cajas."""
+    store = BoxStore(capacity=2)
+    for i in range(5):
+        store.append((i * 10, 0, 0), (10, 10, 10), weight=i)
+
+    assert len(store) == 5
+    assert store.mins[4].tolist() == [40, 0, 0]
+    assert store.dims[0].tolist() == [10, 10, 10]
+    assert store.weights.tolist() == [0, 1, 2, 3, 4]
+
+def test_box_store_collides():
+    """Test para verificar la detección de colisiones contra todas las cajas."""
+    store = BoxStore()
+    store.append((0, 0, 0), (50, 50, 50), weight=1)
+
+    assert store.collides((25, 25, 25), (10, 10, 10))
+    assert not store.collides((50, 0, 0), (10, 10, 10))  # Caras en contacto
+
+def test_box_store_collides_many():
+    """Test para verificar la evaluación de varios candidatos a la vez."""
+    store = BoxStore()
+    store.append((0, 0, 0), (50, 50, 50), weight=1)
+    candidates = np.array([(0, 0, 0), (50, 0, 0), (0, 0, 50), (40, 40, 0)])
+
+    assert store.collides_many(candidates, (10, 10, 10)).tolist() == [True, False, False, True]
+
+def test_box_store_free_rays():
+    """Test para verificar que una caja más larga que la distancia libre desde su punto siempre choca."""
+    store = BoxStore()
+    store.append((30, 0, 0), (20, 20, 20), weight=1)
+    store.append((0, 0, 40), (20, 20, 20), weight=1)
+
+    rays = store.free_rays(np.array([(0, 0, 0), (0, 30, 0), (10, 5, 0)]))
+    assert rays.tolist() == [[30, np.inf, 40], [np.inf, np.inf, np.inf], [20, np.inf, 40]]
+    assert store.free_rays(np.array([(0, 0, 0)]), start=1).tolist() == [[np.inf, np.inf, 40]]
+
+    rng = np.random.default_rng(0)
+    store = BoxStore()
+    for _ in range(40):
+        store.append(rng.integers(0, 80, 3), rng.integers(5, 20, 3), weight=1)
+    points = rng.integers(0, 100, (300, 3)).astype(float)
+    dims = rng.integers(1, 30, (300, 3)).astype(float)
+    blocked = np.any(dims > store.free_rays(points), axis=1)
+    assert store.collides_many(points, dims)[blocked].all()
+
+def test_box_store_project():
+    """Test para verificar la proyección de puntos hacia el origen."""
+    store = BoxStore()
+    store.append((0, 0, 0), (50, 50, 50), weight=1)
+
+    assert store.project((80, 10, 10), axis=0) == 50
+    assert store.project((80, 60, 10), axis=0) == 0
+    assert store.project((10, 10, 70), axis=2) == 50
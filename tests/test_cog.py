@@ -0,0 +1,56 @@
+import pytest
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.algorithms import ALGORITHMS
+from src.core.online import OnlinePalletizer
+
+def test_cog_offset_prunes_off_balance_candidates():
+    """Test para verificar que se descartan las posiciones que desequilibran el pallet."""
+    pallet = Pallet(100, 100, 100, 1000, max_cog_offset=10)
+    # La primera caja no puede quedar centrada: se admite
+    assert pallet.place_box_at(Box(id=1, width=50, length=100, height=20, weight=10), (0, 0, 0))
+    # Una caja junto al borde alejaría más el centro de gravedad
+    assert not pallet.place_box_at(Box(id=2, width=25, length=100, height=20, weight=10), (0, 0, 20))
+    # place_box busca la posición que lo corrige
+    box = Box(id=3, width=50, length=100, height=20, weight=10)
+    assert pallet.place_box(box)
+    assert box.position == (50, 0, 0)
+    assert pallet.cog_within_limits()
+
+def test_cog_height_limit():
+    """Test para verificar el límite de altura del centro de gravedad."""
+    pallet = Pallet(100, 100, 100, 1000, max_cog_height=15)
+    assert pallet.place_box_at(Box(id=1, width=100, length=100, height=20, weight=10), (0, 0, 0))
+    # Una caja pesada encima subiría el centro de gravedad por encima de 15
+    assert not pallet.place_box_at(Box(id=2, width=100, length=100, height=20, weight=30), (0, 0, 20))
+    assert pallet.place_box_at(Box(id=3, width=100, length=100, height=20, weight=1), (0, 0, 20))
+    assert pallet.get_center_of_mass()[2] <= 15
+
+def test_space_strategies_prefer_balancing_placements():
+    """Test para verificar que Guillotine y EMS eligen la colocación que devuelve el pallet a la envolvente."""
+    # Guillotine puntúa mejor el espacio sobre la primera caja, pero el de al lado la equilibra
+    palletizer = OnlinePalletizer(100, 100, 100, 1000, strategy='guillotine',
+                                  pallet_options={'max_cog_offset': 10})
+    palletizer.add_box(Box(id=1, width=50, length=100, height=20, weight=10))
+    box = Box(id=2, width=50, length=100, height=20, weight=10)
+    pallet = palletizer.add_box(box)
+    assert box.position == (50, 0, 0)
+    assert pallet.cog_within_limits()
+
+    # Desde el origen de cualquier EMS el centro seguiría fuera: EMS usa la esquina opuesta en largo
+    palletizer = OnlinePalletizer(100, 100, 100, 1000, strategy='ems', pallet_options={'max_cog_offset': 10})
+    palletizer.add_box(Box(id=1, width=40, length=40, height=20, weight=10))
+    box = Box(id=2, width=40, length=40, height=20, weight=10)
+    pallet = palletizer.add_box(box)
+    assert box.position == (40, 60, 0)
+    assert pallet.cog_within_limits()
+
+@pytest.mark.parametrize("name", list(ALGORITHMS))
+def test_every_algorithm_accepts_cog_limits(name):
+    """Test para verificar que todos los algoritmos aplican la envolvente del centro de gravedad."""
+    boxes = [Box(id=i, width=30, length=20, height=10 + 5 * (i % 3), weight=5 + i % 4) for i in range(40)]
+    pallets = ALGORITHMS[name](boxes, 120, 100, 150, 1000, max_cog_offset=15, max_cog_height=40)
+    assert sum(len(pallet.boxes) for pallet in pallets) == len(boxes)
+    for pallet in pallets:
+        assert pallet.max_cog_offset == 15 and pallet.max_cog_height == 40
+        assert pallet.cog_within_limits()
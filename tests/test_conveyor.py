@@ -92,4 +92,19 @@ def test_conveyor_box_placement():
                 # Verificar que el peso no excede el límite
                 assert pallet.current_weight <= pallet.max_weight
     finally:
-        os.unlink(temp_file) 
\ No newline at end of file
+        os.unlink(temp_file) 
+
+def test_conveyor_simulated_clock():
+    """Test para verificar la simulación de la cinta con reloj virtual."""
+    temp_file = create_temp_csv()
+    try:
+        conveyor = CintaTransportadora(temp_file, intervalo_segundos=3600)
+        informe = conveyor.simular()
+        
+        assert [box.id for box in conveyor.cajas] == [1, 2, 3]
+        assert sum(len(pallet.boxes) for pallet in conveyor.pallets) == 3
+        assert informe.cajas_procesadas == 3
+        assert informe.tiempo_simulado == 3 * 3600
+        assert informe.tiempo_real < 3600
+    finally:
+        os.unlink(temp_file)
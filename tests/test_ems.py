@@ -0,0 +1,59 @@
+import pytest
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.ems import EMSTracker
+from src.core.algorithms import ems_palletization
+
+def test_ems_update_single_box():
+    """Test para verificar los EMS generados por una caja en la esquina."""
+    tracker = EMSTracker(100, 100, 150)
+    tracker.update((0, 0, 0), (40, 30, 50))
+
+    spaces = {tuple(lo) + tuple(hi) for lo, hi in zip(tracker.mins.tolist(), tracker.maxs.tolist())}
+    assert spaces == {
+        (40, 0, 0, 100, 100, 150),
+        (0, 30, 0, 100, 100, 150),
+        (0, 0, 50, 100, 100, 150),
+    }
+    assert tracker.stats['updates'] == 1
+    assert tracker.stats['spaces'] == 3
+
+def test_ems_containment_pruning():
+    """Test para verificar que ningún EMS queda contenido en otro."""
+    tracker = EMSTracker(100, 100, 150)
+    tracker.update((0, 0, 0), (50, 50, 50))
+    tracker.update((50, 0, 0), (50, 50, 50))
+
+    for i in range(len(tracker)):
+        for j in range(len(tracker)):
+            if i != j:
+                assert not ((tracker.mins[j] <= tracker.mins[i]).all() and
+                            (tracker.maxs[j] >= tracker.maxs[i]).all())
+    assert tracker.stats['spaces_pruned'] > 0
+
+def test_pallet_best_ems_position():
+    """Test para verificar la consulta del mejor EMS desde el pallet."""
+    pallet = Pallet(100, 100, 150, 1000, track_ems=True)
+    assert pallet.place_box_at(Box(id=1, width=100, length=50, height=50, weight=10), (0, 0, 0))
+
+    box = Box(id=2, width=100, length=50, height=30, weight=10)
+    assert pallet.best_ems_position(box) == (0, 50, 0)
+    with pallet.trial():
+        assert pallet.place_box_at(box, (0, 50, 0))
+        assert pallet.best_ems_position(Box(id=3, width=100, length=50, height=30, weight=1)) == (0, 50, 30)
+        assert pallet.best_ems_position(Box(id=4, width=100, length=100, height=110, weight=1)) is None
+    assert len(pallet.ems) == 2
+    assert pallet.best_ems_position(box) == (0, 50, 0)
+
+def test_pallet_without_ems():
+    """Test para verificar el error al consultar EMS en un pallet que no los mantiene."""
+    pallet = Pallet(100, 100, 150, 1000)
+    with pytest.raises(ValueError):
+        pallet.best_ems_position(Box(id=1, width=10, length=10, height=10, weight=1))
+
+def test_ems_palletization():
+    """Test para verificar el algoritmo basado en EMS."""
+    boxes = [Box(id=i, width=50, length=50, height=50, weight=100) for i in range(10)]
+    pallets = ems_palletization(boxes, 100, 100, 150, 1000)
+
+    assert [len(pallet.boxes) for pallet in pallets] == [10]
@@ -0,0 +1,75 @@
+import random
+import time
+import pytest
+from src.core.box import Box
+from src.core.online import OnlinePalletizer
+from src.simulation.eventos import (
+    LlegadasFijas, LlegadasPoisson, LlegadasRafagas, SimulacionEventos, crear_proceso_llegadas
+)
+
+def make_boxes(count):
+    return [Box(id=i, width=20, length=20, height=20, weight=10) for i in range(count)]
+
+def test_simulacion_llegadas_fijas():
+    """Test para verificar el reloj virtual con llegadas fijas y sin esperas reales."""
+    paletizador = OnlinePalletizer(100, 100, 150, 1000)
+    simulacion = SimulacionEventos(make_boxes(100), paletizador, LlegadasFijas(3600.0))
+
+    inicio = time.perf_counter()
+    informe = simulacion.correr()
+    assert time.perf_counter() - inicio < 10
+
+    assert informe.cajas_procesadas == 100
+    assert informe.cajas_rechazadas == 0
+    assert informe.tiempo_simulado == pytest.approx(100 * 3600.0)
+    assert informe.throughput_por_hora == pytest.approx(1.0)
+    assert informe.cola_maxima == 1
+    assert informe.cola_media == 0.0
+    assert informe.espera_media == 0.0
+    assert len(informe.latencias_decision) == 100
+    assert 0 <= informe.latencia_p50 <= informe.latencia_p95 <= informe.latencia_maxima
+
+def test_simulacion_cola_con_servicio_lento():
+    """Test para verificar que la cola crece cuando el servicio es más lento que las llegadas."""
+    paletizador = OnlinePalletizer(100, 100, 150, 1000)
+    simulacion = SimulacionEventos(make_boxes(10), paletizador, LlegadasFijas(1.0), tiempo_servicio=2.0)
+
+    tiempos = [tiempo for tiempo, _, _ in simulacion.ejecutar()]
+    informe = simulacion.informe
+
+    # La estación atiende una caja cada 2 s a partir de la primera llegada
+    assert tiempos == pytest.approx([1.0 + 2.0 * i for i in range(10)])
+    assert informe.cola_maxima > 1
+    assert informe.espera_media == pytest.approx(sum(i for i in range(10)) / 10)
+    assert informe.tiempo_simulado == pytest.approx(21.0)
+
+def test_procesos_de_llegada():
+    """Test para verificar la tasa media de los procesos de llegada."""
+    rng = random.Random(0)
+    poisson = crear_proceso_llegadas('poisson', 2.0).intervalos(rng)
+    muestras = [next(poisson) for _ in range(5000)]
+    assert sum(muestras) / len(muestras) == pytest.approx(2.0, rel=0.1)
+
+    rafagas = crear_proceso_llegadas('bursty', 2.0).intervalos(rng)
+    muestras = [next(rafagas) for _ in range(100)]
+    assert sum(muestras) / len(muestras) == pytest.approx(2.0)
+    assert min(muestras) == pytest.approx(0.2)
+
+    with pytest.raises(ValueError):
+        crear_proceso_llegadas('desconocido', 2.0)
+    with pytest.raises(ValueError):
+        crear_proceso_llegadas('poisson', 0)
+    with pytest.raises(ValueError):
+        LlegadasPoisson(0)
+    with pytest.raises(ValueError):
+        LlegadasRafagas(0, 1.0, 1.0)
+
+def test_simulacion_reproducible_con_semilla():
+    """Test para verificar que la misma semilla produce la misma simulación."""
+    tiempos = []
+    for _ in range(2):
+        simulacion = SimulacionEventos(
+            make_boxes(20), OnlinePalletizer(100, 100, 150, 1000), LlegadasPoisson(0.5), semilla=42
+        )
+        tiempos.append([tiempo for tiempo, _, _ in simulacion.ejecutar()])
+    assert tiempos[0] == tiempos[1]
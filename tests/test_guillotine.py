@@ -0,0 +1,41 @@
+import pytest
+from src.core.box import Box
+from src.core.guillotine import GuillotinePacker, SPLIT_RULES, SCORE_RULES
+from src.core.algorithms import guillotine_palletization
+
+def test_guillotine_split_produces_disjoint_spaces():
+    """Test para verificar el corte del espacio libre tras colocar una caja."""
+    packer = GuillotinePacker(100, 100, 150)
+    box = Box(id=1, width=40, length=30, height=50, weight=10)
+
+    index = packer.find_space(box)
+    assert packer.place(index, box) == (0, 0, 0)
+
+    spaces = {(s.x, s.y, s.z, s.width, s.length, s.height) for s in packer.free_spaces}
+    assert (0, 0, 50, 40, 30, 100) in spaces  # Espacio encima de la caja
+    assert sum(s.volume() for s in packer.free_spaces) == 100 * 100 * 150 - box.volume()
+
+@pytest.mark.parametrize("split_rule", SPLIT_RULES)
+@pytest.mark.parametrize("score_rule", SCORE_RULES)
+def test_guillotine_palletization_rules(split_rule, score_rule):
+    """Test para verificar que todas las reglas producen colocaciones válidas."""
+    boxes = [Box(id=i, width=30 + i % 3 * 5, length=20 + i % 4 * 5, height=25, weight=10)
+             for i in range(20)]
+    pallets = guillotine_palletization(boxes, 100, 100, 150, 1000,
+                                       split_rule=split_rule, score_rule=score_rule)
+
+    assert sum(len(pallet.boxes) for pallet in pallets) == 20
+    for pallet in pallets:
+        for i, box in enumerate(pallet.boxes):
+            for other in pallet.boxes[i + 1:]:
+                assert not (box.position[0] < other.position[0] + other.width and
+                            other.position[0] < box.position[0] + box.width and
+                            box.position[1] < other.position[1] + other.length and
+                            other.position[1] < box.position[1] + box.length and
+                            box.position[2] < other.position[2] + other.height and
+                            other.position[2] < box.position[2] + box.height)
+
+def test_guillotine_invalid_rule():
+    """Test para verificar que se rechazan reglas desconocidas."""
+    with pytest.raises(ValueError):
+        GuillotinePacker(100, 100, 150, split_rule='diagonal')
@@ -0,0 +1,44 @@
+import pytest
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.heightmap import HeightMap
+
+def test_heightmap_resting_z():
+    """Test para verificar la altura de apoyo de una huella."""
+    height_map = HeightMap(100, 100, resolution=1.0)
+    height_map.update(0, 0, 0, 50, 50, 30)
+
+    assert height_map.resting_z(0, 0, 20, 20) == 30
+    assert height_map.resting_z(40, 40, 20, 20) == 30  # Solapa parcialmente la caja
+    assert height_map.resting_z(50, 0, 20, 20) == 0
+
+def test_heightmap_support():
+    """Test para verificar la fracción apoyada de una huella."""
+    height_map = HeightMap(100, 100, resolution=1.0)
+    height_map.update(0, 0, 0, 50, 50, 30)
+
+    assert height_map.supported_fraction(10, 10, 20, 20, 30) == pytest.approx(1.0)
+    assert height_map.supported_fraction(40, 0, 20, 20, 30) == pytest.approx(0.5)
+
+def test_heightmap_coarse_resolution_is_conservative():
+    """Test para verificar que una resolución gruesa redondea las huellas hacia fuera."""
+    height_map = HeightMap(100, 100, resolution=10.0)
+    height_map.update(0, 0, 0, 45, 45, 30)
+
+    assert height_map.resting_z(45, 0, 10, 10) == 30
+    assert height_map.resting_z(50, 0, 10, 10) == 0
+
+def test_heightmap_invalid_resolution():
+    """Test para verificar que la resolución debe ser positiva."""
+    with pytest.raises(ValueError):
+        HeightMap(100, 100, resolution=0)
+
+def test_pallet_with_height_map():
+    """Test para verificar la colocación de cajas usando el mapa de alturas."""
+    pallet = Pallet(100, 100, 150, 1000, height_map_resolution=1.0)
+    boxes = [Box(id=i, width=50, length=50, height=50, weight=10) for i in range(5)]
+
+    assert all(pallet.add_box(box) for box in boxes)
+    assert [box.position[2] for box in boxes] == [0, 0, 0, 0, 50]
+    assert pallet.height_map.resting_z(0, 0, 100, 100) == 100
+    assert not pallet.is_position_valid(Box(id=9, width=10, length=10, height=10, weight=1), (0, 0, 20))
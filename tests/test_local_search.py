@@ -0,0 +1,38 @@
+import random
+from src.core.box import Box
+from src.core.algorithms import first_fit_palletization
+from src.core.local_search import LocalSearch, improve_plan
+
+def make_pallets(count=60):
+    rng = random.Random(1)
+    boxes = [Box(id=i, width=rng.choice([20, 30, 40, 50]), length=rng.choice([20, 30, 40, 50]),
+                 height=rng.choice([20, 30, 40]), weight=10) for i in range(count)]
+    return boxes, first_fit_palletization(boxes, 100, 100, 150, 1000)
+
+def test_local_search_never_worsens_plan():
+    """Test para verificar que la búsqueda local devuelve un plan válido no peor que el inicial."""
+    boxes, pallets = make_pallets()
+    search = LocalSearch(pallets, seed=0)
+    result = search.run(time_budget_ms=300)
+
+    assert result.iterations > 0
+    assert len(result.pallets) <= result.initial_pallet_count == len(pallets)
+    assert result.elapsed_ms < 300 + 1000
+    placed = sorted(box.id for pallet in result.pallets for box in pallet.boxes)
+    assert placed == sorted(box.id for box in boxes)
+    for pallet in result.pallets:
+        assert pallet.current_weight <= pallet.max_weight
+        for box in pallet.boxes:
+            x, y, z = box.position
+            assert x + box.width <= pallet.max_width
+            assert y + box.length <= pallet.max_length
+            assert z + box.height <= pallet.max_height
+
+def test_local_search_keeps_incumbent_without_budget():
+    """Test para verificar que sin presupuesto se devuelve el plan de partida."""
+    boxes, pallets = make_pallets(20)
+    positions = [box.position for box in boxes]
+    assert improve_plan(pallets, time_budget_ms=0) is pallets
+    # Las decodificaciones trabajan sobre copias: el plan de partida no cambia
+    improve_plan(pallets, time_budget_ms=100, seed=0)
+    assert [box.position for box in boxes] == positions
@@ -0,0 +1,40 @@
+import pytest
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.algorithms import first_fit_palletization
+from src.core.metrics import QUALITY_WEIGHTS, calculate_pallet_quality, compute_metrics, mean_quality
+
+def test_metrics_single_pallet():
+    """Test para verificar las métricas de un pallet con una caja flotante."""
+    pallet = Pallet(100, 100, 100, 1000)
+    assert pallet.place_box_at(Box(id=1, width=50, length=50, height=50, weight=100), (0, 0, 0))
+    assert pallet.place_box_at(Box(id=2, width=50, length=50, height=50, weight=100), (50, 50, 20))
+    metrics = compute_metrics([pallet])
+
+    assert metrics.used_volume[0] == 2 * 50 ** 3
+    assert metrics.unsupported[0] == 1
+    assert metrics.stability[0] == pytest.approx(0.9)
+    assert metrics.center_of_mass[0].tolist() == pytest.approx([50, 50, 35])
+    assert metrics.weight_distribution[0] == pytest.approx(1.0)
+    assert pallet.get_stability_score() == pytest.approx(0.9)
+
+    quality, components = calculate_pallet_quality(pallet)
+    expected = (QUALITY_WEIGHTS['volume'] * 0.25 + QUALITY_WEIGHTS['weight'] * 1.0 +
+                QUALITY_WEIGHTS['stability'] * 0.9 + QUALITY_WEIGHTS['height'] * 0.7)
+    assert quality == pytest.approx(expected)
+    assert components['height_utilization'] == pytest.approx(0.7)
+
+def test_metrics_batched_matches_single():
+    """Test para verificar que el cálculo por lotes coincide con el de cada pallet."""
+    boxes = [Box(id=i, width=20 + i % 5 * 5, length=30, height=10 + i % 3 * 10, weight=5 + i % 7)
+             for i in range(80)]
+    pallets = first_fit_palletization(boxes, 100, 100, 80, 300)
+    pallets.append(Pallet(100, 100, 80, 300))  # Pallet vacío
+    metrics = compute_metrics(pallets)
+
+    assert len(metrics) == len(pallets)
+    for index, pallet in enumerate(pallets):
+        assert metrics.quality_components(index) == calculate_pallet_quality(pallet)
+    assert metrics.quality[-1] == 0.0
+    assert mean_quality(pallets) == pytest.approx(metrics.quality.mean())
+    assert mean_quality([]) == 0.0
@@ -0,0 +1,43 @@
+import pytest
+from src.core.box import Box
+from src.core.online import OnlinePalletizer, ONLINE_STRATEGIES
+
+@pytest.mark.parametrize("strategy", ONLINE_STRATEGIES)
+def test_online_palletizer_keeps_committed_positions(strategy):
+    """Test para verificar que las cajas ya colocadas no se mueven al llegar otras."""
+    palletizer = OnlinePalletizer(100, 100, 150, 1000, strategy=strategy)
+    history = []
+    for i in range(12):
+        box = Box(id=i, width=40, length=30, height=25, weight=50)
+        assert palletizer.add_box(box) is not None
+        history.append((box, box.position))
+        assert all(placed.position == position for placed, position in history)
+
+    assert sum(len(pallet.boxes) for pallet in palletizer.pallets) == 12
+    assert len(palletizer.decision_times) == 12
+
+def test_online_palletizer_opens_pallets_on_demand():
+    """Test para verificar la apertura de pallets y el registro de cajas rechazadas."""
+    palletizer = OnlinePalletizer(100, 100, 150, 1000)
+    assert palletizer.pallets == []
+
+    assert palletizer.add_box(Box(id=1, width=80, length=80, height=80, weight=800)) is not None
+    assert palletizer.add_box(Box(id=2, width=80, length=80, height=80, weight=800)) is not None
+    assert palletizer.add_box(Box(id=3, width=150, length=10, height=10, weight=1)) is None
+    assert len(palletizer.pallets) == 2
+    assert [box.id for box in palletizer.unplaced] == [3]
+
+def test_guillotine_tries_next_space_when_rejected():
+    """Test para verificar que la estrategia guillotina prueba otro espacio si el pallet rechaza el mejor."""
+    palletizer = OnlinePalletizer(100, 50, 40, 1000, strategy='guillotine')
+    assert palletizer.add_box(Box(id=1, width=50, length=50, height=20, weight=10, max_load=5)) is not None
+    # El mejor espacio está encima de la primera caja, que no admite tanto peso
+    heavy = Box(id=2, width=50, length=50, height=20, weight=10)
+    assert palletizer.add_box(heavy) is palletizer.pallets[0]
+    assert heavy.position == (50, 0, 0)
+    assert len(palletizer.pallets) == 1
+
+def test_online_palletizer_invalid_strategy():
+    """Test para verificar que se rechazan estrategias desconocidas."""
+    with pytest.raises(ValueError):
+        OnlinePalletizer(100, 100, 150, 1000, strategy='random')
@@ -0,0 +1,83 @@
+import pytest
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.bounds import lower_bounds
+from src.core.online import OnlinePalletizer
+from src.core.orientation import allowed_orientations, base_dims, min_height, set_orientation
+
+def test_orientation_symmetry_pruning():
+    """Test para verificar que las orientaciones equivalentes por simetría se descartan."""
+    assert len(allowed_orientations(Box(id=1, width=10, length=20, height=30, weight=1))[0]) == 1
+    assert len(allowed_orientations(Box(id=1, width=10, length=20, height=30, weight=1,
+                                        rotation='all'))[0]) == 6
+    assert len(allowed_orientations(Box(id=1, width=20, length=20, height=30, weight=1,
+                                        rotation='upright'))[0]) == 1
+    assert len(allowed_orientations(Box(id=1, width=20, length=20, height=30, weight=1,
+                                        rotation='all'))[0]) == 3
+    assert len(allowed_orientations(Box(id=1, width=20, length=20, height=20, weight=1,
+                                        rotation='all'))[0]) == 1
+    with pytest.raises(ValueError):
+        allowed_orientations(Box(id=1, width=10, length=20, height=30, weight=1, rotation='diagonal'))
+
+def test_set_orientation_roundtrip():
+    """Test para verificar que girar una caja conserva sus dimensiones originales."""
+    box = Box(id=1, width=10, length=20, height=30, weight=1, rotation='all')
+    set_orientation(box, 4)
+    assert (box.width, box.length, box.height) == (20, 30, 10)
+    assert base_dims(box) == (10, 20, 30)
+    assert min_height(box) == 10
+    set_orientation(box, 0)
+    assert (box.width, box.length, box.height) == (10, 20, 30)
+
+def test_pallet_rotates_box_to_fit():
+    """Test para verificar que el pallet gira una caja que solo cabe tumbada."""
+    pallet = Pallet(100, 100, 50, 1000)
+    fixed = Box(id=1, width=40, length=40, height=80, weight=5)
+    assert not pallet.can_fit(fixed)
+    assert not pallet.add_box(fixed)
+
+    lying = Box(id=2, width=40, length=40, height=80, weight=5, rotation='all')
+    assert pallet.can_fit(lying)
+    assert pallet.add_box(lying)
+    assert lying.height <= 50 and lying.orientation != 0
+    assert pallet.top_height == lying.height
+
+    # La colocación de prueba deshace también el giro
+    empty = Pallet(100, 100, 50, 1000)
+    other = Box(id=3, width=40, length=40, height=80, weight=5, rotation='all')
+    with empty.trial():
+        assert empty.place_box(other)
+        assert other.height == 40
+    assert (other.width, other.length, other.height, other.orientation) == (40, 40, 80, 0)
+
+@pytest.mark.parametrize("strategy", ['guillotine', 'ems'])
+def test_space_strategies_rotate_boxes(strategy):
+    """Test para verificar que las estrategias de espacios libres también giran las cajas."""
+    palletizer = OnlinePalletizer(100, 100, 50, 1000, strategy=strategy)
+    lying = Box(id=1, width=40, length=40, height=80, weight=5, rotation='all')
+    assert palletizer.add_box(lying) is not None
+    assert lying.height <= 50 and lying.orientation != 0
+
+    # Sin girar, la caja no cabe en ningún pallet
+    fixed = Box(id=2, width=40, length=40, height=80, weight=5)
+    assert palletizer.add_box(fixed) is None
+
+def test_place_box_at_with_orientation():
+    """Test para verificar la colocación en una orientación dada y que un rechazo no gira la caja."""
+    pallet = Pallet(100, 100, 50, 1000)
+    box = Box(id=1, width=40, length=40, height=80, weight=5, rotation='all')
+    assert not pallet.place_box_at(box, (0, 0, 0), 0)
+    assert not pallet.place_box_at(box, (80, 0, 0), 2)  # Tumbada no cabe tan cerca del borde
+    assert box.orientation == 0
+    assert pallet.place_box_at(box, (0, 0, 0), 2)
+    assert (box.width, box.length, box.height) == (40, 80, 40)
+    with pytest.raises(ValueError):
+        pallet.place_box_at(Box(id=2, width=10, length=10, height=10, weight=1), (50, 0, 0), 1)
+
+def test_bounds_with_rotation():
+    """Test para verificar que las cotas siguen siendo válidas cuando las cajas pueden girar."""
+    # Sin girar no caben dos por pallet a lo ancho; tumbadas caben cuatro
+    boxes = [Box(id=i, width=60, length=60, height=40, weight=1, rotation='all') for i in range(4)]
+    pallet = Pallet(100, 100, 120, 1000)
+    assert all(pallet.add_box(box) for box in boxes)
+    assert lower_bounds(boxes, 100, 100, 120, 1000).best <= 1
@@ -65,4 +65,59 @@ def test_pallet_add_box_multiple_layers():
     box1.position = (0, 0, 0)  # Forzar posición para el test
     assert pallet.add_box(box2) is True  # Debería ir en la siguiente capa
     assert len(pallet.boxes) == 2
-    assert pallet.current_weight == 200 
\ No newline at end of file
+    assert pallet.current_weight == 200 
+
+def test_pallet_place_box_extreme_points():
+    """Test para verificar que place_box usa los puntos extremos de las cajas colocadas."""
+    pallet = Pallet(max_width=100, max_length=100, max_height=150, max_weight=1000)
+    box1 = Box(id=1, width=60, length=100, height=50, weight=100)
+    box2 = Box(id=2, width=40, length=50, height=50, weight=100)
+    box3 = Box(id=3, width=40, length=50, height=30, weight=100)
+
+    assert pallet.place_box(box1) is True
+    assert pallet.place_box(box2) is True
+    assert pallet.place_box(box3) is True
+    assert box1.position == (0, 0, 0)
+    assert box2.position == (60, 0, 0)
+    assert box3.position == (60, 50, 0)  # Se prefiere la posición más baja
+    assert (0, 0, 50) in pallet.extreme_points
+
+def test_pallet_extreme_points_exclude_occupied():
+    """Test para verificar que los puntos extremos ocupados se descartan."""
+    pallet = Pallet(max_width=100, max_length=100, max_height=150, max_weight=1000)
+    assert pallet.add_box(Box(id=1, width=50, length=50, height=50, weight=10))
+    assert (0, 0, 0) not in pallet.extreme_points
+    assert {(50, 0, 0), (0, 50, 0), (0, 0, 50)} <= pallet.extreme_points
+
+def test_pallet_running_aggregates():
+    """Test para verificar los agregados que se mantienen al colocar cajas."""
+    pallet = Pallet(max_width=100, max_length=100, max_height=150, max_weight=1000)
+    box1 = Box(id=1, width=50, length=50, height=50, weight=30)
+    box2 = Box(id=2, width=50, length=50, height=20, weight=10)
+
+    assert pallet.place_box(box1)
+    assert pallet.place_box(box2)
+    assert pallet.used_volume == 50 * 50 * 50 + 50 * 50 * 20
+    assert pallet.remaining_volume() == pallet.volume() - pallet.used_volume
+    assert pallet.top_height == 50
+    assert pallet.get_center_of_mass() == pytest.approx((37.5, 25, 21.25))
+
+def test_pallet_trial_rolls_back():
+    """Test para verificar que una colocación de prueba no altera el pallet."""
+    pallet = Pallet(max_width=100, max_length=100, max_height=150, max_weight=1000)
+    box1 = Box(id=1, width=50, length=50, height=50, weight=30)
+    box2 = Box(id=2, width=50, length=50, height=80, weight=10)
+    assert pallet.place_box(box1)
+    extreme_points = set(pallet.extreme_points)
+
+    with pallet.trial():
+        assert pallet.place_box(box2)
+        assert len(pallet.boxes) == 2
+        assert pallet.top_height == 80
+
+    assert pallet.boxes == [box1]
+    assert len(pallet.store) == 1
+    assert pallet.current_weight == 30
+    assert pallet.top_height == 50
+    assert pallet.extreme_points == extreme_points
+    assert box2.position == (0, 0, 0)
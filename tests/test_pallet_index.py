@@ -0,0 +1,37 @@
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.pallet_index import PalletIndex
+
+def make_index(weights):
+    """Crea un índice con pallets cargados con los pesos indicados."""
+    index = PalletIndex()
+    for i, weight in enumerate(weights):
+        pallet = Pallet(100, 100, 150, 1000)
+        if weight:
+            assert pallet.place_box(Box(id=i, width=100, length=100, height=10 * (i + 1), weight=weight))
+        index.add(pallet)
+    return index
+
+def test_pallet_index_first_fit_order():
+    """Test para verificar que First-Fit recorre los pallets admisibles en orden."""
+    index = make_index([900, 100, 950, 200, 0])
+    box = Box(id=99, width=10, length=10, height=10, weight=150)
+
+    assert list(index.iter_first_fit(box)) == [1, 3, 4]
+
+def test_pallet_index_best_fit_order():
+    """Test para verificar que Best-Fit empieza por el menor volumen restante."""
+    index = make_index([100, 100, 100, 0])
+    box = Box(id=99, width=10, length=10, height=10, weight=10)
+
+    assert list(index.iter_best_fit(box)) == [2, 1, 0, 3]
+
+def test_pallet_index_update():
+    """Test para verificar que el índice refleja las nuevas colocaciones."""
+    index = make_index([0, 0])
+    box = Box(id=99, width=100, length=100, height=100, weight=10)
+    assert index.pallets[0].place_box(box)
+    index.update(0)
+
+    assert list(index.iter_first_fit(Box(id=100, width=10, length=10, height=60, weight=1))) == [1]
+    assert list(index.iter_best_fit(Box(id=101, width=10, length=10, height=10, weight=1))) == [0, 1]
@@ -0,0 +1,90 @@
+import itertools
+import pytest
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.algorithms import sku_layer_palletization
+from src.core.patterns import (PATTERN_KINDS, _PATTERN_BUILDERS, _is_valid, best_layer_pattern,
+                               build_sku_layers, group_by_sku)
+
+def assert_no_overlap(pallet):
+    for a, b in itertools.combinations(pallet.boxes, 2):
+        separated = any(
+            a.position[axis] + size_a <= b.position[axis] + 1e-9 or
+            b.position[axis] + size_b <= a.position[axis] + 1e-9
+            for axis, size_a, size_b in ((0, a.width, b.width), (1, a.length, b.length),
+                                         (2, a.height, b.height)))
+        assert separated, (a, b)
+
+@pytest.mark.parametrize("kind", PATTERN_KINDS)
+def test_layer_patterns_are_valid(kind):
+    """Test para verificar que cada patrón de capa queda dentro del pallet y sin solapes."""
+    for width, length in ((40, 30), (50, 30), (30, 20), (35, 25), (70, 45)):
+        footprints = _PATTERN_BUILDERS[kind](width, length, 120, 100)
+        assert footprints
+        assert _is_valid(footprints, 120, 100)
+        assert all(sorted(fp[2:]) == sorted((width, length)) for fp in footprints)
+
+def test_best_pattern_mixes_orientations():
+    """Test para verificar que el mejor patrón supera al bloque cuando conviene girar cajas."""
+    pattern = best_layer_pattern(40, 30, 120, 100)
+    assert pattern.count == 10  # El bloque solo admite 9
+    assert pattern.kind == 'rows'
+    assert best_layer_pattern(200, 200, 120, 100) is None
+
+def test_place_layer():
+    """Test para verificar que una capa se coloca de una vez y se puede deshacer."""
+    pallet = Pallet(120, 100, 150, 1000)
+    pattern = best_layer_pattern(40, 30, 120, 100)
+    boxes = [Box(id=i, width=40, length=30, height=25, weight=5, rotation='upright')
+             for i in range(pattern.count)]
+    with pallet.trial():
+        assert pallet.place_layer(boxes, pattern.footprints, pattern.kind)
+        assert len(pallet.layers) == 1 and pallet.top_height == 25
+    assert not pallet.boxes and not pallet.layers
+    assert all((box.width, box.length) == (40, 30) for box in boxes)
+
+    assert pallet.place_layer(boxes, pattern.footprints, pattern.kind)
+    assert pallet.layers[0].z == 0 and pallet.layers[0].pattern == 'rows'
+    assert {(box.width, box.length) for box in boxes} == {(40, 30), (30, 40)}
+    assert {box.orientation for box in boxes} == {0, 1}
+    assert_no_overlap(pallet)
+    with pytest.raises(ValueError):
+        pallet.place_layer(boxes[:1], [(0, 0, 50, 50)])
+    # Una caja sin rotación no admite una huella girada
+    with pytest.raises(ValueError):
+        pallet.place_layer([Box(id=99, width=40, length=30, height=25, weight=5)], [(0, 0, 30, 40)])
+
+    # Ninguna caja de la capa queda en el aire: cada una baja hasta lo que tiene debajo
+    small = Pallet(120, 100, 150, 1000)
+    assert small.place_layer([Box(id=50, width=40, length=30, height=25, weight=5)], [(0, 0, 40, 30)])
+    upper = [Box(id=51 + i, width=40, length=30, height=25, weight=5) for i in range(2)]
+    assert small.place_layer(upper, [(20, 0, 40, 30), (80, 70, 40, 30)])
+    assert [box.position[2] for box in upper] == [25, 0]
+    assert small.layers[-1].z == 25
+    assert small.get_stability_score() == 1.0
+
+    # Con min_support_ratio, una caja que apenas toca la carga rechaza la capa
+    strict = Pallet(120, 100, 150, 1000, min_support_ratio=0.5)
+    assert strict.place_layer([Box(id=60, width=40, length=30, height=25, weight=5)], [(0, 0, 40, 30)])
+    assert not strict.place_layer([Box(id=61, width=40, length=30, height=25, weight=5)], [(30, 0, 40, 30)])
+
+def test_sku_layer_palletization():
+    """Test para verificar que las cajas idénticas se paletizan por capas completas."""
+    boxes = [Box(id=i, width=40, length=30, height=25, weight=5, rotation='upright') for i in range(35)]
+    boxes += [Box(id=100 + i, width=20, length=15, height=10, weight=1) for i in range(3)]
+    assert [len(group) for group in group_by_sku(boxes).values()] == [35, 3]
+
+    pallets, remaining = build_sku_layers(boxes, 120, 100, 150, 1000)
+    assert len(pallets) == 1 and len(pallets[0].layers) == 3
+    assert len(remaining) == 5 + 3
+
+    # Sin rotación solo hay bloques de 9 cajas
+    fixed = [Box(id=i, width=40, length=30, height=25, weight=5) for i in range(35)]
+    pallets, remaining = build_sku_layers(fixed, 120, 100, 150, 1000)
+    assert [layer.pattern for layer in pallets[0].layers] == ['block'] * 3
+    assert len(remaining) == 8
+
+    pallets = sku_layer_palletization(boxes, 120, 100, 150, 1000)
+    assert sorted(box.id for pallet in pallets for box in pallet.boxes) == sorted(box.id for box in boxes)
+    for pallet in pallets:
+        assert_no_overlap(pallet)
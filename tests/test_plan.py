@@ -0,0 +1,58 @@
+import io
+import os
+import tempfile
+import numpy as np
+import pytest
+from src.core.box import Box
+from src.core.algorithms import first_fit_palletization
+from src.core.plan import HEADER_DTYPE, PLAN_DTYPE, PlanWriter, read_plan, write_plan
+
+def make_pallets():
+    boxes = [Box(id=100 + i, width=40, length=30, height=25, weight=10 + i) for i in range(40)]
+    return first_fit_palletization(boxes, 100, 100, 150, 1000)
+
+def test_plan_roundtrip():
+    """Test para verificar la escritura y lectura del plan con memmap."""
+    pallets = make_pallets()
+    assert len(pallets) > 1
+    path = os.path.join(tempfile.mkdtemp(), "plan.bin")
+    write_plan(path, pallets)
+
+    assert os.path.getsize(path) == HEADER_DTYPE.itemsize + 40 * PLAN_DTYPE.itemsize
+    plan = read_plan(path)
+    assert isinstance(plan.records, np.memmap)
+    assert plan.pallet_count == len(pallets)
+    assert (plan.max_width, plan.max_length, plan.max_height, plan.max_weight) == (100, 100, 150, 1000)
+
+    for index, pallet in enumerate(pallets):
+        records = plan.pallet(index)
+        assert records['box_id'].tolist() == [box.id for box in pallet.boxes]
+        assert list(zip(records['x'], records['y'], records['z'])) == [box.position for box in pallet.boxes]
+
+    rebuilt = plan.to_pallets()
+    assert [[(box.id, box.position, box.weight) for box in p.boxes] for p in rebuilt] == \
+        [[(box.id, box.position, box.weight) for box in p.boxes] for p in pallets]
+
+def test_plan_writer_is_valid_after_each_pallet():
+    """Test para verificar que el plan es legible mientras se escribe."""
+    pallets = make_pallets()
+    path = os.path.join(tempfile.mkdtemp(), "plan.bin")
+    with PlanWriter(path, 100, 100, 150, 1000) as writer:
+        assert read_plan(path).pallet_count == 0
+        for count, pallet in enumerate(pallets, 1):
+            assert writer.write_pallet(pallet) == count - 1
+            plan = read_plan(path)
+            assert plan.pallet_count == count
+            assert len(plan.records) == sum(len(p.boxes) for p in pallets[:count])
+
+def test_plan_to_stream_and_invalid_file():
+    """Test para verificar la escritura en memoria y el rechazo de ficheros ajenos."""
+    buffer = io.BytesIO()
+    write_plan(buffer, make_pallets())
+    assert buffer.getvalue()[:8] == b'PALPLAN\x00'
+
+    path = os.path.join(tempfile.mkdtemp(), "otro.bin")
+    with open(path, 'wb') as f:
+        f.write(b'\x00' * 128)
+    with pytest.raises(ValueError):
+        read_plan(path)
@@ -0,0 +1,36 @@
+import pytest
+from src.core.box import Box
+from src.core.algorithms import ALGORITHMS, first_fit_palletization
+from src.core.portfolio import run_portfolio
+
+def make_boxes(count):
+    return [Box(id=i, width=20 + (i * 7) % 30, length=20 + (i * 11) % 30, height=15 + (i * 5) % 20,
+                weight=5 + i % 10) for i in range(count)]
+
+def test_portfolio_runs_all_algorithms():
+    """Test para verificar que el portafolio ejecuta todos los algoritmos y elige el mejor."""
+    boxes = make_boxes(40)
+    result = run_portfolio(boxes, 100, 100, 150, 1000, max_workers=3)
+
+    assert [r.name for r in result.results] == list(ALGORITHMS)
+    assert all(r.status == 'ok' for r in result.results)
+    assert set(result.timings()) == set(ALGORITHMS)
+    assert result.best is not None
+    assert result.best.rank_key() == min(r.rank_key() for r in result.results)
+    assert sum(len(p.boxes) for p in result.pallets) == 40
+
+    expected = first_fit_palletization(make_boxes(40), 100, 100, 150, 1000)
+    first_fit = result.results[0]
+    assert len(first_fit.pallets) == len(expected)
+
+def test_portfolio_deadline_cancels_unfinished():
+    """Test para verificar que al vencer el plazo se cancelan los algoritmos pendientes."""
+    result = run_portfolio(make_boxes(3000), 100, 100, 150, 1000, deadline_seconds=0, max_workers=2)
+    assert all(r.status == 'timeout' for r in result.results)
+    assert result.best is None
+    assert result.pallets == []
+
+def test_portfolio_unknown_algorithm():
+    """Test para verificar el error con algoritmos no registrados."""
+    with pytest.raises(ValueError):
+        run_portfolio(make_boxes(3), 100, 100, 150, 1000, algorithms=["Inexistente"])
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import pytest
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.algorithms import first_fit_palletization
+from src.core.plan import read_plan, write_plan
+from src.core.sequence import build_sequence, sequence_ranks
+
+def test_sequence_respects_support():
+    """Test para verificar que una caja se monta después de las que la sostienen."""
+    pallet = Pallet(100, 100, 100, 1000)
+    # Orden de colocación imposible: la caja de arriba se añadió antes que su base
+    assert pallet.place_box_at(Box(id=1, width=50, length=50, height=20, weight=10), (0, 0, 20))
+    assert pallet.place_box_at(Box(id=2, width=50, length=50, height=20, weight=10), (0, 0, 0))
+    assert pallet.place_box_at(Box(id=3, width=50, length=50, height=20, weight=10), (50, 0, 0))
+    assert build_sequence(pallet) == [1, 0, 2]
+
+def test_sequence_gripper_approach():
+    """Test para verificar que la pinza no tiene cajas en su recorrido."""
+    pallet = Pallet(100, 100, 100, 1000)
+    assert pallet.place_box_at(Box(id=1, width=50, length=50, height=20, weight=10), (50, 0, 0))
+    assert pallet.place_box_at(Box(id=2, width=50, length=50, height=20, weight=10), (0, 0, 0))
+    # Entrando desde x máxima, la caja del fondo (x = 0) debe ir primero
+    assert build_sequence(pallet, approach='+x') == [1, 0]
+    assert build_sequence(pallet, approach='-x') == [0, 1]
+    with pytest.raises(ValueError):
+        build_sequence(pallet, approach='diagonal')
+
+def test_sequence_exported_with_plan():
+    """Test para verificar que el orden de montaje se guarda en el plan y es válido."""
+    boxes = [Box(id=i, width=20 + 10 * (i % 3), length=30, height=10 + 5 * (i % 2), weight=5) for i in range(300)]
+    pallets = first_fit_palletization(boxes, 120, 100, 150, 1000)
+    path = os.path.join(tempfile.mkdtemp(), "plan.bin")
+    write_plan(path, pallets, approach='top')
+    plan = read_plan(path)
+
+    for index, pallet in enumerate(pallets):
+        ranks = sequence_ranks(build_sequence(pallet, approach='top'))
+        assert plan.pallet(index)['sequence'].tolist() == ranks.tolist()
+        # Cada caja se monta después de sus apoyos y antes de las que tiene encima
+        for box, below in enumerate(pallet.support.below):
+            assert all(ranks[supporter] < ranks[box] for supporter in below)
+        ordered = plan.build_order(index)
+        assert sorted(ordered['sequence'].tolist()) == list(range(len(pallet.boxes)))
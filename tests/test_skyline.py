@@ -0,0 +1,84 @@
+import itertools
+import random
+from src.core.box import Box
+from src.core.pallet import Pallet
+from src.core.algorithms import layer_palletization
+from src.core.skyline import SkylinePacker
+
+def test_skyline_fills_bottom_left():
+    """Test para verificar que el skyline coloca cada rectángulo lo más abajo y a la izquierda posible."""
+    packer = SkylinePacker(100, 100)
+    assert packer.insert(60, 40) == (0, 0, 60, 40)
+    assert packer.insert(40, 30) == (60, 0, 40, 30)
+    assert packer.insert(40, 20) == (60, 30, 40, 20)
+    # El contorno queda en 40 a la izquierda y 50 a la derecha
+    assert [(s.x, s.y, s.width) for s in packer.skyline] == [(0, 40, 60), (60, 50, 40)]
+    assert packer.insert(100, 60) is None
+    assert packer.insert(100, 50) == (0, 50, 100, 50)
+    assert packer.used_area == 60 * 40 + 40 * 30 + 40 * 20 + 100 * 50
+
+def test_skyline_rotation():
+    """Test para verificar que el skyline gira el rectángulo solo si se permite."""
+    packer = SkylinePacker(100, 50)
+    assert packer.insert(30, 80) is None
+    assert packer.insert(30, 80, rotate=True) == (0, 0, 80, 30)
+
+def test_layer_palletization():
+    """Test para verificar que el algoritmo por capas apila capas válidas y las registra."""
+    rng = random.Random(0)
+    boxes = [Box(id=i, width=rng.choice([30, 40, 60]), length=rng.choice([20, 30, 40]),
+                 height=rng.choice([20, 25, 30]), weight=rng.randint(1, 20), rotation='upright')
+             for i in range(300)]
+    pallets = layer_palletization(boxes, 120, 100, 150, 1000)
+
+    assert sorted(box.id for pallet in pallets for box in pallet.boxes) == list(range(300))
+    for pallet in pallets:
+        assert pallet.layers
+        assert sum(len(layer.boxes) for layer in pallet.layers) == len(pallet.boxes)
+        assert pallet.current_weight <= pallet.max_weight
+        assert pallet.top_height <= pallet.max_height
+        for layer in pallet.layers:
+            # Cada caja baja hasta la carga de su huella: nunca por encima de la capa ni en el aire
+            assert all(box.position[2] <= layer.z and box.height <= layer.height for box in layer.boxes)
+        assert pallet.support.unsupported_count() == 0
+        for a, b in itertools.combinations(pallet.boxes, 2):
+            assert any(a.position[axis] + size_a <= b.position[axis] or b.position[axis] + size_b <= a.position[axis]
+                       for axis, size_a, size_b in ((0, a.width, b.width), (1, a.length, b.length),
+                                                    (2, a.height, b.height)))
+
+def test_layer_boxes_rest_on_the_load():
+    """Test para verificar que una caja de la capa baja al suelo donde la capa inferior no llega."""
+    boxes = [Box(id=1, width=120, length=50, height=20, weight=1),
+             Box(id=2, width=120, length=50, height=10, weight=1),
+             Box(id=3, width=120, length=50, height=10, weight=1)]
+    pallets = layer_palletization(boxes, 120, 100, 150, 1000)
+
+    assert len(pallets) == 1
+    assert [box.position for box in boxes] == [(0, 0, 0), (0, 0, 20), (0, 50, 0)]
+    assert pallets[0].support.unsupported_count() == 0
+
+def test_layer_palletization_unplaceable_box():
+    """Test para verificar que una caja que no cabe en ningún pallet se descarta."""
+    boxes = [Box(id=1, width=200, length=20, height=20, weight=1), Box(id=2, width=20, length=20, height=20, weight=1)]
+    pallets = layer_palletization(boxes, 120, 100, 150, 1000)
+    assert [box.id for pallet in pallets for box in pallet.boxes] == [2]
+
+def test_layer_skips_boxes_without_support():
+    """Test para verificar que una capa sin apoyo suficiente no hace abandonar un pallet con hueco."""
+    boxes = [Box(id=1, width=60, length=100, height=20, weight=1),
+             Box(id=2, width=80, length=100, height=10, weight=1),
+             Box(id=3, width=40, length=100, height=5, weight=1)]
+    pallets = layer_palletization(boxes, 120, 100, 150, 1000, min_support_ratio=0.8)
+
+    # La caja 2 no encuentra apoyo sobre la 1, pero la 3 sí cabe en el mismo pallet
+    assert [sorted(box.id for box in pallet.boxes) for pallet in pallets] == [[1, 3], [2]]
+    assert all(pallet.support.unsupported_count() == 0 for pallet in pallets)
+
+    pallet = Pallet(120, 100, 150, 1000, min_support_ratio=0.8)
+    base = Box(id=4, width=60, length=100, height=20, weight=1)
+    assert pallet.place_layer([base], [(0, 0, 60, 100)])
+    layer = [Box(id=5, width=80, length=100, height=10, weight=1),
+             Box(id=6, width=40, length=100, height=5, weight=1)]
+    footprints = [(0, 0, 80, 100), (80, 0, 40, 100)]
+    assert not pallet.place_layer(layer, footprints)
+    assert pallet.layer_fit(layer, footprints).tolist() == [False, True]
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import pytest
+import pandas as pd
+from src.core.sources import count_boxes, iter_box_batches, iter_boxes
+from src.core.algorithms import best_fit_lookahead_palletization, first_fit_palletization
+
+def create_temp_csv(count):
+    """Crea un CSV temporal con columnas extra y en otro orden."""
+    df = pd.DataFrame({
+        'weight': [10 + i for i in range(count)],
+        'id': list(range(count)),
+        'height': [20] * count,
+        'length': [30] * count,
+        'width': [40] * count,
+        'sku': ['A'] * count,
+    })
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.csv')
+    df.to_csv(temp_file.name, index=False)
+    return temp_file.name
+
+def test_iter_boxes_reads_in_chunks():
+    """Test para verificar la lectura por bloques con columnas tipadas."""
+    temp_file = create_temp_csv(25)
+    try:
+        batches = list(iter_box_batches(temp_file, batch_size=10))
+        assert [len(batch) for batch in batches] == [10, 10, 5]
+
+        boxes = list(iter_boxes(temp_file, chunk_size=7))
+        assert [box.id for box in boxes] == list(range(25))
+        assert type(boxes[0].id) is int
+        assert type(boxes[0].width) is float
+        assert (boxes[3].width, boxes[3].length, boxes[3].height, boxes[3].weight) == (40, 30, 20, 13)
+        assert count_boxes(temp_file, chunk_size=7) == 25
+    finally:
+        os.unlink(temp_file)
+
+def test_iter_boxes_missing_columns():
+    """Test para verificar el error cuando faltan columnas obligatorias."""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.csv')
+    try:
+        with open(temp_file.name, 'w') as f:
+            f.write("id,width\n1,2\n")
+        with pytest.raises(ValueError):
+            next(iter_boxes(temp_file.name))
+    finally:
+        os.unlink(temp_file.name)
+
+def test_algorithms_accept_box_generators():
+    """Test para verificar que los algoritmos aceptan el generador de cajas."""
+    temp_file = create_temp_csv(30)
+    try:
+        expected = first_fit_palletization(list(iter_boxes(temp_file)), 100, 100, 150, 1000)
+        streamed = first_fit_palletization(iter_boxes(temp_file, chunk_size=4), 100, 100, 150, 1000)
+        assert [[box.position for box in p.boxes] for p in streamed] == \
+            [[box.position for box in p.boxes] for p in expected]
+
+        expected = best_fit_lookahead_palletization(list(iter_boxes(temp_file)), 100, 100, 150, 1000)
+        streamed = best_fit_lookahead_palletization(iter_boxes(temp_file, chunk_size=4), 100, 100, 150, 1000)
+        assert [[box.id for box in p.boxes] for p in streamed] == \
+            [[box.id for box in p.boxes] for p in expected]
+    finally:
+        os.unlink(temp_file)
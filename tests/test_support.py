@@ -0,0 +1,97 @@
+import pytest
+from src.core.box import Box
+from src.core.pallet import Pallet
+
+def test_support_graph_contact_areas():
+    """Test para verificar que el grafo guarda las cajas de debajo y la fracción apoyada."""
+    pallet = Pallet(100, 100, 100, 1000)
+    assert pallet.place_box_at(Box(id=1, width=40, length=40, height=20, weight=10), (0, 0, 0))
+    assert pallet.place_box_at(Box(id=2, width=40, length=40, height=20, weight=10), (40, 0, 0))
+    # Apoyada a medias sobre cada caja: 20x40 de contacto con cada una
+    assert pallet.place_box_at(Box(id=3, width=40, length=40, height=20, weight=10), (20, 0, 20))
+    # Fracción apoyada de posiciones sueltas, solapando una o dos cajas de la base
+    probe = Box(id=4, width=40, length=40, height=20, weight=10)
+    assert pallet.support_ratio(0, 20, probe, 20) == pytest.approx(0.5)
+    assert pallet.support_ratio(60, 20, probe, 20) == pytest.approx(0.25)
+
+    support = pallet.support
+    assert support.below[2] == {0: pytest.approx(800), 1: pytest.approx(800)}
+    assert support.ratios[2] == pytest.approx(1.0)
+    assert support.above[0] == [2]
+    assert support.ratios[0] == 1.0
+
+def test_support_ratio_tolerance():
+    """Test para verificar que pequeñas diferencias de altura cuentan como apoyo."""
+    pallet = Pallet(100, 100, 100, 1000)
+    assert pallet.place_box_at(Box(id=1, width=50, length=50, height=20.0000001, weight=10), (0, 0, 0))
+    box = Box(id=2, width=50, length=100, height=20, weight=10)
+    assert pallet.support_ratio(0, 0, box, 20) == pytest.approx(0.5)
+    assert pallet._is_position_supported(0, 0, box, 20)
+    assert pallet.support_ratio(0, 0, box, 21) == 0
+
+def test_min_support_ratio_rejects_overhangs():
+    """Test para verificar que las colocaciones con poco apoyo se rechazan."""
+    pallet = Pallet(100, 100, 100, 1000, min_support_ratio=0.7)
+    assert pallet.place_box_at(Box(id=1, width=50, length=50, height=20, weight=10), (0, 0, 0))
+    # Solo la mitad de la base queda apoyada
+    assert not pallet.place_box_at(Box(id=2, width=50, length=50, height=20, weight=10), (25, 0, 20))
+    assert pallet.place_box_at(Box(id=3, width=50, length=50, height=20, weight=10), (10, 0, 20))
+    assert pallet.get_stability_score() == 1.0
+
+    # add_box busca otra posición en lugar de dejar la caja volada
+    for i in range(4, 10):
+        assert pallet.add_box(Box(id=i, width=30, length=30, height=20, weight=1))
+    assert pallet.support.unsupported_count(0.7) == 0
+
+def test_support_graph_trial_undo():
+    """Test para verificar que las colocaciones de prueba se retiran del grafo de apoyo."""
+    pallet = Pallet(100, 100, 100, 1000)
+    assert pallet.add_box(Box(id=1, width=50, length=50, height=20, weight=10))
+    with pallet.trial():
+        assert pallet.place_box_at(Box(id=2, width=50, length=50, height=20, weight=10), (0, 0, 20))
+        assert pallet.support.above[0] == [1]
+    assert pallet.support.above[0] == []
+    assert len(pallet.support) == 1
+    assert pallet.support.support_ratios([(0, 0, 40)], (10, 10, 10))[0] == 0
+
+def test_box_below_overhang_becomes_support():
+    """Test para verificar que una caja colocada bajo un voladizo pasa a sostenerlo."""
+    pallet = Pallet(100, 100, 100, 1000)
+    assert pallet.place_box_at(Box(id=1, width=50, length=50, height=20, weight=10), (0, 0, 0))
+    assert pallet.place_box_at(Box(id=2, width=100, length=50, height=20, weight=10), (0, 0, 20))
+    assert pallet.support.ratios[1] == pytest.approx(0.5)
+
+    with pallet.trial():
+        assert pallet.place_box_at(Box(id=3, width=50, length=50, height=20, weight=10), (50, 0, 0))
+        assert pallet.support.ratios[1] == pytest.approx(1.0)
+        assert pallet.support.above[2] == [1]
+    assert pallet.support.ratios[1] == pytest.approx(0.5)
+    assert pallet.support.below[1] == {0: pytest.approx(2500)}
+
+def test_max_load_rejects_overloading_placements():
+    """Test para verificar que no se coloca peso de más sobre una caja con carga máxima."""
+    pallet = Pallet(100, 100, 100, 1000)
+    assert pallet.place_box_at(Box(id=1, width=50, length=50, height=20, weight=10, max_load=30), (0, 0, 0))
+    assert pallet.place_box_at(Box(id=2, width=50, length=50, height=20, weight=20), (0, 0, 20))
+    # La carga llega a través de la caja intermedia
+    assert not pallet.place_box_at(Box(id=3, width=50, length=50, height=20, weight=15), (0, 0, 40))
+    assert pallet.place_box_at(Box(id=4, width=50, length=50, height=20, weight=10), (0, 0, 40))
+    assert pallet.support.loads[0] == pytest.approx(30)
+
+    # add_box busca otra posición en lugar de aplastar la caja
+    heavy = Box(id=5, width=50, length=50, height=20, weight=40)
+    assert pallet.add_box(heavy)
+    assert heavy.position[2] == 0
+
+def test_max_load_split_by_contact_area():
+    """Test para verificar que la carga se reparte según el área de contacto y se deshace en las pruebas."""
+    pallet = Pallet(100, 100, 100, 1000)
+    assert pallet.place_box_at(Box(id=1, width=50, length=50, height=20, weight=10, max_load=100), (0, 0, 0))
+    assert pallet.place_box_at(Box(id=2, width=50, length=50, height=20, weight=10), (50, 0, 0))
+    assert pallet.place_box_at(Box(id=3, width=60, length=50, height=20, weight=40), (20, 0, 20))
+    assert pallet.support.loads[:2] == pytest.approx([20, 20])
+
+    with pallet.trial():
+        assert pallet.place_box_at(Box(id=4, width=60, length=50, height=20, weight=60), (20, 0, 40))
+        assert pallet.support.loads[:3] == pytest.approx([50, 50, 60])
+    assert pallet.support.loads == pytest.approx([20, 20, 0])
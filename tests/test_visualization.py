@@ -82,4 +82,34 @@ def test_print_empty_palletization(capsys):
     captured = capsys.readouterr()
     
     assert "Resumen de Paletización" in captured.out
-    assert "No hay pallets para mostrar" in captured.out 
\ No newline at end of file
+    assert "No hay pallets para mostrar" in captured.out 
+
+
+def test_print_summary_flags_off_balance_pallets(capsys):
+    """Test para verificar que el resumen avisa de los pallets con el centro de gravedad fuera de la envolvente."""
+    pallet = Pallet(100, 100, 150, 1000, max_cog_offset=10)
+    assert pallet.place_box_at(Box(id=1, width=20, length=20, height=20, weight=10), (0, 0, 0))
+    print_palletization_summary([pallet])
+    assert "centro de gravedad fuera de la envolvente" in capsys.readouterr().out
+
+    balanced = Pallet(100, 100, 150, 1000, max_cog_offset=10)
+    assert balanced.place_box_at(Box(id=2, width=100, length=100, height=20, weight=10), (0, 0, 0))
+    print_palletization_summary([balanced])
+    assert "centro de gravedad fuera de la envolvente" not in capsys.readouterr().out
+
+
+def test_print_summary_lists_boxes_outside_layers(capsys):
+    """Test para verificar que el resumen lista las cajas de las capas y también las colocadas una a una."""
+    pallet = Pallet(100, 100, 150, 1000)
+    layer_boxes = [Box(id=1, width=50, length=100, height=20, weight=10),
+                   Box(id=2, width=50, length=100, height=20, weight=10)]
+    assert pallet.place_layer(layer_boxes, [(0, 0, 50, 100), (50, 0, 50, 100)], 'block')
+    loose = [Box(id=3, width=40, length=40, height=10, weight=5), Box(id=4, width=40, length=40, height=10, weight=5)]
+    assert all(pallet.place_box(box) for box in loose)
+    print_palletization_summary([pallet])
+    out = capsys.readouterr().out
+
+    assert "Capa 1 a 0.0 cm, block" in out
+    assert "Cajas sueltas a 20" in out
+    for box_id in range(1, 5):
+        assert f"Caja {box_id}:" in out